@@ -53,11 +53,15 @@ def cli(ctx):
 @click.option("--timeout", type=int, help="Request timeout in seconds (default: 30)")
 @click.option("--no-browser", is_flag=True, help="Disable browser automation for transcription")
 @click.option("--force-download", is_flag=True, help="Force re-download even if image is cached")
+@click.option("--no-tile-cache", is_flag=True, help="Do not use the persistent tile cache")
 @click.option("--config", type=click.Path(), help="Path to configuration file")
 @click.option("-v", "--verbose", is_flag=True, help="Enable verbose output")
 @click.option("-vv", "--debug", is_flag=True, help="Enable debug output")
 @click.option("--dry-run", is_flag=True, help="Preview actions without executing")
-def process(url, output, quality, timeout, no_browser, force_download, config, verbose, debug, dry_run):
+def process(
+    url, output, quality, timeout, no_browser, force_download, no_tile_cache, config, verbose,
+    debug, dry_run,
+):
     """Process URL by downloading image and scraping content."""
     # Validate URL
     if not validate_url(url):
@@ -118,6 +122,7 @@ def process(url, output, quality, timeout, no_browser, force_download, config, v
             quality=cfg.get("image_quality"),
             timeout=cfg.get("timeout"),
             force_download=force_download,
+            use_tile_cache=not no_tile_cache,
         )
         if image_path:
             files_created.append(("High-resolution image", image_path))
@@ -164,11 +169,14 @@ def process(url, output, quality, timeout, no_browser, force_download, config, v
 @click.option("--quality", type=int, help="JPEG quality (1-100, default: 95)")
 @click.option("--timeout", type=int, help="Request timeout in seconds (default: 30)")
 @click.option("--force-download", is_flag=True, help="Force re-download even if image is cached")
+@click.option("--no-tile-cache", is_flag=True, help="Do not use the persistent tile cache")
 @click.option("--config", type=click.Path(), help="Path to configuration file")
 @click.option("-v", "--verbose", is_flag=True, help="Enable verbose output")
 @click.option("-vv", "--debug", is_flag=True, help="Enable debug output")
 @click.option("--dry-run", is_flag=True, help="Preview actions without executing")
-def download_image_cmd(url, output, quality, timeout, force_download, config, verbose, debug, dry_run):
+def download_image_cmd(
+    url, output, quality, timeout, force_download, no_tile_cache, config, verbose, debug, dry_run,
+):
     """Download high-resolution image from the given URL."""
     # Validate URL
     if not validate_url(url):
@@ -217,6 +225,7 @@ def download_image_cmd(url, output, quality, timeout, force_download, config, ve
             quality=cfg.get("image_quality"),
             timeout=cfg.get("timeout"),
             force_download=force_download,
+            use_tile_cache=not no_tile_cache,
         )
         if not image_path:
             click.echo("✗ Failed to download image")
@@ -8,7 +8,12 @@ from typing import Optional
 from .image_metadata import check_existing_image, save_image_metadata
 from .openseadragon import OpenSeadragonDetector
 from .stitcher import StitchProgressCallback, TileStitcher
-from .tile_manager import QualityMode, SimpleProgressCallback, TileManager
+from .tile_manager import (
+    QualityMode,
+    SimpleProgressCallback,
+    TileManager,
+    default_tile_cache_dir,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +36,7 @@ def download_image(
     quality: int = 95, 
     timeout: int = 30,
     force_download: bool = False,
+    use_tile_cache: bool = True,
 ) -> Optional[Path]:
     """Download high-resolution image from the given URL.
 
@@ -40,6 +46,7 @@ def download_image(
         quality: JPEG quality (1-100) for output image
         timeout: Request timeout in seconds
         force_download: Force download even if cached image exists
+        use_tile_cache: Reuse and add to the persistent tile cache
 
     Returns:
         Path to the saved image, or None if download failed
@@ -91,6 +98,7 @@ def download_image(
             max_workers=5,
             timeout=timeout,
             progress_callback=progress_callback,
+            cache_dir=default_tile_cache_dir() if use_tile_cache else None,
         )
 
         temp_dir = tile_manager.download_tiles(
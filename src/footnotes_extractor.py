@@ -75,7 +75,7 @@ def extract_footnotes_section(soup: BeautifulSoup) -> Optional[FootnotesSection]
     # Look for footnote list
     footnote_list = content_area.find("ol")
     if footnote_list:
-        for li in footnote_list.find_all("li"):
+        for li in footnote_list.find_all("li", recursive=False):
             # Get footnote number - usually in an anchor tag
             number_elem = li.find("a", class_=lambda x: x and ("footnote" in x or "gDRSro" in x))
             if not number_elem:
@@ -96,6 +96,10 @@ def extract_historical_introduction(soup: BeautifulSoup) -> Optional[HistoricalI
 def extract_paragraph_from_div(para_elem: Tag) -> Optional[Paragraph]:
     """Extract a paragraph with sentences from a div element.
 
+    The paragraph is rendered in a single walk over the original tree: popups,
+    footnote references and links are recorded as they are reached and replaced
+    by their placeholder text, so the element is never copied or modified.
+
     Args:
         para_elem: BeautifulSoup Tag representing a paragraph div
 
@@ -103,74 +107,64 @@ def extract_paragraph_from_div(para_elem: Tag) -> Optional[Paragraph]:
         Paragraph object with structured sentences
     """
     sentences = []
-    
-    # Make a copy to avoid modifying the original
-    para_copy = para_elem.__copy__()
-    
-    # Extract popups first
     popup_refs = []
-    popup_wrappers = para_copy.find_all("aside", class_="popup-wrapper")
-    
-    for wrapper in popup_wrappers:
-        popup_link = wrapper.find("a", class_=lambda x: x and "staticPopup" in x)
-        if popup_link:
-            popup_text = popup_link.get_text(strip=True)
-            
-            # Get popup content
-            popup_content = wrapper.find("div", class_="popup-content")
-            if popup_content:
-                note_data = popup_content.find("div", class_="note-data")
-                if note_data:
-                    # Extract header from hidden input or first strong text
-                    header = popup_text  # Default to link text
-                    hidden_input = note_data.find("input", type="hidden")
-                    if hidden_input and hidden_input.get("value"):
-                        header = hidden_input.get("value")
-                    
-                    # Extract summary
-                    summary_p = note_data.find("p")
-                    summary = summary_p.get_text(strip=True) if summary_p else ""
-                    
-                    # Extract link
-                    more_link = note_data.find("a", class_="more")
-                    link = more_link.get("href", "") if more_link else ""
-                    if link and not link.startswith("http"):
-                        link = f"https://www.josephsmithpapers.org{link}"
-                    
-                    popup = Popup(header=header, summary=summary, link=link)
-                    popup_refs.append(PopupReference(text=popup_text, popup=popup))
-            
-            # Replace with bracketed text
-            wrapper.replace_with(f"[{popup_text}]")
-    
-    # Extract footnote reference
-    footnote_num = None
-    fn_refs = para_copy.find_all("a", class_=lambda x: x and "footnote-ref" in x)
-    for fn_ref in fn_refs:
-        sup_elem = fn_ref.find("sup")
-        if sup_elem:
-            try:
-                footnote_num = int(sup_elem.get_text().strip())
-            except:
-                pass
-        fn_ref.decompose()
-    
-    # Extract regular links
     links = []
-    for link_elem in para_copy.find_all("a", class_="reference"):
-        # Skip if it's a popup link
-        if "staticPopup" not in link_elem.get("class", []):
-            text = link_elem.get_text(strip=True)
-            url = link_elem.get("href", "")
-            if url and not url.startswith("http"):
-                url = f"https://www.josephsmithpapers.org{url}"
-            if text and url:
-                links.append(Link(text=text, url=url))
-                link_elem.replace_with(f"[{text}]")
-    
-    # Get the final text - use separator to preserve spaces between elements
-    text = para_copy.get_text(separator='', strip=False).strip()
-    
+    footnote_num = None
+
+    def render(node: Tag) -> List[str]:
+        """Render a tag's children to text fragments."""
+        fragments = []
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                # get_text() drops comments, script and style strings
+                fragments.append(child.get_text())
+            else:
+                fragments.extend(render_tag(child))
+        return fragments
+
+    def render_tag(tag: Tag) -> List[str]:
+        """Render a single tag, substituting popups, footnote references and links."""
+        nonlocal footnote_num
+        classes = tag.attrs.get("class") or ()
+
+        # Popups become bracketed text
+        if tag.name == "aside" and "popup-wrapper" in classes:
+            popup_link = tag.find("a", class_=lambda x: x and "staticPopup" in x)
+            if not popup_link:
+                return []
+            popup_text = popup_link.get_text(strip=True)
+            popup = extract_popup(tag, popup_text)
+            if popup:
+                popup_refs.append(PopupReference(text=popup_text, popup=popup))
+            return [f"[{popup_text}]"]
+
+        if tag.name == "a":
+            # Footnote references are dropped from the text
+            if "footnote-ref" in " ".join(classes):
+                sup_elem = tag.find("sup")
+                if sup_elem:
+                    try:
+                        footnote_num = int(sup_elem.get_text().strip())
+                    except ValueError:
+                        pass
+                return []
+
+            # Regular links become bracketed text (popup links are handled above)
+            if "reference" in classes and "staticPopup" not in classes:
+                fragments = render(tag)
+                text = "".join(fragment.strip() for fragment in fragments if fragment.strip())
+                url = tag.get("href", "")
+                if url and not url.startswith("http"):
+                    url = f"https://www.josephsmithpapers.org{url}"
+                if text and url:
+                    links.append(Link(text=text, url=url))
+                    return [f"[{text}]"]
+                return fragments
+
+        return render(tag)
+
+    text = "".join(render(para_elem)).strip()
+
     if text:
         # Create sentence object with all markup
         if popup_refs or links or footnote_num is not None:
@@ -178,10 +172,46 @@ def extract_paragraph_from_div(para_elem: Tag) -> Optional[Paragraph]:
             sentences.append(sentence)
         else:
             sentences.append(text)
-    
+
     return Paragraph(sentences=sentences) if sentences else None
 
 
+def extract_popup(wrapper: Tag, popup_text: str) -> Optional[Popup]:
+    """Extract popup data from a popup wrapper.
+
+    Args:
+        wrapper: The aside.popup-wrapper element
+        popup_text: Text of the popup link, used as the default header
+
+    Returns:
+        Popup object if the wrapper has note data, None otherwise
+    """
+    popup_content = wrapper.find("div", class_="popup-content")
+    if not popup_content:
+        return None
+    note_data = popup_content.find("div", class_="note-data")
+    if not note_data:
+        return None
+
+    # Extract header from hidden input or first strong text
+    header = popup_text  # Default to link text
+    hidden_input = note_data.find("input", type="hidden")
+    if hidden_input and hidden_input.get("value"):
+        header = hidden_input.get("value")
+
+    # Extract summary
+    summary_p = note_data.find("p")
+    summary = summary_p.get_text(strip=True) if summary_p else ""
+
+    # Extract link
+    more_link = note_data.find("a", class_="more")
+    link = more_link.get("href", "") if more_link else ""
+    if link and not link.startswith("http"):
+        link = f"https://www.josephsmithpapers.org{link}"
+
+    return Popup(header=header, summary=summary, link=link)
+
+
 def process_content_node(node: Union[Tag, NavigableString], in_popup: bool = False) -> List[str]:
     """Process a content node recursively to extract text with markup.
 
@@ -199,8 +229,11 @@ def process_content_node(node: Union[Tag, NavigableString], in_popup: bool = Fal
         if text.strip():
             parts.append(text)
     elif isinstance(node, Tag):
+        # Look the class attribute up once per node
+        classes = frozenset(node.attrs.get("class") or ())
+
         # Handle popup wrappers
-        if node.name == "aside" and "popup-wrapper" in node.get("class", []):
+        if node.name == "aside" and "popup-wrapper" in classes:
             popup_link = node.find("a", class_=lambda x: x and "staticPopup" in x)
             if popup_link:
                 popup_text = popup_link.get_text(strip=True)
@@ -208,19 +241,18 @@ def process_content_node(node: Union[Tag, NavigableString], in_popup: bool = Fal
             return parts
 
         # Handle footnote references
-        if node.name == "a" and "footnote-ref" in node.get("class", []):
+        if node.name == "a" and "footnote-ref" in classes:
             # Skip footnote numbers, they'll be added separately
             return parts
 
         # Handle regular links
-        if node.name == "a" and "reference" in node.get("class", []) and "staticPopup" not in node.get("class", []):
+        if node.name == "a" and "reference" in classes and "staticPopup" not in classes:
             link_text = node.get_text(strip=True)
             parts.append(f"[{link_text}]")
             return parts
 
         # Handle editorial marks
         if node.name == "span":
-            classes = node.get("class", [])
             is_editorial = "editorial-comment" in classes
             is_italic = "italic" in classes
             
@@ -239,7 +271,7 @@ def process_content_node(node: Union[Tag, NavigableString], in_popup: bool = Fal
                     return parts
         
         # Handle static editorial notes
-        if node.name == "a" and "editorial-note-static" in node.get("class", []):
+        if node.name == "a" and "editorial-note-static" in classes:
             note_text = node.get_text(strip=True)
             parts.append(f"^{note_text}^")
             return parts
@@ -268,7 +300,7 @@ def extract_footnotes(content_area: Tag) -> List[Footnote]:
     if not footnote_list:
         return footnotes
 
-    for li in footnote_list.find_all("li"):
+    for li in footnote_list.find_all("li", recursive=False):
         # Get footnote number
         number_elem = li.find("a", class_=lambda x: x and ("footnote" in x or "gDRSro" in x))
         if not number_elem:
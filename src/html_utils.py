@@ -0,0 +1,129 @@
+"""Helpers for extracting content from lxml HTML trees."""
+
+from typing import Iterator, Optional, Union
+
+from lxml import etree
+from lxml import html as lxml_html
+
+# Text nodes beneath an element, skipping comments, script/style bodies and
+# <template> content (which BeautifulSoup's get_text also leaves out)
+_TEXT_NODES = etree.XPath(
+    ".//text()[not(parent::script) and not(parent::style) and not(ancestor::template)]"
+)
+
+
+def parse_html(markup, encoding: Optional[str] = None) -> etree._Element:
+    """Parse an HTML document into an lxml tree.
+
+    Args:
+        markup: HTML document as str or bytes
+        encoding: Encoding of byte input; if None, lxml uses the document's
+            <meta charset> declaration
+
+    Returns:
+        Root <html> element of the document
+    """
+    if encoding and isinstance(markup, bytes):
+        # lxml parsers are not safe to share across threads, so build one per call
+        parser = lxml_html.HTMLParser(encoding=encoding)
+        return lxml_html.document_fromstring(markup, parser=parser)
+    return lxml_html.document_fromstring(markup)
+
+
+def has_class(class_name: str) -> str:
+    """Build an XPath predicate matching elements with a given CSS class.
+
+    Args:
+        class_name: Single class name to match
+
+    Returns:
+        XPath predicate expression (without brackets)
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def class_set(element: etree._Element) -> frozenset:
+    """Get the CSS classes of an element.
+
+    Args:
+        element: lxml element
+
+    Returns:
+        Frozen set of class names
+    """
+    return frozenset((element.get("class") or "").split())
+
+
+def element_text(element: Optional[etree._Element], strip: bool = False) -> str:
+    """Get the text of an element the way BeautifulSoup's get_text does.
+
+    Args:
+        element: lxml element (None yields an empty string)
+        strip: Strip each text node and drop empty ones before joining
+
+    Returns:
+        Concatenated text content
+    """
+    if element is None:
+        return ""
+    if strip:
+        return "".join(text.strip() for text in _TEXT_NODES(element) if text.strip())
+    return "".join(_TEXT_NODES(element))
+
+
+def short_text(element: etree._Element) -> str:
+    """Get the stripped text of an element that usually holds one text node.
+
+    Like BeautifulSoup's .string: a childless element's own text is read
+    directly, and only an element with children falls back to element_text.
+
+    Args:
+        element: lxml element, such as a footnote number anchor
+
+    Returns:
+        Stripped text content
+    """
+    if len(element) == 0 and element.tag not in ("script", "style", "template"):
+        return (element.text or "").strip()
+    return element_text(element, strip=True)
+
+
+def iter_previous(element: etree._Element) -> Iterator[etree._Element]:
+    """Iterate over the elements before an element, nearest first.
+
+    Mirrors BeautifulSoup's find_all_previous(): preceding elements and
+    ancestors in reverse document order.
+
+    Args:
+        element: lxml element to start from
+
+    Yields:
+        Preceding elements (comments and processing instructions are skipped)
+    """
+    node = element
+    while node is not None:
+        for sibling in node.itersiblings(preceding=True):
+            for previous in reversed(list(sibling.iter())):
+                if isinstance(previous.tag, str):
+                    yield previous
+        node = node.getparent()
+        if node is not None:
+            yield node
+
+
+def iter_content(element: etree._Element) -> Iterator[Union[str, etree._Element]]:
+    """Iterate over an element's child nodes, like BeautifulSoup's .children.
+
+    Args:
+        element: lxml element
+
+    Yields:
+        The element's leading text, then each child (comments included)
+        followed by its tail text; empty text is skipped
+    """
+    if element.text:
+        yield element.text
+    for child in element:
+        yield child
+        if child.tail:
+            yield child.tail
@@ -1,9 +1,14 @@
 """Data models for JSP content scraping."""
 
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Union
 
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+; used for
+# the models created once per line, paragraph, link or footnote of a page
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 @dataclass
 class Breadcrumb:
@@ -22,7 +27,7 @@ class Breadcrumb:
         return {"label": self.label, "url": self.url}
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Link:
     """Represents a hyperlink in text.
 
@@ -39,7 +44,7 @@ class Link:
         return {"text": self.text, "url": self.url}
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Popup:
     """Represents a popup/tooltip for a person or place.
 
@@ -58,7 +63,7 @@ class Popup:
         return {"header": self.header, "summary": self.summary, "link": self.link}
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class PopupReference:
     """Represents a reference to a popup in text.
 
@@ -75,7 +80,7 @@ class PopupReference:
         return {"text": self.text, "popup": self.popup.to_dict()}
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Sentence:
     """Represents a sentence with optional markup.
 
@@ -103,7 +108,7 @@ class Sentence:
         return result
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Paragraph:
     """Represents a paragraph containing sentences.
 
@@ -118,7 +123,7 @@ class Paragraph:
         return {"sentences": [s if isinstance(s, str) else s.to_dict() for s in self.sentences]}
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Footnote:
     """Represents a footnote in the document.
 
@@ -208,7 +213,7 @@ class HistoricalIntroduction:
         return result
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class DocumentInfoItem:
     """Represents a single label/value pair in Document Information.
 
@@ -250,7 +255,7 @@ class DocumentInformation:
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class TranscriptionLine:
     """Represents a line in a transcription.
 
@@ -274,7 +279,7 @@ class TranscriptionLine:
         return result
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class TranscriptionParagraph:
     """Represents a paragraph in a transcription that may contain line breaks.
 
@@ -294,7 +299,7 @@ class TranscriptionParagraph:
         return result
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Transcription:
     """Represents a document transcription with line breaks and editorial notes.
 
@@ -340,7 +345,7 @@ class FootnotesSection:
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class TableRow:
     """Represents a row in a table.
     
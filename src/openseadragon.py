@@ -1,9 +1,12 @@
 """OpenSeadragon configuration detection and parsing for JSP pages."""
 
+import itertools
 import json
 import logging
+import math
 import re
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
@@ -19,6 +22,68 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 logger = logging.getLogger(__name__)
 
+# Prefer a real JS-literal parser when available
+try:
+    import json5
+
+    JSON5_AVAILABLE = True
+except ImportError:
+    JSON5_AVAILABLE = False
+
+# Fallback repair: quote bare object keys and convert single-quoted strings
+_BARE_KEY_RE = re.compile(r"([{,]\s*)([A-Za-z_$][\w$]*)\s*:")
+_SINGLE_QUOTED_RE = re.compile(r"'((?:[^'\\\n]|\\.)*)'")
+
+# tileSources arrays, quoted DZI URLs and quoted /tiles/ URLs in one alternation
+_SCRIPT_SOURCE_RE = re.compile(
+    r"tileSources\s*:\s*\[(?P<ts>.*?)\]"
+    r"|[\"'](?P<dzi>[^\"']+\.dzi)[\"']"
+    r"|[\"'](?P<tiles>[^\"']+/tiles/[^\"']+)[\"']",
+    re.DOTALL,
+)
+
+
+def _dedupe_sources(sources: List[Any]) -> List[Any]:
+    """Drop repeated tile sources, keeping the first occurrence of each.
+
+    Sources are keyed on (type, url); sources without a URL fall back to their
+    full serialized content so distinct inline configurations are kept.
+    """
+    deduped = {}
+    for source in sources:
+        if isinstance(source, dict):
+            if source.get("url"):
+                key = (source.get("type"), source["url"])
+            else:
+                key = json.dumps(source, sort_keys=True, default=str)
+        else:
+            key = (None, source)
+        deduped.setdefault(key, source)
+    return list(deduped.values())
+
+
+def _parse_js_array(items_text: str) -> List[Any]:
+    """Parse the body of a JavaScript array literal into Python objects.
+
+    Args:
+        items_text: Text between the array's square brackets
+
+    Returns:
+        List of parsed items
+
+    Raises:
+        ValueError: If the text is not a valid array literal
+    """
+    array_text = f"[{items_text}]"
+    if JSON5_AVAILABLE:
+        return json5.loads(array_text)
+
+    array_text = _SINGLE_QUOTED_RE.sub(
+        lambda m: json.dumps(m.group(1).replace("\\'", "'")), array_text
+    )
+    array_text = _BARE_KEY_RE.sub(r'\1"\2":', array_text)
+    return json.loads(array_text)
+
 
 class OpenSeadragonConfig:
     """Container for OpenSeadragon configuration data."""
@@ -60,8 +125,6 @@ class OpenSeadragonConfig:
                     width = int(size.get("Width", 0))
                     height = int(size.get("Height", 0))
                     if width and height:
-                        import math
-
                         max_dim = max(width, height)
                         parsed["max_level"] = math.ceil(math.log2(max_dim))
                         parsed["width"] = width
@@ -87,75 +150,148 @@ class OpenSeadragonConfig:
                 if level is None:
                     # Try to find highest level by testing URLs
                     for test_level in range(15, -1, -1):
-                        test_url = f"{base_url}{test_level}/0_0.jpg"
+                        test_url = self._tile_url_template(base_url, test_level).format(
+                            col=0, row=0
+                        )
                         if self._url_exists(test_url):
                             level = test_level
                             break
 
                 if level is not None:
-                    # Determine grid size by probing
-                    max_col = 0
-                    max_row = 0
-
-                    # Check columns at row 0
-                    for col in range(50):  # Reasonable upper limit
-                        test_url = f"{base_url}{level}/{col}_0.jpg"
-                        if self._url_exists(test_url):
-                            max_col = col
-                        else:
-                            break
-
-                    # Check rows at column 0
-                    for row in range(50):  # Reasonable upper limit
-                        test_url = f"{base_url}{level}/0_{row}.jpg"
-                        if self._url_exists(test_url):
-                            max_row = row
-                        else:
-                            break
+                    template = self._tile_url_template(base_url, level)
+
+                    # Determine grid size by probing row 0 and column 0 concurrently
+                    # (the template is bound as a default so each lambda keeps this
+                    # source's value rather than the loop variable)
+                    with ThreadPoolExecutor(max_workers=2) as executor:
+                        col_future = executor.submit(
+                            self._probe_extent,
+                            lambda col, template=template: template.format(col=col, row=0),
+                        )
+                        row_future = executor.submit(
+                            self._probe_extent,
+                            lambda row, template=template: template.format(col=0, row=row),
+                        )
+                        max_col = col_future.result()
+                        max_row = row_future.result()
+
+                    # DZI grids are dense, so the far corner confirms the whole grid
+                    if (max_col or max_row) and not self._url_exists(
+                        template.format(col=max_col, row=max_row)
+                    ):
+                        logger.warning(
+                            f"Corner tile {max_col}_{max_row} missing at level {level}; "
+                            "grid may be incomplete"
+                        )
 
                     # Generate all tile URLs
-                    for row in range(max_row + 1):
-                        for col in range(max_col + 1):
-                            url = f"{base_url}{level}/{col}_{row}.jpg"
-                            tile_urls.append((url, col, row))
+                    tile_urls.extend(self._grid_urls(base_url, level, max_col + 1, max_row + 1))
 
                     logger.info(f"Found grid size: {max_col + 1}x{max_row + 1} at level {level}")
 
             elif source["type"] == "dzi":
                 # Handle DZI format
-                if level is None:
-                    level = source.get("max_level", 13)
+                dzi_level = level
+                if dzi_level is None:
+                    dzi_level = source.get("max_level") or 13
 
                 # DZI URL pattern
                 base_url = source["url"].replace(".dzi", "_files")
 
-                # For DZI, we should calculate grid size based on dimensions
+                # For DZI, calculate the exact grid from the full-resolution dimensions
                 if "width" in source and "height" in source:
-                    tile_size = source.get("tile_size", 256)
-                    width = source["width"]
-                    height = source["height"]
-
-                    # Calculate tiles needed at this level
-                    level_scale = 2 ** (source.get("max_level", level) - level)
-                    level_width = width // level_scale
-                    level_height = height // level_scale
-
-                    cols = (level_width + tile_size - 1) // tile_size
-                    rows = (level_height + tile_size - 1) // tile_size
-
-                    for row in range(rows):
-                        for col in range(cols):
-                            url = f"{base_url}/{level}/{col}_{row}.{source.get('format', 'jpg')}"
-                            tile_urls.append((url, col, row))
+                    if dzi_level > source["max_level"]:
+                        # Level does not exist in this pyramid
+                        continue
+
+                    cols, rows = self._dzi_grid_size(
+                        source["width"],
+                        source["height"],
+                        source.get("tile_size", 256),
+                        source["max_level"] - dzi_level,
+                    )
+
+                    tile_urls.extend(
+                        self._grid_urls(
+                            base_url, dzi_level, cols, rows, source.get("format", "jpg")
+                        )
+                    )
                 else:
                     # Fallback to probing
-                    for row in range(10):
-                        for col in range(10):
-                            url = f"{base_url}/{level}/{col}_{row}.{source.get('format', 'jpg')}"
-                            tile_urls.append((url, col, row))
+                    tile_urls.extend(
+                        self._grid_urls(
+                            base_url, dzi_level, 10, 10, source.get("format", "jpg")
+                        )
+                    )
 
         return tile_urls
 
+    def _probe_extent(self, url_for_index: Callable[[int], str], limit: int = 50) -> int:
+        """Find the last existing tile index along one axis of a dense grid.
+
+        Uses a galloping search (1, 2, 4, ...) followed by bisection, so a grid
+        of N tiles needs O(log N) probes instead of N.
+
+        Args:
+            url_for_index: Callable mapping an axis index to a tile URL
+            limit: Upper bound (exclusive) on the index to probe
+
+        Returns:
+            Highest index whose tile exists, or 0 if none beyond the first
+        """
+        last_found = 0
+        first_missing = 1
+        while first_missing < limit and self._url_exists(url_for_index(first_missing)):
+            last_found = first_missing
+            first_missing *= 2
+        first_missing = min(first_missing, limit)
+
+        while first_missing - last_found > 1:
+            mid = (last_found + first_missing) // 2
+            if self._url_exists(url_for_index(mid)):
+                last_found = mid
+            else:
+                first_missing = mid
+
+        return last_found
+
+    @staticmethod
+    def _dzi_grid_size(width: int, height: int, tile_size: int, downscale: int) -> Tuple[int, int]:
+        """Compute the (cols, rows) tile grid of a DZI pyramid level.
+
+        Args:
+            width: Full-resolution image width
+            height: Full-resolution image height
+            tile_size: Tile edge length in pixels
+            downscale: Number of halvings below the maximum level
+
+        Returns:
+            Tuple of (cols, rows); never smaller than 1x1
+        """
+        scale = 2**downscale
+        cols = math.ceil(math.ceil(width / scale) / tile_size)
+        rows = math.ceil(math.ceil(height / scale) / tile_size)
+        return max(cols, 1), max(rows, 1)
+
+    @staticmethod
+    def _tile_url_template(base_url: str, level: int, ext: str = "jpg") -> str:
+        """Build the URL template of a level's tiles, with {col} and {row} fields."""
+        return f"{base_url.rstrip('/')}/{level}/{{col}}_{{row}}.{ext}"
+
+    @classmethod
+    def _grid_urls(
+        cls, base_url: str, level: int, cols: int, rows: int, ext: str = "jpg"
+    ) -> List[Tuple[str, int, int]]:
+        """Build (url, col, row) tuples for a dense grid in row-major order.
+
+        The URL template is built once per grid rather than once per tile.
+        """
+        template = cls._tile_url_template(base_url, level, ext)
+        return [
+            (template.format(col=col, row=row), col, row)
+            for row, col in itertools.product(range(rows), range(cols))
+        ]
+
     def _url_exists(self, url: str) -> bool:
         """Check if a URL exists (simplified version)."""
         try:
@@ -420,31 +556,41 @@ class OpenSeadragonDetector:
 
             text = script.string
 
-            # Pattern 1: tileSources array
-            tile_sources_match = re.search(r"tileSources\s*:\s*\[(.*?)\]", text, re.DOTALL)
-            if tile_sources_match:
-                try:
-                    # Clean up JavaScript to make it valid JSON
-                    sources_text = tile_sources_match.group(1)
-                    sources_text = re.sub(r"(\w+):", r'"\1":', sources_text)
-                    sources_text = re.sub(r"'", '"', sources_text)
-                    sources_text = f"[{sources_text}]"
-                    sources = json.loads(sources_text)
-                    tile_sources.extend(sources)
-                except Exception:
-                    pass
-
-            # Pattern 2: Direct DZI URLs
-            dzi_urls = re.findall(r'["\']([^"\']+\.dzi)["\']', text)
-            for dzi_url in dzi_urls:
-                full_url = urljoin(base_url, dzi_url)
-                tile_sources.append({"url": full_url, "type": "dzi"})
-
-            # Pattern 3: Tile URL patterns
-            tile_patterns = re.findall(r'["\']([^"\']+/tiles/[^"\']+)["\']', text)
-            for pattern in tile_patterns:
-                full_url = urljoin(base_url, pattern)
-                tile_sources.append({"url": full_url, "type": "tiles"})
+            # Single pass over the script for all three patterns
+            for match in _SCRIPT_SOURCE_RE.finditer(text):
+                if match.group("ts") is not None:
+                    # Pattern 1: tileSources array
+                    try:
+                        sources = _parse_js_array(match.group("ts"))
+                    except ValueError:
+                        # Still salvage any quoted URLs inside an unparseable array
+                        sources = [
+                            inner.group("dzi") or inner.group("tiles")
+                            for inner in _SCRIPT_SOURCE_RE.finditer(match.group("ts"))
+                            if inner.group("ts") is None
+                        ]
+                    for source in sources:
+                        if not isinstance(source, str):
+                            tile_sources.append(source)
+                            # Object literals may point at a DZI or tile URL too;
+                            # resolve it like a bare string entry
+                            source = source.get("url") if isinstance(source, dict) else None
+                            if not isinstance(source, str):
+                                continue
+                        if source.endswith(".dzi"):
+                            tile_sources.append({"url": urljoin(base_url, source), "type": "dzi"})
+                        elif "/tiles/" in source:
+                            tile_sources.append(
+                                {"url": urljoin(base_url, source), "type": "tiles"}
+                            )
+                elif match.group("dzi"):
+                    # Pattern 2: Direct DZI URLs
+                    full_url = urljoin(base_url, match.group("dzi"))
+                    tile_sources.append({"url": full_url, "type": "dzi"})
+                else:
+                    # Pattern 3: Tile URL patterns
+                    full_url = urljoin(base_url, match.group("tiles"))
+                    tile_sources.append({"url": full_url, "type": "tiles"})
 
         # Look for data attributes
         for element in soup.find_all(attrs={"data-dzi": True}):
@@ -453,7 +599,7 @@ class OpenSeadragonDetector:
                 full_url = urljoin(base_url, dzi_url)
                 tile_sources.append({"url": full_url, "type": "dzi"})
 
-        return tile_sources
+        return _dedupe_sources(tile_sources)
 
     def _find_dzi_urls(self, driver, performance_logs=None) -> Tuple[List[Dict[str, Any]], List]:
         """Find DZI URLs from network requests.
@@ -479,7 +625,7 @@ class OpenSeadragonDetector:
         except Exception:
             pass
 
-        return tile_sources, performance_logs
+        return _dedupe_sources(tile_sources), performance_logs
 
     def _get_driver(self):
         """Get or create Selenium WebDriver."""
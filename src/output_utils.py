@@ -1,10 +1,28 @@
 """Utilities for pretty output display in the CLI."""
 
+import functools
 import os
 import sys
+from operator import attrgetter
 from pathlib import Path
+from types import MappingProxyType
 from typing import List, Optional, Tuple
 
+# Icons shown next to files in the output tree, keyed by lowercase suffix
+_FILE_ICONS = MappingProxyType(
+    {
+        ".jpg": "🖼️",
+        ".jpeg": "🖼️",
+        ".png": "🖼️",
+        ".md": "📝",
+        ".json": "📊",
+        ".txt": "📄",
+        ".html": "🌐",
+        ".pdf": "📕",
+    }
+)
+_DEFAULT_FILE_ICON = "📄"
+
 
 def make_clickable_link(path: Path, text: Optional[str] = None) -> str:
     """Create a clickable file:// link for terminals that support it.
@@ -36,28 +54,22 @@ def format_file_tree(base_dir: Path, files: List[Path], use_links: bool = True)
     Returns:
         Formatted tree string
     """
-    lines = []
+    link_files = use_links and is_terminal_link_supported()
+
+    # Stat every file once up front instead of once per rendered row
+    size_strs = {file_path: _file_size_suffix(file_path) for file_path in files}
 
     # Group files by subdirectory
     file_groups = {}
     for file_path in files:
-        rel_path = file_path.relative_to(base_dir)
-        parts = rel_path.parts
-
-        if len(parts) == 1:
-            # File in root
-            if "" not in file_groups:
-                file_groups[""] = []
-            file_groups[""].append(file_path)
-        else:
-            # File in subdirectory
-            subdir = parts[0]
-            if subdir not in file_groups:
-                file_groups[subdir] = []
-            file_groups[subdir].append(file_path)
+        parts = file_path.relative_to(base_dir).parts
+        # Files in the root directory are grouped under ""
+        subdir = parts[0] if len(parts) > 1 else ""
+        file_groups.setdefault(subdir, []).append(file_path)
 
     # Sort groups
     sorted_groups = sorted(file_groups.items())
+    lines = []
 
     for i, (subdir, group_files) in enumerate(sorted_groups):
         is_last_group = i == len(sorted_groups) - 1
@@ -66,67 +78,40 @@ def format_file_tree(base_dir: Path, files: List[Path], use_links: bool = True)
             # Subdirectory
             prefix = "└── " if is_last_group else "├── "
             lines.append(f"{prefix}📁 {subdir}/")
-
-            # Files in subdirectory
-            for j, file_path in enumerate(sorted(group_files)):
-                is_last_file = j == len(group_files) - 1
-                indent = "    " if is_last_group else "│   "
-                file_prefix = "└── " if is_last_file else "├── "
-
-                # Choose icon based on file extension
-                icon = get_file_icon(file_path)
-
-                # Format filename
-                filename = file_path.name
-                if use_links and is_terminal_link_supported():
-                    filename = make_clickable_link(file_path, filename)
-
-                # Add file size
-                try:
-                    size = format_file_size(file_path.stat().st_size)
-                    size_str = f" ({size})"
-                except (OSError, IOError):
-                    size_str = ""
-                lines.append(f"{indent}{file_prefix}{icon} {filename}{size_str}")
+            indent = "    " if is_last_group else "│   "
         else:
             # Files in root directory
-            for j, file_path in enumerate(sorted(group_files)):
-                is_last_file = j == len(group_files) - 1 and is_last_group
-                file_prefix = "└── " if is_last_file else "├── "
-
-                # Choose icon based on file extension
-                icon = get_file_icon(file_path)
-
-                # Format filename
-                filename = file_path.name
-                if use_links and is_terminal_link_supported():
-                    filename = make_clickable_link(file_path, filename)
-
-                # Add file size
-                try:
-                    size = format_file_size(file_path.stat().st_size)
-                    size_str = f" ({size})"
-                except (OSError, IOError):
-                    size_str = ""
-                lines.append(f"{file_prefix}{icon} {filename}{size_str}")
+            indent = ""
+
+        group_files = sorted(group_files, key=attrgetter("name"))
+        for j, file_path in enumerate(group_files):
+            is_last_file = j == len(group_files) - 1 and (bool(subdir) or is_last_group)
+            file_prefix = "└── " if is_last_file else "├── "
+
+            # Choose icon based on file extension
+            icon = get_file_icon(file_path)
+
+            # Format filename
+            filename = file_path.name
+            if link_files:
+                filename = make_clickable_link(file_path, filename)
+
+            lines.append(f"{indent}{file_prefix}{icon} {filename}{size_strs[file_path]}")
 
     return "\n".join(lines)
 
 
+def _file_size_suffix(path: Path) -> str:
+    """Return a " (size)" suffix for a file, or "" if it cannot be stat'ed."""
+    try:
+        return f" ({format_file_size(path.stat().st_size)})"
+    except (OSError, IOError):
+        return ""
+
+
 def get_file_icon(path: Path) -> str:
     """Get an appropriate icon for a file based on its extension."""
-    ext = path.suffix.lower()
-    icons = {
-        ".jpg": "🖼️",
-        ".jpeg": "🖼️",
-        ".png": "🖼️",
-        ".md": "📝",
-        ".json": "📊",
-        ".txt": "📄",
-        ".html": "🌐",
-        ".pdf": "📕",
-    }
-    return icons.get(ext, "📄")
+    return _FILE_ICONS.get(path.suffix.lower(), _DEFAULT_FILE_ICON)
 
 
 def format_file_size(size: int) -> str:
@@ -138,8 +123,12 @@ def format_file_size(size: int) -> str:
     return f"{size:.1f} TB"
 
 
+@functools.lru_cache(maxsize=1)
 def is_terminal_link_supported() -> bool:
-    """Check if the terminal supports clickable links."""
+    """Check if the terminal supports clickable links.
+
+    The result is cached since the environment does not change during a run.
+    """
     # Check common terminal environment variables
     term = os.environ.get("TERM", "")
     term_program = os.environ.get("TERM_PROGRAM", "")
@@ -155,7 +144,7 @@ def is_terminal_link_supported() -> bool:
     ]
 
     # Check if running in VS Code terminal
-    if "VSCODE_" in str(os.environ):
+    if any(key.startswith("VSCODE_") for key in os.environ):
         return True
 
     # Check terminal program
@@ -181,37 +170,39 @@ def show_output_summary(output_dir: Path, files_created: List[Tuple[str, Path]],
     if not files_created:
         return
 
-    print("\n📦 Output Summary:")
-    print(f"📍 Location: {output_dir}")
+    out = ["\n📦 Output Summary:", f"📍 Location: {output_dir}"]
 
     # If terminal supports it, make the directory clickable
     if is_terminal_link_supported() and sys.platform == "darwin":
         # macOS specific - open in Finder
         finder_link = f"\033]8;;file://{output_dir.absolute()}\033\\Open in Finder\033]8;;\033\\"
-        print(f"   {finder_link}")
+        out.append(f"   {finder_link}")
 
-    print("\n📂 Files created:")
+    out.append("\n📂 Files created:")
 
     # Create tree view
     file_paths = [path for _, path in files_created]
     tree = format_file_tree(output_dir, file_paths)
-    for line in tree.split("\n"):
-        print(f"   {line}")
-    
+    out.extend(f"   {line}" for line in tree.split("\n"))
+
     # Show cache status if applicable
     if cached_image:
-        print("\n💾 Cache Status:")
-        print("   • Image loaded from cache (no download needed)")
+        out.append("\n💾 Cache Status:")
+        out.append("   • Image loaded from cache (no download needed)")
 
     # Add quick open command for convenience
-    print("\n💡 Quick actions:")
+    out.append("\n💡 Quick actions:")
     if sys.platform == "darwin":
-        print(f'   • Open folder: open "{output_dir}"')
+        out.append(f'   • Open folder: open "{output_dir}"')
         # Show individual file open commands for key files
         for desc, path in files_created:
             if path.suffix in [".md", ".jpg", ".jpeg", ".png"]:
-                print(f'   • View {desc.lower()}: open "{path}"')
+                out.append(f'   • View {desc.lower()}: open "{path}"')
     elif sys.platform.startswith("linux"):
-        print(f'   • Open folder: xdg-open "{output_dir}"')
+        out.append(f'   • Open folder: xdg-open "{output_dir}"')
     elif sys.platform == "win32":
-        print(f'   • Open folder: explorer "{output_dir}"')
+        out.append(f'   • Open folder: explorer "{output_dir}"')
+
+    # Emit everything in one write rather than one print per line
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
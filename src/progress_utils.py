@@ -1,6 +1,7 @@
 """Progress bar utilities using alive-progress for JSP CLI tool."""
 
 import sys
+import threading
 from contextlib import contextmanager
 from typing import Optional, Union
 
@@ -56,7 +57,14 @@ def configure_alive_progress():
 
 
 class AliveProgressCallback(ProgressCallback):
-    """Progress callback implementation using alive-progress for tile downloads."""
+    """Progress callback implementation using alive-progress for tile downloads.
+
+    Tile completions only bump counters under a short lock; a background thread
+    advances the bar in bulk so download workers never wait on the bar itself.
+    """
+
+    # Seconds between progress bar refreshes
+    REFRESH_INTERVAL = 0.05
 
     def __init__(self, description: str = "Downloading tiles", theme: dict = None):
         """Initialize the progress callback.
@@ -73,6 +81,10 @@ class AliveProgressCallback(ProgressCallback):
         self.failed_tiles = 0
         self._bar = None
         self._bar_context = None
+        self._counts_lock = threading.Lock()
+        self._shown = 0
+        self._done = threading.Event()
+        self._ui_thread = None
 
     def on_start(self, total_tiles: int) -> None:
         """Called when tile downloading starts."""
@@ -80,6 +92,8 @@ class AliveProgressCallback(ProgressCallback):
         self.completed_tiles = 0
         self.successful_tiles = 0
         self.failed_tiles = 0
+        self._shown = 0
+        self._done.clear()
 
         # Create alive_bar context
         self._bar_context = alive_bar(
@@ -92,20 +106,39 @@ class AliveProgressCallback(ProgressCallback):
         )
         self._bar = self._bar_context.__enter__()
 
+        self._ui_thread = threading.Thread(target=self._pump, daemon=True)
+        self._ui_thread.start()
+
     def on_tile_complete(self, tile_num: int, success: bool) -> None:
         """Called when a tile download completes."""
-        self.completed_tiles = tile_num
-        if success:
-            self.successful_tiles += 1
-        else:
-            self.failed_tiles += 1
-
-        # Update the progress bar
-        if self._bar:
-            self._bar()
+        # Called from every download worker; += is not atomic on its own
+        with self._counts_lock:
+            self.completed_tiles += 1
+            if success:
+                self.successful_tiles += 1
+            else:
+                self.failed_tiles += 1
+
+    def _pump(self) -> None:
+        """Advance the progress bar from the counters until downloading finishes."""
+        while not self._done.wait(self.REFRESH_INTERVAL):
+            self._advance_bar()
+        self._advance_bar()
+
+    def _advance_bar(self) -> None:
+        """Advance the bar by the number of tiles completed since the last refresh."""
+        pending = self.completed_tiles - self._shown
+        if pending > 0 and self._bar:
+            self._bar(pending)
+            self._shown += pending
 
     def on_complete(self) -> None:
         """Called when all tile downloads are complete."""
+        self._done.set()
+        if self._ui_thread:
+            self._ui_thread.join()
+            self._ui_thread = None
+
         if self._bar_context:
             self._bar_context.__exit__(None, None, None)
             self._bar = None
@@ -1,21 +1,67 @@
 """Advanced source note extraction for JSP pages."""
 
 import re
-import warnings
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Iterator, List, Optional, Tuple
 
-from bs4 import BeautifulSoup, NavigableString, Tag
-
-# Suppress the BeautifulSoup ':contains' deprecation warning
-warnings.filterwarnings("ignore", message="The pseudo class ':contains' is deprecated")
+from lxml import etree
 
 try:
+    from .html_utils import class_set, element_text, has_class
     from .models import Footnote, Link, Paragraph, Popup, PopupReference, Sentence, SourceNote
 except ImportError:
+    from html_utils import class_set, element_text, has_class
     from models import Footnote, Link, Paragraph, Popup, PopupReference, Sentence, SourceNote
 
-
-def extract_popup_data(popup_elem: Tag) -> Optional[Popup]:
+# Compiled XPath expressions, evaluated in C by lxml
+_SOURCE_NOTE_DRAWER = etree.XPath("(//details[@data-testid='drawer-SourceNote-drawer'])[1]")
+_SOURCE_NOTE_BY_HEADING = etree.XPath("(//details[.//h3[contains(., 'Source Note')]])[1]")
+_H3 = etree.XPath("//h3")
+_DRAWER_CONTENT = etree.XPath(f"(.//div[{has_class('drawerContent')}])[1]")
+_SOURCE_NOTE_WYSIWYG = etree.XPath("(.//div[@id='source-note-wysiwyg'])[1]")
+_WASPTAG_DIVS = etree.XPath(f".//div[{has_class('wasptag')}]")
+
+_POPUP_CONTENT = etree.XPath(f"(.//div[{has_class('popup-content')}])[1]")
+_HIDDEN_INPUT = etree.XPath("(.//input[@type='hidden'])[1]")
+_FIRST_P = etree.XPath("(.//p)[1]")
+_MORE_LINK = etree.XPath(f"(.//a[{has_class('more')}])[1]")
+_EXTERNAL_LINKS = etree.XPath(f".//a[{has_class('externalLink')}]")
+_REFERENCE_LINK = etree.XPath(f"(.//a[{has_class('reference')}])[1]")
+
+# Popups, footnote markers or links: one descendant scan decides whether a
+# paragraph needs the full rendering walk
+_HAS_MARKUP = etree.XPath(
+    "boolean(.//*["
+    f"(self::aside and {has_class('popup-wrapper')})"
+    f" or (self::a and ({has_class('editorial-note-static')} or {has_class('externalLink')}))"
+    "])"
+)
+
+_FOOTNOTE_LIST = etree.XPath(
+    "(.//ol[contains(@class, 'footnote') or contains(@class, 'fZvPgu')])[1]"
+)
+_LIST_ITEMS = etree.XPath("./li")
+_FOOTNOTE_NUMBER = etree.XPath(
+    "(.//a[contains(@class, 'footnote') or contains(@class, 'gDRSro')])[1]"
+)
+_FOOTNOTE_TEXT_DIV = etree.XPath("(.//div[contains(@class, 'bUYXhV')])[1]")
+
+_DIGIT_RE = re.compile(r"\d+")
+# Sentence boundary: terminal punctuation, whitespace, then a capital letter
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+
+
+def _first(xpath: etree.XPath, element: etree._Element) -> Optional[etree._Element]:
+    """Return the first result of a compiled XPath, or None."""
+    results = xpath(element)
+    return results[0] if results else None
+
+
+def _join_stripped(fragments: List[str]) -> str:
+    """Join text fragments the way BeautifulSoup's get_text(strip=True) does."""
+    return "".join(fragment.strip() for fragment in fragments if fragment.strip())
+
+
+def extract_popup_data(popup_elem: etree._Element) -> Optional[Popup]:
     """Extract popup data from a popup element.
 
     Args:
@@ -24,25 +70,24 @@ def extract_popup_data(popup_elem: Tag) -> Optional[Popup]:
     Returns:
         Popup object if successful, None otherwise
     """
-    popup_content = popup_elem.find("div", class_="popup-content")
-    if not popup_content:
+    popup_content = _first(_POPUP_CONTENT, popup_elem)
+    if popup_content is None:
         return None
 
     # Extract header from the title attribute or from the popup content
     header = popup_elem.get("title", "")
     if not header:
         # Try to get from input hidden value
-        hidden_input = popup_content.find("input", type="hidden")
-        if hidden_input:
+        hidden_input = _first(_HIDDEN_INPUT, popup_content)
+        if hidden_input is not None:
             header = hidden_input.get("value", "")
 
     # Extract summary
-    summary_elem = popup_content.find("p")
-    summary = summary_elem.get_text(strip=True) if summary_elem else ""
+    summary = element_text(_first(_FIRST_P, popup_content), strip=True)
 
     # Extract link
-    link_elem = popup_content.find("a", class_="more")
-    link = link_elem.get("href", "") if link_elem else ""
+    link_elem = _first(_MORE_LINK, popup_content)
+    link = link_elem.get("href", "") if link_elem is not None else ""
 
     if header and summary and link:
         return Popup(header=header, summary=summary, link=link)
@@ -50,7 +95,7 @@ def extract_popup_data(popup_elem: Tag) -> Optional[Popup]:
     return None
 
 
-def extract_links_from_text(elem: Tag) -> List[Link]:
+def extract_links_from_text(elem: etree._Element) -> List[Link]:
     """Extract all hyperlinks from an element.
 
     Args:
@@ -60,50 +105,71 @@ def extract_links_from_text(elem: Tag) -> List[Link]:
         List of Link objects
     """
     links = []
-    for link_elem in elem.find_all("a", class_="externalLink"):
-        text = link_elem.get_text(strip=True)
+    for link_elem in _EXTERNAL_LINKS(elem):
+        text = element_text(link_elem, strip=True)
         url = link_elem.get("href", "")
         if text and url:
             links.append(Link(text=text, url=url))
     return links
 
 
-def parse_footnote_text(footnote_elem: Tag) -> Tuple[str, List[Link]]:
+def parse_footnote_text(footnote_elem: etree._Element) -> Tuple[str, List[Link]]:
     """Parse footnote text and extract any links within it.
 
+    Links are rendered as [text] placeholders while walking the tree, so the
+    element is never copied or modified.
+
     Args:
         footnote_elem: The footnote element
 
     Returns:
         Tuple of (text, links)
     """
-    # Clone the element to avoid modifying the original
-    elem_copy = footnote_elem.__copy__()
-
-    # Extract links first
     links = []
-    for link_elem in elem_copy.find_all("a"):
-        text = link_elem.get_text(strip=True)
-        url = link_elem.get("href", "")
-        if text and url:
-            links.append(Link(text=text, url=url))
-            # Replace link with placeholder
-            link_elem.replace_with(f"[{text}]")
 
-    # Get the modified text
-    text = elem_copy.get_text(strip=True)
+    def render(el: etree._Element) -> List[str]:
+        """Render an element's content to text fragments."""
+        fragments = [el.text] if el.text else []
+        for child in el:
+            if child.tag == "a":
+                child_fragments = render(child)
+                text = _join_stripped(child_fragments)
+                url = child.get("href", "")
+                if text and url:
+                    links.append(Link(text=text, url=url))
+                    child_fragments = [f"[{text}]"]
+                fragments.extend(child_fragments)
+            elif isinstance(child.tag, str) and child.tag not in ("script", "style"):
+                fragments.extend(render(child))
+            if child.tail:
+                fragments.append(child.tail)
+        return fragments
+
+    text = _join_stripped(render(footnote_elem))
 
     return text, links
 
 
-def split_into_sentences(text: str) -> List[str]:
-    """Split text into sentences, handling abbreviations and special cases."""
+def split_into_sentences(text: str) -> Iterator[str]:
+    """Split text into sentences, handling abbreviations and special cases.
+
+    Sentences are yielded lazily from the boundary matches; wrap the call in
+    list() when all of them are needed.
+    """
     # Simple sentence splitting - can be improved
-    sentences = re.split(r"(?<=[.!?])\s+(?=[A-Z])", text)
-    return [s.strip() for s in sentences if s.strip()]
+    start = 0
+    for boundary in _SENTENCE_SPLIT_RE.finditer(text):
+        sentence = text[start : boundary.start()].strip()
+        if sentence:
+            yield sentence
+        start = boundary.end()
+
+    sentence = text[start:].strip()
+    if sentence:
+        yield sentence
 
 
-def parse_paragraph_content(para_elem: Tag) -> Paragraph:
+def parse_paragraph_content(para_elem: etree._Element) -> Paragraph:
     """Parse a paragraph element into structured sentences.
 
     Args:
@@ -114,133 +180,128 @@ def parse_paragraph_content(para_elem: Tag) -> Paragraph:
     """
     sentences = []
 
-    # Get the full text first
-    full_text = para_elem.get_text(strip=True)
-
-    # Check if this paragraph has popups or footnotes
-    has_popups = para_elem.find("aside", class_="popup-wrapper") is not None
-    has_footnotes = para_elem.find("a", class_="editorial-note-static") is not None
-    has_links = para_elem.find("a", class_="externalLink") is not None
+    # Check if this paragraph has popups, footnotes or links
+    if not _HAS_MARKUP(para_elem):
+        # Simple paragraph - the only text extraction is the one split into sentences
+        sentences = list(split_into_sentences(element_text(para_elem, strip=True)))
+        return Paragraph(sentences=sentences)
 
-    if not has_popups and not has_footnotes and not has_links:
-        # Simple paragraph - just split into sentences
-        sentence_texts = split_into_sentences(full_text)
-        sentences.extend(sentence_texts)
-    else:
-        # Complex paragraph - need to parse structure
-        # This is a simplified approach - in reality would need more sophisticated parsing
-
-        # Clone the element
-        para_copy = para_elem.__copy__()
-
-        # Extract popups
-        popup_refs = []
-        for popup_elem in para_copy.find_all("aside", class_="popup-wrapper"):
-            link_elem = popup_elem.find("a", class_="reference")
-            if link_elem:
-                popup_text = link_elem.get_text(strip=True)
-                popup_data = extract_popup_data(popup_elem)
+    # Complex paragraph - render the text while collecting popups, the footnote
+    # number and links, substituting placeholders for the marked-up elements
+    popup_refs = []
+    links = []
+    footnote_num = None
+
+    def render(el: etree._Element) -> List[str]:
+        """Render an element's content to text fragments."""
+        fragments = [el.text] if el.text else []
+        for child in el:
+            if isinstance(child.tag, str) and child.tag not in ("script", "style"):
+                fragments.extend(render_child(child))
+            if child.tail:
+                fragments.append(child.tail)
+        return fragments
+
+    def render_child(child: etree._Element) -> List[str]:
+        """Render a single child element, replacing popups, footnotes, links and marks."""
+        nonlocal footnote_num
+        classes = class_set(child)
+
+        if child.tag == "aside" and "popup-wrapper" in classes:
+            # Extract popups
+            link_elem = _first(_REFERENCE_LINK, child)
+            if link_elem is not None:
+                popup_data = extract_popup_data(child)
                 if popup_data:
+                    popup_text = element_text(link_elem, strip=True)
                     popup_refs.append(PopupReference(text=popup_text, popup=popup_data))
                     # Replace with placeholder
-                    popup_elem.replace_with(f"[{popup_text}]")
-
-        # Extract footnotes
-        footnote_num = None
-        for fn_elem in para_copy.find_all("a", class_="editorial-note-static"):
-            fn_text = fn_elem.get_text(strip=True)
-            if fn_text.isdigit():
-                footnote_num = int(fn_text)
-                fn_elem.decompose()
-
-        # Extract links
-        links = []
-        for link_elem in para_copy.find_all("a"):
-            if "externalLink" in link_elem.get("class", []):
-                text = link_elem.get_text(strip=True)
-                url = link_elem.get("href", "")
+                    return [f"[{popup_text}]"]
+
+        elif child.tag == "a":
+            # Extract footnotes
+            if "editorial-note-static" in classes:
+                fn_text = element_text(child, strip=True)
+                if fn_text.isdigit():
+                    footnote_num = int(fn_text)
+                    return []
+
+            # Extract links
+            if "externalLink" in classes:
+                child_fragments = render(child)
+                text = _join_stripped(child_fragments)
+                url = child.get("href", "")
                 if text and url:
                     links.append(Link(text=text, url=url))
-                    link_elem.replace_with(f"[{text}]")
+                    return [f"[{text}]"]
+                return child_fragments
 
-        # Handle editorial marks before final text extraction
-        for span in para_copy.find_all("span"):
-            classes = span.get("class", [])
+        elif child.tag == "span":
+            # Handle editorial marks
             is_editorial = "editorial-comment" in classes
             is_italic = "italic" in classes
-            
+
             if is_editorial or is_italic:
-                content = span.get_text(strip=True)
+                child_fragments = render(child)
+                content = _join_stripped(child_fragments)
                 if content:
                     if is_editorial and is_italic:
                         # Both editorial comment and italic
-                        span.replace_with(f"*[{content}]*")
+                        return [f"*[{content}]*"]
                     elif is_editorial:
                         # Just editorial comment
-                        span.replace_with(f"[{content}]")
-                    elif is_italic:
+                        return [f"[{content}]"]
+                    else:
                         # Just italic
-                        span.replace_with(f"*{content}*")
+                        return [f"*{content}*"]
+                return child_fragments
+
+        return render(child)
 
-        # Get the modified text - use separator to preserve spaces between elements
-        text = para_copy.get_text(separator='', strip=False).strip()
+    text = "".join(render(para_elem)).strip()
 
-        # Create sentence object
-        if popup_refs or links or footnote_num is not None:
-            sentence = Sentence(text=text, popups=popup_refs, links=links, footnote=footnote_num)
-            sentences.append(sentence)
-        else:
-            sentences.append(text)
+    # Create sentence object
+    if popup_refs or links or footnote_num is not None:
+        sentences.append(
+            Sentence(text=text, popups=popup_refs, links=links, footnote=footnote_num)
+        )
+    else:
+        sentences.append(text)
 
     return Paragraph(sentences=sentences)
 
 
-def extract_source_note_advanced(soup: BeautifulSoup) -> Optional[SourceNote]:
+def extract_source_note_advanced(root: etree._Element) -> Optional[SourceNote]:
     """Extract source note with full structured data.
 
     Args:
-        soup: BeautifulSoup parsed HTML
+        root: lxml root element of the parsed page
 
     Returns:
         SourceNote object if found, None otherwise
     """
     # Find the source note section
-    source_note_elem = None
-
-    # Try different selectors
-    selectors = [
-        'details[data-testid="drawer-SourceNote-drawer"]',
-        'details:has(h3:contains("Source Note"))',
-    ]
-
-    for selector in selectors:
-        try:
-            source_note_elem = soup.select_one(selector)
-            if source_note_elem:
-                break
-        except:
-            continue
-
-    if not source_note_elem:
+    source_note_elem = _first(_SOURCE_NOTE_DRAWER, root)
+    if source_note_elem is None:
+        source_note_elem = _first(_SOURCE_NOTE_BY_HEADING, root)
+
+    if source_note_elem is None:
         # Try text-based search
-        for h3 in soup.find_all("h3"):
-            if "Source Note" in h3.get_text(strip=True):
-                parent = h3.parent
-                while parent and parent.name != "details":
-                    parent = parent.parent
-                if parent:
-                    source_note_elem = parent
+        for h3 in _H3(root):
+            if "Source Note" in element_text(h3, strip=True):
+                source_note_elem = next(h3.iterancestors("details"), None)
+                if source_note_elem is not None:
                     break
 
-    if not source_note_elem:
+    if source_note_elem is None:
         return None
 
     # Find content area
-    content_area = source_note_elem.find("div", class_="drawerContent")
-    if not content_area:
-        content_area = source_note_elem.find("div", id="source-note-wysiwyg")
+    content_area = _first(_DRAWER_CONTENT, source_note_elem)
+    if content_area is None:
+        content_area = _first(_SOURCE_NOTE_WYSIWYG, source_note_elem)
 
-    if not content_area:
+    if content_area is None:
         return None
 
     # Extract title - combine the first paragraph's content as the title
@@ -248,31 +309,29 @@ def extract_source_note_advanced(soup: BeautifulSoup) -> Optional[SourceNote]:
 
     # Extract paragraphs
     paragraphs = []
-    para_elems = content_area.find_all("div", class_="wasptag")
-
-    for para_elem in para_elems:
+    for para_elem in _WASPTAG_DIVS(content_area):
         paragraph = parse_paragraph_content(para_elem)
         if paragraph.sentences:
             paragraphs.append(paragraph)
 
     # Extract footnotes
     footnotes = []
-    footnote_list = content_area.find("ol", class_=re.compile("footnote|fZvPgu"))
-    if footnote_list:
-        for li in footnote_list.find_all("li"):
+    footnote_list = _first(_FOOTNOTE_LIST, content_area)
+    if footnote_list is not None:
+        for li in _LIST_ITEMS(footnote_list):
             # Get footnote number
-            number_elem = li.find("a", class_=re.compile("footnote|gDRSro"))
-            if number_elem:
+            number_elem = _first(_FOOTNOTE_NUMBER, li)
+            if number_elem is not None:
                 try:
-                    number = int(re.search(r"\d+", number_elem.get_text()).group())
+                    number = int(_DIGIT_RE.search(element_text(number_elem)).group())
                     html_id = number_elem.get("href", "").lstrip("#")
 
                     # Get footnote text and links
-                    text_div = li.find("div", class_=re.compile("bUYXhV"))
-                    if text_div:
+                    text_div = _first(_FOOTNOTE_TEXT_DIV, li)
+                    if text_div is not None:
                         # Get first paragraph only (main footnote text)
-                        first_p = text_div.find("p")
-                        if first_p:
+                        first_p = _first(_FIRST_P, text_div)
+                        if first_p is not None:
                             text, links = parse_footnote_text(first_p)
                             footnote = Footnote(
                                 number=number,
@@ -281,7 +340,7 @@ def extract_source_note_advanced(soup: BeautifulSoup) -> Optional[SourceNote]:
                                 id=html_id if html_id else None,
                             )
                             footnotes.append(footnote)
-                except:
+                except Exception:
                     continue
 
     # Try to construct a better title from the first paragraph
@@ -1,16 +1,35 @@
 """Tile stitcher for combining downloaded tiles into complete images."""
 
 import logging
+import os
+import re
+import struct
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, List, Optional, Tuple
 
-from PIL import Image
+from PIL import Image, ImageChops
 
 from .tile_manager import ProgressCallback, TileInfo
 
 logger = logging.getLogger(__name__)
 
+# Tile filenames as written by TileManager: col_row.jpg
+_TILE_FILENAME_RE = re.compile(r"(\d+)_(\d+)\.jpg")
+_JPEG_HEADER_READ_SIZE = 64 * 1024
+# Start-of-frame markers carrying the image dimensions (DHT, JPG and DAC excluded)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Previews are first shrunk by an integer factor with Image.reduce (box
+# averaging) to within 2x of their size, then finished with bilinear
+# resampling; at preview scale this matches LANCZOS after JPEG compression
+_PREVIEW_REDUCING_GAP = 2.0
+_TILE_COL = attrgetter("col")
+_TILE_ROW = attrgetter("row")
+_ROW_MAJOR = attrgetter("row", "col")
+
 # Import AliveStitchProgressCallback if available
 try:
     from .progress_utils import AliveStitchProgressCallback
@@ -34,6 +53,20 @@ class TileGroup:
     total_width: int
     total_height: int
 
+    def missing_positions(self) -> List[Tuple[int, int]]:
+        """Get the grid positions inside the group's bounds that have no tile.
+
+        Returns:
+            (col, row) pairs in row-major order
+        """
+        present = {(tile.col, tile.row) for tile in self.tiles if tile.path}
+        return [
+            (col, row)
+            for row in range(self.min_row, self.max_row + 1)
+            for col in range(self.min_col, self.max_col + 1)
+            if (col, row) not in present
+        ]
+
 
 class StitchError(Exception):
     """Exception raised during tile stitching."""
@@ -41,16 +74,125 @@ class StitchError(Exception):
     pass
 
 
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """Read (width, height) from the start-of-frame segment of JPEG data.
+
+    Walks the marker segments instead of decoding the image, so only the
+    header bytes are needed.
+
+    Args:
+        data: Leading bytes of a JPEG file
+
+    Returns:
+        Image size, or None if no frame header was found in the data
+    """
+    if not data.startswith(b"\xff\xd8"):
+        return None
+
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            offset += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            # Standalone markers have no length field
+            offset += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image or start of scan before any frame header
+            return None
+
+        (length,) = struct.unpack_from(">H", data, offset + 2)
+        if marker in _JPEG_SOF_MARKERS:
+            if offset + 9 > len(data):
+                return None
+            height, width = struct.unpack_from(">HH", data, offset + 5)
+            return (width, height) if width and height else None
+        offset += 2 + length
+
+    return None
+
+
+class _PngBandWriter:
+    """Write an 8-bit RGB PNG one horizontal band of rows at a time.
+
+    Rows use PNG's "Up" filter, computed in C with ImageChops, and are fed
+    through a single zlib stream so each band can be discarded once written.
+    """
+
+    _SIGNATURE = b"\x89PNG\r\n\x1a\n"
+    _FILTER_UP = b"\x02"
+
+    def __init__(self, fp: BinaryIO, width: int, height: int, compress_level: int = 9):
+        """Write the PNG header.
+
+        Args:
+            fp: Binary file object to write to
+            width: Image width in pixels
+            height: Image height in pixels
+            compress_level: zlib compression level (9 matches Pillow's optimize=True)
+        """
+        self._fp = fp
+        self._width = width
+        self._compressor = zlib.compressobj(compress_level)
+        self._prior_row = Image.new("RGB", (width, 1))
+
+        fp.write(self._SIGNATURE)
+        # Bit depth 8, color type 2 (RGB), default compression/filter, no interlace
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def write_band(self, band: Image.Image) -> None:
+        """Filter, compress and write the rows of an RGB band."""
+        # Shift the band down one row behind the last row of the previous band
+        # so subtract_modulo yields each byte minus the byte above it
+        prior = Image.new("RGB", band.size)
+        prior.paste(self._prior_row, (0, 0))
+        prior.paste(band.crop((0, 0, band.width, band.height - 1)), (0, 1))
+        self._prior_row = band.crop((0, band.height - 1, band.width, band.height))
+
+        raw = ImageChops.subtract_modulo(band, prior).tobytes()
+        stride = self._width * 3
+        scanlines = b"".join(
+            self._FILTER_UP + raw[offset : offset + stride] for offset in range(0, len(raw), stride)
+        )
+        self._write_idat(self._compressor.compress(scanlines))
+
+    def close(self) -> None:
+        """Flush the compressed stream and write the PNG trailer."""
+        self._write_idat(self._compressor.flush())
+        self._write_chunk(b"IEND", b"")
+
+    def _write_idat(self, data: bytes) -> None:
+        if data:
+            self._write_chunk(b"IDAT", data)
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes) -> None:
+        self._fp.write(struct.pack(">I", len(data)))
+        self._fp.write(chunk_type)
+        self._fp.write(data)
+        self._fp.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+
 class TileStitcher:
     """Stitches tiles into complete images."""
 
-    def __init__(self, progress_callback: Optional[ProgressCallback] = None):
+    def __init__(
+        self,
+        progress_callback: Optional[ProgressCallback] = None,
+        max_workers: Optional[int] = None,
+    ):
         """Initialize the TileStitcher.
 
         Args:
             progress_callback: Optional callback for progress updates
+            max_workers: Maximum number of threads decoding tiles (defaults to the CPU count)
         """
         self.progress_callback = progress_callback
+        self.max_workers = max_workers or os.cpu_count() or 1
         self._tile_cache = {}
 
     def stitch_tiles(
@@ -77,6 +219,9 @@ class TileStitcher:
         if not tile_dir.exists():
             raise StitchError(f"Tile directory does not exist: {tile_dir}")
 
+        # Tile sizes are cached per level for this tile directory only
+        self._tile_cache.clear()
+
         # Collect all tiles
         tiles = self._collect_tiles(tile_dir)
         if not tiles:
@@ -123,35 +268,34 @@ class TileStitcher:
         """Collect all tile information from a directory."""
         tiles = []
 
-        # Look for tiles in level subdirectories
-        for level_dir in tile_dir.iterdir():
-            if not level_dir.is_dir():
-                continue
-
-            try:
-                level = int(level_dir.name)
-            except ValueError:
-                continue
-
-            # Collect tiles from this level
-            for tile_path in level_dir.glob("*.jpg"):
-                # Parse tile filename (expected format: col_row.jpg)
-                parts = tile_path.stem.split("_")
-                if len(parts) == 2:
-                    try:
-                        col = int(parts[0])
-                        row = int(parts[1])
-                        tile_info = TileInfo(
-                            url="",  # Not needed for stitching
-                            col=col,
-                            row=row,
-                            level=level,
-                            path=tile_path,
-                            success=True,
+        # Look for tiles in level subdirectories; scandir yields names and
+        # types from one directory read, without a stat() per entry
+        with os.scandir(tile_dir) as level_entries:
+            for level_entry in level_entries:
+                if not level_entry.name.isdigit() or not level_entry.is_dir():
+                    continue
+                level = int(level_entry.name)
+
+                # Collect tiles from this level
+                with os.scandir(level_entry.path) as tile_entries:
+                    for tile_entry in tile_entries:
+                        # Parse tile filename (expected format: col_row.jpg)
+                        match = _TILE_FILENAME_RE.fullmatch(tile_entry.name)
+                        if match is None:
+                            if tile_entry.name.endswith(".jpg"):
+                                logger.warning(f"Invalid tile filename: {tile_entry.path}")
+                            continue
+
+                        tiles.append(
+                            TileInfo(
+                                url="",  # Not needed for stitching
+                                col=int(match.group(1)),
+                                row=int(match.group(2)),
+                                level=level,
+                                path=Path(tile_entry.path),
+                                success=True,
+                            )
                         )
-                        tiles.append(tile_info)
-                    except ValueError:
-                        logger.warning(f"Invalid tile filename: {tile_path}")
 
         return tiles
 
@@ -208,20 +352,23 @@ class TileStitcher:
         if not tiles:
             raise ValueError("Cannot create group from empty tile list")
 
-        # Find grid bounds
-        min_col = min(t.col for t in tiles)
-        max_col = max(t.col for t in tiles)
-        min_row = min(t.row for t in tiles)
-        max_row = max(t.row for t in tiles)
-
-        # Get tile dimensions from first tile
-        first_tile = tiles[0]
-        if first_tile.path and first_tile.path.exists():
-            with Image.open(first_tile.path) as img:
-                tile_width, tile_height = img.size
-        else:
-            # Default tile size
-            tile_width = tile_height = 256
+        # Find grid bounds; attrgetter pulls the coordinates out in C, so only
+        # the two map() passes touch the tiles and min/max scan plain lists
+        cols = list(map(_TILE_COL, tiles))
+        rows = list(map(_TILE_ROW, tiles))
+        min_col, max_col = min(cols), max(cols)
+        min_row, max_row = min(rows), max(rows)
+
+        # Get tile dimensions from first tile, once per level
+        tile_size = self._tile_cache.get(level)
+        if tile_size is None:
+            tile_size = self._read_tile_size(tiles[0])
+            if tile_size is not None:
+                self._tile_cache[level] = tile_size
+            else:
+                # Default tile size
+                tile_size = (256, 256)
+        tile_width, tile_height = tile_size
 
         # Calculate total dimensions
         num_cols = max_col - min_col + 1
@@ -242,6 +389,24 @@ class TileStitcher:
             total_height=total_height,
         )
 
+    @staticmethod
+    def _read_tile_size(tile: TileInfo) -> Optional[Tuple[int, int]]:
+        """Read a tile's dimensions, from the JPEG header when possible."""
+        if not tile.path:
+            return None
+
+        try:
+            with open(tile.path, "rb") as fp:
+                size = _jpeg_size(fp.read(_JPEG_HEADER_READ_SIZE))
+            if size is None:
+                # Not a baseline/progressive JPEG header we can parse; let PIL identify it
+                with Image.open(tile.path) as img:
+                    size = img.size
+        except OSError:
+            return None
+
+        return size
+
     def _stitch_single_image(self, tile_group: TileGroup, output_path: Path, quality: int) -> Path:
         """Stitch a single group of tiles into an image."""
         logger.info(
@@ -249,102 +414,237 @@ class TileStitcher:
             f"{tile_group.total_width}x{tile_group.total_height} image"
         )
 
-        # Create output image
-        output_image = Image.new("RGB", (tile_group.total_width, tile_group.total_height))
+        # Report gaps in the grid once, up front; they are left black
+        missing = tile_group.missing_positions()
+        if missing:
+            shown = ", ".join(f"({col}, {row})" for col, row in missing[:10])
+            more = f" and {len(missing) - 10} more" if len(missing) > 10 else ""
+            logger.warning(f"{len(missing)} missing tile(s) at {shown}{more}")
 
-        # Place each tile
-        tiles_processed = 0
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        is_large = tile_group.total_width > 2000 or tile_group.total_height > 2000
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            if output_path.suffix.lower() == ".png":
+                # Save as PNG, one row of tiles at a time
+                self._stitch_png_bands(executor, tile_group, output_path, is_large)
+                return output_path
+
+            # Preallocate the canvas once; each tile is blitted straight into it
+            output_image = Image.new("RGB", (tile_group.total_width, tile_group.total_height))
+            self._paste_tiles(
+                executor, output_image, tile_group.tiles, tile_group, tile_group.min_row, 0
+            )
+
+        # Save as JPEG (default); the encoder needs the whole image in memory.
+        # Pillow's libjpeg-turbo already encodes with SIMD; optimize=True would
+        # add a second Huffman pass (and buffer every coefficient) for ~3% smaller
+        # files, roughly tripling encode time on large mosaics
+        output_image.save(output_path, "JPEG", quality=quality)
+
+        # Create preview if image is large
+        if is_large:
+            self._create_preview(output_image, output_path)
+
+        return output_path
+
+    def _stitch_png_bands(
+        self,
+        executor: ThreadPoolExecutor,
+        tile_group: TileGroup,
+        output_path: Path,
+        create_preview: bool,
+    ) -> None:
+        """Stitch a group of tiles into a PNG, streaming one row of tiles at a time.
+
+        Only a single band of tile_height rows is held in memory, so peak usage
+        no longer grows with the height of the image.
+        """
+        tiles_by_row: Dict[int, List[TileInfo]] = {}
         for tile in tile_group.tiles:
-            if not tile.path or not tile.path.exists():
-                logger.warning(f"Missing tile at ({tile.col}, {tile.row})")
-                continue
+            tiles_by_row.setdefault(tile.row, []).append(tile)
 
-            try:
-                # Calculate position in output image
-                x = (tile.col - tile_group.min_col) * tile_group.tile_width
-                y = (tile.row - tile_group.min_row) * tile_group.tile_height
-
-                # Load and paste tile
-                with Image.open(tile.path) as tile_img:
-                    # Verify tile dimensions
-                    if tile_img.size != (tile_group.tile_width, tile_group.tile_height):
-                        # Log at debug level instead of warning to reduce noise
-                        logger.debug(
-                            f"Tile size mismatch at ({tile.col}, {tile.row}): "
-                            f"expected {tile_group.tile_width}x{tile_group.tile_height}, "
-                            f"got {tile_img.size[0]}x{tile_img.size[1]}"
-                        )
-                        # Resize if needed
-                        tile_img = tile_img.resize(
-                            (tile_group.tile_width, tile_group.tile_height),
-                            Image.Resampling.LANCZOS,
+        band_size = (tile_group.total_width, tile_group.tile_height)
+        preview = None
+        if create_preview:
+            preview_size = self._preview_size(tile_group.total_width, tile_group.total_height)
+            if preview_size:
+                preview = Image.new("RGB", preview_size)
+                ratio = preview_size[1] / tile_group.total_height
+
+        tiles_processed = 0
+        with open(output_path, "wb") as fp:
+            writer = _PngBandWriter(fp, tile_group.total_width, tile_group.total_height)
+            for row in range(tile_group.min_row, tile_group.max_row + 1):
+                band = Image.new("RGB", band_size)
+                tiles_processed = self._paste_tiles(
+                    executor, band, tiles_by_row.get(row, []), tile_group, row, tiles_processed
+                )
+                writer.write_band(band)
+
+                if preview is not None:
+                    # Shrink the band into its share of the preview's rows
+                    top = (row - tile_group.min_row) * tile_group.tile_height
+                    preview_top = round(top * ratio)
+                    preview_bottom = round((top + tile_group.tile_height) * ratio)
+                    if preview_bottom > preview_top:
+                        band = band.resize(
+                            (preview.width, preview_bottom - preview_top),
+                            Image.Resampling.BILINEAR,
+                            reducing_gap=_PREVIEW_REDUCING_GAP,
                         )
+                        preview.paste(band, (0, preview_top))
+            writer.close()
 
-                    output_image.paste(tile_img, (x, y))
+        if preview is not None:
+            try:
+                self._save_preview(preview, output_path)
+            except Exception as e:
+                logger.warning(f"Failed to create preview: {e}")
 
-                tiles_processed += 1
-                if self.progress_callback:
-                    self.progress_callback.on_tile_complete(tiles_processed, True)
+    def _paste_tiles(
+        self,
+        executor: ThreadPoolExecutor,
+        canvas: Image.Image,
+        tiles: List[TileInfo],
+        tile_group: TileGroup,
+        top_row: int,
+        tiles_processed: int,
+    ) -> int:
+        """Decode tiles on the executor and paste them into a canvas.
+
+        Args:
+            executor: Thread pool used to decode tiles
+            canvas: Image to paste the tiles into
+            tiles: Tiles to place
+            tile_group: Group the tiles belong to
+            top_row: Tile row at the canvas' top edge (min_row for a full image)
+            tiles_processed: Number of tiles already reported to the progress callback
 
+        Returns:
+            Updated number of processed tiles
+        """
+        tile_size = (tile_group.tile_width, tile_group.tile_height)
+
+        # Decode tiles on worker threads (libjpeg releases the GIL) and paste
+        # them into the canvas from this thread as they complete
+        def place_tile(future: Future, tile: TileInfo, x: int, y: int) -> None:
+            """Paste a decoded tile into the canvas and report progress."""
+            nonlocal tiles_processed
+            try:
+                tile_img = future.result()
+            except FileNotFoundError:
+                logger.warning(f"Missing tile at ({tile.col}, {tile.row})")
+                return
             except Exception as e:
                 logger.error(f"Failed to process tile at ({tile.col}, {tile.row}): {e}")
                 if self.progress_callback:
                     self.progress_callback.on_tile_complete(tiles_processed, False)
+                return
+
+            canvas.paste(tile_img, (x, y))
+            tiles_processed += 1
+            if self.progress_callback:
+                self.progress_callback.on_tile_complete(tiles_processed, True)
+
+        # Cap in-flight decodes so at most a few tiles per worker are held in memory
+        max_in_flight = self.max_workers * 2
+        pending: Dict[Future, tuple] = {}
+        # Submit in row-major order: scandir order is arbitrary, while files
+        # written row by row tend to sit together on disk and consecutive
+        # pastes then touch neighbouring canvas rows
+        for tile in sorted(tiles, key=_ROW_MAJOR):
+            if not tile.path:
+                # Reported with the other grid gaps by _stitch_single_image
+                continue
 
-        # Save output image
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        if output_path.suffix.lower() == ".png":
-            # Save as PNG
-            output_image.save(output_path, "PNG", optimize=True)
-        else:
-            # Save as JPEG (default)
-            output_image.save(output_path, "JPEG", quality=quality, optimize=True)
-
-        # Create preview if image is large
-        if tile_group.total_width > 2000 or tile_group.total_height > 2000:
-            self._create_preview(output_image, output_path)
+            # Calculate position in the canvas
+            x = (tile.col - tile_group.min_col) * tile_group.tile_width
+            y = (tile.row - top_row) * tile_group.tile_height
+            future = executor.submit(self._decode_tile, tile, tile_size)
+            pending[future] = (tile, x, y)
+
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    place_tile(future, *pending.pop(future))
+
+        for future in as_completed(pending):
+            place_tile(future, *pending[future])
+
+        return tiles_processed
+
+    @staticmethod
+    def _decode_tile(tile: TileInfo, tile_size: Tuple[int, int]) -> Image.Image:
+        """Decode a tile into memory, resized to the group's tile size if needed."""
+        with Image.open(tile.path) as tile_img:
+            # Verify tile dimensions
+            if tile_img.size != tile_size:
+                # Log at debug level instead of warning to reduce noise
+                logger.debug(
+                    f"Tile size mismatch at ({tile.col}, {tile.row}): "
+                    f"expected {tile_size[0]}x{tile_size[1]}, "
+                    f"got {tile_img.size[0]}x{tile_img.size[1]}"
+                )
+                # Let libjpeg scale oversized tiles by 1/2, 1/4 or 1/8 while
+                # decoding (no-op for other formats), then resize what remains
+                tile_img.draft("RGB", tile_size)
+                if tile_img.size == tile_size:
+                    tile_img.load()
+                    return tile_img
+                return tile_img.resize(tile_size, Image.Resampling.BILINEAR)
 
-        return output_path
+            tile_img.load()
+            return tile_img
 
     def _create_preview(self, image: Image.Image, output_path: Path) -> Optional[Path]:
         """Create a preview image for large stitched images."""
         try:
-            # Calculate preview size (max 1200px on longest side)
-            max_size = 1200
-            ratio = min(max_size / image.width, max_size / image.height)
-            if ratio < 1:
-                preview_width = int(image.width * ratio)
-                preview_height = int(image.height * ratio)
-                
+            preview_size = self._preview_size(image.width, image.height)
+            if preview_size:
                 # Handle different PIL/Pillow versions
                 try:
-                    preview = image.resize((preview_width, preview_height), Image.Resampling.LANCZOS)
+                    preview = image.resize(
+                        preview_size,
+                        Image.Resampling.BILINEAR,
+                        reducing_gap=_PREVIEW_REDUCING_GAP,
+                    )
                 except AttributeError:
                     # Fallback for older PIL versions
-                    preview = image.resize((preview_width, preview_height), Image.LANCZOS)
+                    preview = image.resize(preview_size, Image.BILINEAR)
 
-                # Save preview
-                preview_path = (
-                    output_path.parent / f"{output_path.stem}_preview{output_path.suffix}"
-                )
-                
-                # Ensure parent directory exists
-                preview_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                if output_path.suffix.lower() == ".png":
-                    preview.save(preview_path, "PNG", optimize=True)
-                else:
-                    preview.save(preview_path, "JPEG", quality=85, optimize=True)
-
-                logger.info(f"Created preview image: {preview_path}")
-                return preview_path
+                return self._save_preview(preview, output_path)
 
         except Exception as e:
             logger.warning(f"Failed to create preview: {e}")
 
         return None
 
+    @staticmethod
+    def _preview_size(width: int, height: int) -> Optional[Tuple[int, int]]:
+        """Calculate preview size (max 1200px on longest side), or None if no preview is needed."""
+        max_size = 1200
+        ratio = min(max_size / width, max_size / height)
+        if ratio < 1:
+            return int(width * ratio), int(height * ratio)
+        return None
+
+    @staticmethod
+    def _save_preview(preview: Image.Image, output_path: Path) -> Path:
+        """Save a preview image next to the stitched image."""
+        preview_path = output_path.parent / f"{output_path.stem}_preview{output_path.suffix}"
+
+        # Ensure parent directory exists
+        preview_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if output_path.suffix.lower() == ".png":
+            preview.save(preview_path, "PNG", optimize=True)
+        else:
+            preview.save(preview_path, "JPEG", quality=85, optimize=True)
+
+        logger.info(f"Created preview image: {preview_path}")
+        return preview_path
+
 
 class StitchProgressCallback(ProgressCallback):
     """Progress callback for tile stitching."""
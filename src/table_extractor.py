@@ -1,188 +1,267 @@
 """Extract tables from JSP pages."""
 
-from typing import List, Optional
-from bs4 import BeautifulSoup, Tag
-from .models import Table, TableRow, TableSection
+from typing import Dict, List, Optional
 
+from lxml import etree
 
-def extract_table(table_element: Tag) -> Optional[Table]:
+try:
+    from .html_utils import element_text, iter_previous
+    from .models import Table, TableRow, TableSection
+except ImportError:
+    from html_utils import element_text, iter_previous
+    from models import Table, TableRow, TableSection
+
+# Compiled XPath expressions, evaluated in C by lxml
+_CAPTION = etree.XPath("(.//caption)[1]")
+_ROWS = etree.XPath(".//tr")
+_HEADER_CELLS = etree.XPath(".//th")
+_DATA_CELLS = etree.XPath(".//td")
+_TABLES = etree.XPath(".//table")
+_ALL_TABLES = etree.XPath("//table")
+_TEST_ID_DRAWERS = etree.XPath("//details[@data-testid]")
+_MAIN = etree.XPath("(//main)[1]")
+_ARTICLE = etree.XPath("(//article)[1]")
+
+# Drawers whose tables form their own section, in output order
+_DRAWER_NAMES = {
+    "drawer-HistoricalIntroduction-drawer": "Historical Introduction",
+    "drawer-SourceNote-drawer": "Source Note",
+    "drawer-DocumentInformation-drawer": "Document Information",
+    "drawer-Transcription-drawer": "Transcription",
+}
+
+_HEADING_TAGS = frozenset(["h1", "h2", "h3", "h4", "h5", "h6"])
+
+
+def _first(xpath: etree.XPath, element: etree._Element) -> Optional[etree._Element]:
+    """Return the first result of a compiled XPath, or None."""
+    results = xpath(element)
+    return results[0] if results else None
+
+
+def extract_table(table_element: etree._Element) -> Optional[Table]:
     """Extract a single table from a table element.
-    
+
     Args:
-        table_element: BeautifulSoup Tag representing a <table> element
-        
+        table_element: lxml element representing a <table> element
+
     Returns:
         Table object or None if extraction fails
     """
-    if not table_element or table_element.name != "table":
+    if table_element is None or table_element.tag != "table":
         return None
-    
+
     rows = []
-    
+
     # Check for caption
     caption = None
-    caption_elem = table_element.find("caption")
-    if caption_elem:
-        caption = caption_elem.get_text(strip=True)
-    
+    caption_elem = _first(_CAPTION, table_element)
+    if caption_elem is not None:
+        caption = element_text(caption_elem, strip=True)
+
     # Extract all rows
-    for tr in table_element.find_all("tr"):
-        cells = []
-        is_header = False
-        
+    for tr in _ROWS(table_element):
         # Check if this row contains header cells
-        th_cells = tr.find_all("th")
-        if th_cells:
-            is_header = True
-            cells = [cell.get_text(strip=True) for cell in th_cells]
-        else:
-            # Regular data cells
-            td_cells = tr.find_all("td")
-            cells = [cell.get_text(strip=True) for cell in td_cells]
-        
+        th_cells = _HEADER_CELLS(tr)
+        is_header = bool(th_cells)
+        # Regular data cells otherwise
+        cells = [element_text(cell, strip=True) for cell in th_cells or _DATA_CELLS(tr)]
+
         if cells:  # Only add non-empty rows
             rows.append(TableRow(cells=cells, is_header=is_header))
-    
+
     if rows:
         return Table(rows=rows, caption=caption)
-    
+
     return None
 
 
-def find_section_title(table_element: Tag) -> Optional[str]:
+def _is_section_boundary(element: etree._Element) -> bool:
+    """Check whether an element ends the search for a table's section title."""
+    return element.tag == "details" or (
+        element.tag == "div" and "section" in (element.get("class") or "").lower()
+    )
+
+
+def find_section_title(table_element: etree._Element) -> Optional[str]:
     """Find the section title for a table by looking at preceding headers.
-    
+
     Args:
         table_element: The table element
-        
+
     Returns:
         Section title or None
     """
     # Look for preceding headers
-    for elem in table_element.find_all_previous():
-        if elem.name in ["h1", "h2", "h3", "h4", "h5", "h6"]:
-            return elem.get_text(strip=True)
+    for elem in iter_previous(table_element):
+        if elem.tag in _HEADING_TAGS:
+            return element_text(elem, strip=True)
         # Stop if we hit another major section
-        if elem.name == "details" or (elem.name == "div" and elem.get("class") and any("section" in str(c).lower() for c in elem.get("class"))):
+        if _is_section_boundary(elem):
             break
-    
+
     return None
 
 
-def extract_tables_from_drawer(drawer: Tag, drawer_name: str) -> Optional[TableSection]:
+def _find_section_titles(
+    root: etree._Element, tables: List[etree._Element]
+) -> Dict[etree._Element, Optional[str]]:
+    """Find the section title of several tables in one pass over the document.
+
+    Equivalent to calling find_section_title on each table: the nearest
+    element before a table that is either a heading or a section boundary
+    decides its title, so a single forward walk tracking the latest such
+    element replaces one backward walk per table.
+
+    Args:
+        root: Root element of the document containing the tables
+        tables: Tables to find titles for
+
+    Returns:
+        Mapping of each table to its section title (None if there is none)
+    """
+    remaining = set(tables)
+    titles = {}
+    last_heading = None
+    # Text of last_heading, extracted once however many tables follow it
+    last_title = None
+    for elem in root.iter():
+        if elem.tag in _HEADING_TAGS:
+            last_heading = elem
+            last_title = None
+        elif _is_section_boundary(elem):
+            last_heading = None
+            last_title = None
+        elif elem in remaining:
+            if last_heading is not None and last_title is None:
+                last_title = element_text(last_heading, strip=True)
+            titles[elem] = last_title
+            remaining.discard(elem)
+            if not remaining:
+                break
+
+    return titles
+
+
+def extract_tables_from_drawer(drawer: etree._Element, drawer_name: str) -> Optional[TableSection]:
     """Extract tables from a specific drawer section.
-    
+
     Args:
         drawer: The drawer details element
         drawer_name: Name of the drawer (e.g., "Historical Introduction")
-        
+
     Returns:
         TableSection or None if no tables found
     """
     tables = []
-    
+
     # Find all tables within the drawer
-    table_elements = drawer.find_all("table")
-    
-    for table_elem in table_elements:
+    for table_elem in _TABLES(drawer):
         table = extract_table(table_elem)
         if table:
             tables.append(table)
-    
+
     if tables:
         return TableSection(title=drawer_name, tables=tables)
-    
+
     return None
 
 
-def extract_table_sections(soup: BeautifulSoup) -> List[TableSection]:
+def extract_table_sections(root: etree._Element) -> List[TableSection]:
     """Extract all table sections from the page.
-    
+
     Args:
-        soup: BeautifulSoup object of the page
-        
+        root: lxml root element of the parsed page
+
     Returns:
         List of TableSection objects
     """
     sections = []
-    
+
+    # Known drawers, keyed by the first <details> with each drawer test id
+    drawer_ids = {}
+    for details in _TEST_ID_DRAWERS(root):
+        drawer_id = details.get("data-testid")
+        if drawer_id in _DRAWER_NAMES and drawer_id not in drawer_ids.values():
+            drawer_ids[details] = drawer_id
+
+    # Classify every table in one pass over its ancestors: tables in known
+    # drawers go to the drawer's section, tables outside any drawer are main
+    # content (gathered from <main>, then wysiwyg areas, then <article>)
+    drawer_tables = {drawer_id: [] for drawer_id in _DRAWER_NAMES}
+    main_content = _first(_MAIN, root)
+    article_content = _first(_ARTICLE, root)
+    in_main, in_wysiwyg, in_article = [], [], []
+    # Tables share most of their ancestors; test each <div>'s class once
+    wysiwyg_divs: Dict[etree._Element, bool] = {}
+    for table_elem in _ALL_TABLES(root):
+        in_drawer = False
+        containers = set()
+        for ancestor in table_elem.iterancestors():
+            if ancestor.tag == "details":
+                in_drawer = True
+                if ancestor in drawer_ids:
+                    drawer_tables[drawer_ids[ancestor]].append(table_elem)
+            elif ancestor is main_content:
+                containers.add("main")
+            elif ancestor is article_content:
+                containers.add("article")
+            elif ancestor.tag == "div":
+                is_wysiwyg = wysiwyg_divs.get(ancestor)
+                if is_wysiwyg is None:
+                    is_wysiwyg = "wysiwyg" in (ancestor.get("class") or "").lower()
+                    wysiwyg_divs[ancestor] = is_wysiwyg
+                if is_wysiwyg:
+                    containers.add("wysiwyg")
+
+        if in_drawer:
+            continue
+        if "main" in containers:
+            in_main.append(table_elem)
+        elif "wysiwyg" in containers:
+            in_wysiwyg.append(table_elem)
+        elif "article" in containers:
+            in_article.append(table_elem)
+
     # Check known drawer sections for tables
-    drawer_mappings = {
-        'drawer-HistoricalIntroduction-drawer': 'Historical Introduction',
-        'drawer-SourceNote-drawer': 'Source Note',
-        'drawer-DocumentInformation-drawer': 'Document Information',
-        'drawer-Transcription-drawer': 'Transcription',
-    }
-    
-    for drawer_id, drawer_name in drawer_mappings.items():
-        drawer = soup.find("details", {"data-testid": drawer_id})
-        if drawer:
-            table_section = extract_tables_from_drawer(drawer, drawer_name)
-            if table_section:
-                sections.append(table_section)
-    
-    # Also check for tables in main content (not in drawers)
-    # Look for tables in various content areas
-    all_tables = []
-    
-    # Try different content containers
-    main_content = soup.find("main")
-    if main_content:
-        all_tables.extend(main_content.find_all("table"))
-    
-    # Also check wysiwyg content areas (common in JSP pages)
-    wysiwyg_areas = soup.find_all("div", class_=lambda x: x and "wysiwyg" in str(x).lower())
-    for area in wysiwyg_areas:
-        all_tables.extend(area.find_all("table"))
-    
-    # Also check article content
-    article_content = soup.find("article")
-    if article_content:
-        all_tables.extend(article_content.find_all("table"))
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_tables = []
-    for table in all_tables:
-        if table not in seen:
-            seen.add(table)
-            unique_tables.append(table)
-    
-    if unique_tables:
-        # Collect all tables that are inside drawers
-        drawer_tables = []
-        for details in soup.find_all("details"):
-            drawer_tables.extend(details.find_all("table"))
-        
-        # Process tables that are not in drawers
-        main_tables = [t for t in unique_tables if t not in drawer_tables]
-        
+    for drawer_id, drawer_name in _DRAWER_NAMES.items():
+        tables = [table for table in map(extract_table, drawer_tables[drawer_id]) if table]
+        if tables:
+            sections.append(TableSection(title=drawer_name, tables=tables))
+
+    main_tables = in_main + in_wysiwyg + in_article
+    if main_tables:
+        section_titles = _find_section_titles(root, main_tables)
+
         # Group main content tables by their section
         current_section_tables = []
         current_section_title = None
-        
+
         for table_elem in main_tables:
             table = extract_table(table_elem)
             if table:
-                # Try to find section title
-                title = find_section_title(table_elem)
-                
+                title = section_titles.get(table_elem)
+
                 # If we found a new section title and have accumulated tables, create a section
                 if title != current_section_title and current_section_tables:
-                    sections.append(TableSection(
-                        title=current_section_title or "Main Content",
-                        tables=current_section_tables
-                    ))
+                    sections.append(
+                        TableSection(
+                            title=current_section_title or "Main Content",
+                            tables=current_section_tables,
+                        )
+                    )
                     current_section_tables = []
-                
+
                 current_section_title = title
                 current_section_tables.append(table)
-        
+
         # Don't forget the last section
         if current_section_tables:
-            sections.append(TableSection(
-                title=current_section_title or "Main Content",
-                tables=current_section_tables
-            ))
-    
-    return sections
\ No newline at end of file
+            sections.append(
+                TableSection(
+                    title=current_section_title or "Main Content",
+                    tables=current_section_tables,
+                )
+            )
+
+    return sections
@@ -1,22 +1,38 @@
 """Tile download manager for OpenSeadragon images."""
 
+import ctypes
+import hashlib
 import logging
+import os
+import shutil
+import sys
 import tempfile
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional, Protocol
+from typing import Dict, List, Optional, Protocol
 
 import requests
 from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 from urllib3.util.retry import Retry
 
 from .openseadragon import OpenSeadragonConfig
 
 logger = logging.getLogger(__name__)
 
+# Windows file attribute telling the cache manager to avoid writing a file
+# back to disk while it fits in memory
+_FILE_ATTRIBUTE_TEMPORARY = 0x100
+
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Environment variable overriding the location of the persistent tile cache
+TILE_CACHE_ENV_VAR = "JSP_TILE_CACHE"
+
 # Import AliveProgressCallback if available
 try:
     from .progress_utils import AliveProgressCallback
@@ -49,9 +65,12 @@ class ProgressCallback(Protocol):
         ...
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class TileInfo:
-    """Information about a single tile."""
+    """Information about a single tile.
+
+    Slotted where supported, as a download can hold thousands of tiles.
+    """
 
     url: str
     col: int
@@ -63,6 +82,39 @@ class TileInfo:
     error: Optional[str] = None
 
 
+def default_tile_cache_dir() -> Path:
+    """Get the directory of the persistent tile cache.
+
+    Returns:
+        The path in the JSP_TILE_CACHE environment variable if set,
+        otherwise ~/.cache/jsp/tiles
+    """
+    cache_dir = os.environ.get(TILE_CACHE_ENV_VAR)
+    if cache_dir:
+        return Path(cache_dir)
+    return Path.home() / ".cache" / "jsp" / "tiles"
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """Hard link a file, copying it when linking is not possible (e.g. across devices)."""
+    try:
+        os.link(source, destination)
+    except FileExistsError:
+        raise
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def _mark_temporary(path: Path) -> None:
+    """Flag a tile file as short-lived so the OS can keep it in memory.
+
+    Tiles are read back once by the stitcher and then deleted with their
+    directory. Only Windows has such a per-file flag; elsewhere this is a no-op.
+    """
+    if sys.platform == "win32":
+        ctypes.windll.kernel32.SetFileAttributesW(str(path), _FILE_ATTRIBUTE_TEMPORARY)
+
+
 class TileDownloadError(Exception):
     """Base exception for tile download errors."""
 
@@ -77,8 +129,9 @@ class TileManager:
         max_workers: int = 5,
         max_retries: int = 3,
         timeout: int = 30,
-        chunk_size: int = 8192,
+        chunk_size: int = 64 * 1024,
         progress_callback: Optional[ProgressCallback] = None,
+        cache_dir: Optional[Path] = None,
     ):
         """Initialize TileManager.
 
@@ -86,14 +139,17 @@ class TileManager:
             max_workers: Maximum number of concurrent downloads
             max_retries: Maximum retry attempts per tile
             timeout: Request timeout in seconds
-            chunk_size: Size of chunks for streaming downloads
+            chunk_size: Size of the reads used to stream a tile to disk
             progress_callback: Optional callback for progress updates
+            cache_dir: Directory of a persistent tile cache shared across runs,
+                keyed by tile URL; None disables caching
         """
         self.max_workers = max_workers
         self.max_retries = max_retries
         self.timeout = timeout
         self.chunk_size = chunk_size
         self.progress_callback = progress_callback
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
         self._session = self._create_session()
         self._tile_counter = 0
         self._failed_tiles = []
@@ -110,10 +166,13 @@ class TileManager:
             allowed_methods=["GET", "HEAD"],
         )
 
+        # One connection per worker; with pool_block a thread waits for a free
+        # connection instead of opening (and later discarding) an extra one
         adapter = HTTPAdapter(
             max_retries=retry_strategy,
             pool_connections=self.max_workers,
             pool_maxsize=self.max_workers,
+            pool_block=True,
         )
 
         session.mount("http://", adapter)
@@ -191,8 +250,6 @@ class TileManager:
 
         except Exception as e:
             # Clean up on error
-            import shutil
-
             shutil.rmtree(temp_path, ignore_errors=True)
             raise TileDownloadError(f"Failed to download tiles: {e}")
 
@@ -212,13 +269,22 @@ class TileManager:
                 tiles.extend(self._get_tiles_for_level(config, highest_level))
 
         elif quality_mode == QualityMode.ALL:
-            # Get tiles from all levels
-            for level in range(20):  # Check up to level 20
-                level_tiles = self._get_tiles_for_level(config, level)
-                if level_tiles:
+            # Get tiles from all levels, up to the first level without tiles.
+            # Listing a level may probe the server, so levels are listed
+            # concurrently and consumed in order.
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(self._get_tiles_for_level, config, level)
+                    for level in range(20)  # Check up to level 20
+                ]
+                for future in futures:
+                    level_tiles = future.result()
+                    if not level_tiles:
+                        # No more levels available; drop the listings not yet started
+                        for pending in futures:
+                            pending.cancel()
+                        break
                     tiles.extend(level_tiles)
-                else:
-                    break  # No more levels available
 
         elif quality_mode == QualityMode.SPECIFIC:
             # Get tiles from specific level
@@ -227,23 +293,39 @@ class TileManager:
         return tiles
 
     def _find_highest_level(self, config: OpenSeadragonConfig) -> Optional[int]:
-        """Find the highest available zoom level."""
+        """Find the highest available zoom level.
+
+        Levels are probed concurrently on the session's connection pool, so a
+        missing level costs a share of a round trip rather than a full one.
+        """
         # Start from a reasonable high level and work down
-        for level in range(20, -1, -1):
-            tile_urls = config.get_tile_urls(level=level)
-            if tile_urls:
-                # Test if first tile exists
-                test_url = tile_urls[0][0]
-                try:
-                    response = self._session.head(test_url, timeout=5)
-                    if response.status_code == 200:
-                        logger.info(f"Found highest level: {level}")
-                        return level
-                except Exception:
-                    pass
+        levels = range(20, -1, -1)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._level_exists, config, level) for level in levels]
+            for level, future in zip(levels, futures):
+                if future.result():
+                    logger.info(f"Found highest level: {level}")
+                    # Lower levels no longer matter; drop the probes not yet started
+                    for pending in futures:
+                        pending.cancel()
+                    return level
 
         return None
 
+    def _level_exists(self, config: OpenSeadragonConfig, level: int) -> bool:
+        """Check whether the first tile of a zoom level exists."""
+        tile_urls = config.get_tile_urls(level=level)
+        if not tile_urls:
+            return False
+
+        # Test if first tile exists
+        test_url = tile_urls[0][0]
+        try:
+            response = self._session.head(test_url, timeout=5)
+            return response.status_code == 200
+        except Exception:
+            return False
+
     def _get_tiles_for_level(self, config: OpenSeadragonConfig, level: int) -> List[TileInfo]:
         """Get tile information for a specific zoom level."""
         tiles = []
@@ -259,38 +341,45 @@ class TileManager:
         self._tile_counter = 0
         self._failed_tiles = []
 
+        # Create level directories, one per zoom level
+        level_dirs = {level: output_dir / str(level) for level in {tile.level for tile in tiles}}
+        for level_dir in level_dirs.values():
+            level_dir.mkdir(exist_ok=True)
+
+        # Keep a bounded number of downloads queued so results are handled as
+        # they arrive, rather than holding a future for every tile up front
+        max_in_flight = self.max_workers * 2
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Create level directories
-            level_dirs = {}
+            pending: Dict[Future, TileInfo] = {}
             for tile in tiles:
-                if tile.level not in level_dirs:
-                    level_dir = output_dir / str(tile.level)
-                    level_dir.mkdir(exist_ok=True)
-                    level_dirs[tile.level] = level_dir
-
-            # Submit download tasks
-            future_to_tile = {
-                executor.submit(self._download_single_tile, tile, level_dirs[tile.level]): tile
-                for tile in tiles
-            }
-
-            # Process completed downloads
-            for future in as_completed(future_to_tile):
-                tile = future_to_tile[future]
-                try:
-                    success = future.result()
-                    tile.success = success
-                    if not success:
-                        self._failed_tiles.append(tile)
-                except Exception as e:
-                    logger.error(f"Error downloading tile {tile.col}_{tile.row}: {e}")
-                    tile.success = False
-                    tile.error = str(e)
-                    self._failed_tiles.append(tile)
-                finally:
-                    self._tile_counter += 1
-                    if self.progress_callback:
-                        self.progress_callback.on_tile_complete(self._tile_counter, tile.success)
+                future = executor.submit(self._download_single_tile, tile, level_dirs[tile.level])
+                pending[future] = tile
+
+                if len(pending) >= max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._record_download(future, pending.pop(future))
+
+            # Process the remaining downloads
+            for future in as_completed(pending):
+                self._record_download(future, pending[future])
+
+    def _record_download(self, future: Future, tile: TileInfo) -> None:
+        """Record the outcome of a finished tile download and report progress."""
+        try:
+            success = future.result()
+            tile.success = success
+            if not success:
+                self._failed_tiles.append(tile)
+        except Exception as e:
+            logger.error(f"Error downloading tile {tile.col}_{tile.row}: {e}")
+            tile.success = False
+            tile.error = str(e)
+            self._failed_tiles.append(tile)
+        finally:
+            self._tile_counter += 1
+            if self.progress_callback:
+                self.progress_callback.on_tile_complete(self._tile_counter, tile.success)
 
     def _download_single_tile(self, tile: TileInfo, output_dir: Path) -> bool:
         """Download a single tile with retry logic."""
@@ -303,6 +392,10 @@ class TileManager:
             tile.success = True
             return True
 
+        # Reuse a tile downloaded by an earlier run
+        if self._load_cached_tile(tile, tile_path):
+            return True
+
         for attempt in range(self.max_retries):
             try:
                 # Add delay between retries
@@ -312,13 +405,18 @@ class TileManager:
 
                 # Download tile
                 response = self._session.get(tile.url, stream=True, timeout=self.timeout)
-                response.raise_for_status()
+                try:
+                    response.raise_for_status()
 
-                # Save to file
-                with open(tile_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=self.chunk_size):
-                        if chunk:
-                            f.write(chunk)
+                    # Stream the body straight to file (decoding any Content-Encoding)
+                    response.raw.decode_content = True
+                    with open(tile_path, "wb") as f:
+                        _mark_temporary(tile_path)
+                        shutil.copyfileobj(response.raw, f, self.chunk_size)
+                finally:
+                    # Return the connection to the (blocking) pool even when the
+                    # request failed, or other workers wait for it forever
+                    response.close()
 
                 # Verify download
                 if tile_path.exists() and tile_path.stat().st_size > 0:
@@ -329,11 +427,14 @@ class TileManager:
                         f"Downloaded tile {tile.level}/{tile.col}_{tile.row} "
                         f"({tile.size} bytes)"
                     )
+                    self._store_cached_tile(tile, tile_path)
                     return True
                 else:
                     raise TileDownloadError("Downloaded file is empty")
 
-            except requests.exceptions.RequestException as e:
+            except (requests.exceptions.RequestException, Urllib3HTTPError) as e:
+                # Reading response.raw raises urllib3 errors, which requests
+                # would otherwise have wrapped
                 logger.warning(
                     f"Attempt {attempt + 1}/{self.max_retries} failed for "
                     f"tile {tile.col}_{tile.row}: {e}"
@@ -347,6 +448,54 @@ class TileManager:
 
         return False
 
+    def _cache_path(self, tile: TileInfo) -> Path:
+        """Get the path of a tile in the persistent cache."""
+        digest = hashlib.sha1(tile.url.encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.jpg"
+
+    def _load_cached_tile(self, tile: TileInfo, tile_path: Path) -> bool:
+        """Place a cached copy of a tile at tile_path.
+
+        Returns:
+            True if the tile was in the cache
+        """
+        if self.cache_dir is None:
+            return False
+
+        cached = self._cache_path(tile)
+        try:
+            size = cached.stat().st_size
+            if size == 0:
+                return False
+            _link_or_copy(cached, tile_path)
+        except OSError:
+            return False
+
+        tile.path = tile_path
+        tile.size = size
+        tile.success = True
+        logger.debug(f"Using cached tile {tile.level}/{tile.col}_{tile.row}")
+        return True
+
+    def _store_cached_tile(self, tile: TileInfo, tile_path: Path) -> None:
+        """Add a downloaded tile to the persistent cache."""
+        if self.cache_dir is None:
+            return
+
+        cached = self._cache_path(tile)
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            if sys.platform == "win32":
+                # A hard link would share the tile's temporary attribute, and
+                # the cache outlives the download
+                shutil.copyfile(tile_path, cached)
+            else:
+                _link_or_copy(tile_path, cached)
+        except FileExistsError:
+            pass  # Cached by a concurrent download of the same URL
+        except OSError as e:
+            logger.debug(f"Could not cache tile {tile.col}_{tile.row}: {e}")
+
     def get_failed_tiles(self) -> List[TileInfo]:
         """Get list of tiles that failed to download."""
         return self._failed_tiles.copy()
@@ -360,13 +509,18 @@ class TileManager:
 class SimpleProgressCallback:
     """Simple progress callback implementation for testing."""
 
+    # Minimum seconds between progress lines
+    PRINT_INTERVAL = 0.25
+
     def __init__(self):
         self.total_tiles = 0
         self.completed_tiles = 0
         self.successful_tiles = 0
+        self._last_print = 0.0
 
     def on_start(self, total_tiles: int) -> None:
         self.total_tiles = total_tiles
+        self._last_print = 0.0
         print(f"Starting download of {total_tiles} tiles...")
 
     def on_tile_complete(self, tile_num: int, success: bool) -> None:
@@ -374,8 +528,12 @@ class SimpleProgressCallback:
         if success:
             self.successful_tiles += 1
 
-        # Print progress every 10 tiles
-        if tile_num % 10 == 0 or tile_num == self.total_tiles:
+        # Print progress every 10 tiles, at most once per PRINT_INTERVAL, and
+        # always for the last tile
+        if tile_num == self.total_tiles or (
+            tile_num % 10 == 0 and time.monotonic() - self._last_print >= self.PRINT_INTERVAL
+        ):
+            self._last_print = time.monotonic()
             print(
                 f"Progress: {tile_num}/{self.total_tiles} tiles "
                 f"({self.successful_tiles} successful)"
@@ -2,30 +2,51 @@
 
 from typing import Optional
 
-from bs4 import BeautifulSoup
+from lxml import etree
 
+try:
+    from .html_utils import element_text
+except ImportError:
+    from html_utils import element_text
 
-def extract_title(soup: BeautifulSoup) -> Optional[str]:
+# Every <h1> on the page, in document order
+_H1 = etree.XPath("//h1")
+
+# Class substrings identifying the title <h1>, tried in order before falling
+# back to the first <h1> of any class
+_TITLE_CLASS_HINTS = (
+    "bspwtT",  # Current known class
+    "sc-",  # Generic styled-components pattern
+)
+
+
+def extract_title(root: etree._Element) -> Optional[str]:
     """Extract the main title from the page.
-    
+
+    The page's headings are collected in one query; each selector then takes
+    the first matching heading, moving on to the next selector when that
+    heading is empty.
+
     Args:
-        soup: BeautifulSoup parsed HTML
-        
+        root: lxml root element of the parsed page
+
     Returns:
         Title string if found, None otherwise
     """
-    # Try different selectors for the title
-    title_selectors = [
-        'h1[class*="bspwtT"]',  # Current known class
-        'h1[class*="sc-"]',      # Generic styled-components pattern
-        'h1',                    # Fallback to any h1
-    ]
-    
-    for selector in title_selectors:
-        title_elem = soup.select_one(selector)
-        if title_elem:
-            title_text = title_elem.get_text(strip=True)
-            if title_text:
-                return title_text
-    
-    return None
\ No newline at end of file
+    headings = _H1(root)
+    if not headings:
+        return None
+
+    candidates = []
+    for hint in _TITLE_CLASS_HINTS:
+        match = next((h1 for h1 in headings if hint in (h1.get("class") or "")), None)
+        if match is not None:
+            candidates.append(match)
+    candidates.append(headings[0])  # Fallback to any h1
+
+    for title_elem in candidates:
+        title_text = element_text(title_elem, strip=True)
+        if title_text:
+            return title_text
+
+    return None
@@ -1,19 +1,101 @@
 """Extract Transcription sections from Joseph Smith Papers pages."""
 
-import html
+import functools
 import re
-from copy import deepcopy
-from typing import List, Optional, Tuple
+from itertools import chain
+from operator import attrgetter
+from typing import List, Optional, Tuple, Union
 
-from bs4 import BeautifulSoup, NavigableString, Tag
+from lxml import etree
 
 try:
+    from .html_utils import (
+        class_set,
+        element_text,
+        has_class,
+        iter_content,
+        iter_previous,
+        short_text,
+    )
     from .models import Footnote, Link, Popup, PopupReference, Transcription, TranscriptionLine, TranscriptionParagraph
 except ImportError:
+    from html_utils import (
+        class_set,
+        element_text,
+        has_class,
+        iter_content,
+        iter_previous,
+        short_text,
+    )
     from models import Footnote, Link, Popup, PopupReference, Transcription, TranscriptionLine, TranscriptionParagraph
 
+# Compiled XPath expressions, evaluated in C by lxml
+_TRANSCRIPT_DIV = etree.XPath("(//div[@id='paper-summary-transcript'])[1]")
+_WASPTAG_DIVS = etree.XPath(".//div[contains(@class, 'wasptag')]")
+_FOOTNOTE_REF = etree.XPath("(.//a[starts-with(@href, '#')])[1]")
+_FIRST_LINK = etree.XPath("(.//a)[1]")
+_LINKS = etree.XPath(".//a")
+
+_TOOLTIP = etree.XPath(f"(.//span[{has_class('tooltip')}])[1]")
+_TOOLTIP_HEADER = etree.XPath(f"(.//*[{has_class('header')}])[1]")
+_TOOLTIP_SUMMARY = etree.XPath(f"(.//*[{has_class('summary')}])[1]")
+_TOOLTIP_LINK = etree.XPath(f"(.//a[{has_class('link')}])[1]")
+
+# Footnote items of the first Footnotes drawer, found in one query
+_DRAWER_NOTE_ITEMS = etree.XPath(
+    "(//details[@data-testid='drawer-Footnotes-drawer'])[1]"
+    f"//div[{has_class('noteItem')}]"
+)
+_NOTE_ID = etree.XPath(f"(.//span[{has_class('id')}])[1]")
+_NOTE_TEXT = etree.XPath(f"(.//span[{has_class('note')}])[1]")
+
+# Patterns used by clean_editing_marks, compiled once. Footnote references
+# [^num] and page references [p. [num]] are kept; any other [text] loses its
+# brackets. Inside an editorial mark a "[" either starts a whole reference or
+# is a plain character, so a reference's brackets never close the mark.
+_REFERENCE_TAIL = r'(?:\^\d+|p\.\s*\[\d+\])\]'
+_EDITING_MARK_RE = re.compile(
+    r'\[(?:'
+    r'(\^\d+)\]'  # footnote reference
+    r'|p\.\s*\[(\d+)\]\]'  # page reference
+    rf'|((?:\[{_REFERENCE_TAIL}|[^\[\]]|\[(?!{_REFERENCE_TAIL}))+)\]'  # editorial mark
+    r')'
+)
+_PAGE_RE = re.compile(r'\[p\.\s*\[(\d+)\]\]')
+
+# Site-relative links (e.g. /paper-summary/...) are resolved against this
+_SITE_URL = "https://www.josephsmithpapers.org"
+
+# A child node as yielded by iter_content: a text string or an element (or comment)
+_ContentNode = Union[str, etree._Element]
+
+
+def _absolute_url(url: str) -> str:
+    """Resolve a site-relative link against the Joseph Smith Papers site."""
+    if not url or url.startswith(("http://", "https://")):
+        return url
+    return _SITE_URL + url
+
+
+def _first(xpath: etree.XPath, element: etree._Element) -> Optional[etree._Element]:
+    """Return the first result of a compiled XPath, or None."""
+    results = xpath(element)
+    return results[0] if results else None
+
+
+def _node_string(node: _ContentNode) -> Optional[str]:
+    """Get the string of a text node, or None for an element.
+
+    Comments count as text, as they do for BeautifulSoup's NavigableString.
+    """
+    if isinstance(node, str):
+        return node
+    if not isinstance(node.tag, str):
+        return node.text or ""
+    return None
+
 
-def extract_popup_data(wrapper_elem: Tag) -> Optional[PopupReference]:
+def extract_popup_data(wrapper_elem: etree._Element) -> Optional[PopupReference]:
     """Extract popup data from a wrapper element.
 
     Args:
@@ -24,46 +106,54 @@ def extract_popup_data(wrapper_elem: Tag) -> Optional[PopupReference]:
     """
     # Find the text that triggers the popup
     trigger_text = ""
-    for child in wrapper_elem.children:
-        if isinstance(child, NavigableString):
-            trigger_text += str(child).strip()
-        elif child.name == "a":
-            trigger_text += child.get_text(strip=True)
-        elif child.name != "span" or "tooltip" not in child.get("class", []):
-            trigger_text += child.get_text(strip=True)
+    for child in iter_content(wrapper_elem):
+        child_string = _node_string(child)
+        if child_string is not None:
+            trigger_text += child_string.strip()
+        elif child.tag == "a":
+            trigger_text += element_text(child, strip=True)
+        elif child.tag != "span" or "tooltip" not in class_set(child):
+            trigger_text += element_text(child, strip=True)
 
     # Find the tooltip content
-    tooltip = wrapper_elem.find("span", class_="tooltip")
-    if not tooltip:
+    tooltip = _first(_TOOLTIP, wrapper_elem)
+    if tooltip is None:
         return None
 
     # Extract header
-    header_elem = tooltip.find(class_="header")
-    if not header_elem:
+    header_elem = _first(_TOOLTIP_HEADER, tooltip)
+    if header_elem is None:
         return None
-    header = header_elem.get_text(strip=True)
+    header = element_text(header_elem, strip=True)
 
     # Extract summary
-    summary_elem = tooltip.find(class_="summary")
-    summary = summary_elem.get_text(strip=True) if summary_elem else ""
+    summary = element_text(_first(_TOOLTIP_SUMMARY, tooltip), strip=True)
 
     # Extract link
-    link_elem = tooltip.find("a", class_="link")
+    link_elem = _first(_TOOLTIP_LINK, tooltip)
     link_url = ""
-    if link_elem:
-        link_url = link_elem.get("href", "")
-        if link_url and not link_url.startswith("http"):
-            link_url = f"https://www.josephsmithpapers.org{link_url}"
+    if link_elem is not None:
+        link_url = _absolute_url(link_elem.get("href", ""))
 
     popup = Popup(header=header, summary=summary, link=link_url)
     return PopupReference(text=trigger_text, popup=popup)
 
 
+def _next_sibling_string(element: etree._Element) -> Optional[str]:
+    """Get the text node directly after an element, or None if an element follows."""
+    if element.tail:
+        return element.tail
+    sibling = element.getnext()
+    if sibling is not None:
+        return _node_string(sibling)
+    return None
+
+
 def parse_line_content(elem) -> Tuple[TranscriptionLine, List[Tuple[int, str]]]:
     """Parse content within a line, extracting text, editorial notes, and footnote references.
 
     Args:
-        elem: Element or list of elements to parse
+        elem: Element, or list of child nodes (strings and elements) to parse
 
     Returns:
         Tuple of (TranscriptionLine object, list of (footnote_number, footnote_text))
@@ -73,100 +163,128 @@ def parse_line_content(elem) -> Tuple[TranscriptionLine, List[Tuple[int, str]]]:
     links = []
     footnote_refs = []  # List of (number, text) tuples
 
-    def process_element(el, preserve_next_space=False):
-        """Process a single element recursively."""
-        if isinstance(el, NavigableString):
-            text_parts.append(str(el))
-        elif isinstance(el, Tag):
-            if el.name == "aside" and "popup-wrapper" in el.get("class", []):
-                # This is a footnote reference
-                anchor = el.find("a")
-                if anchor:
-                    # Check if it has either href="#..." or is an editorial note (which may not have href)
-                    has_href = anchor.get("href", "").startswith("#")
-                    is_editorial = "editorial-note" in " ".join(anchor.get("class", []))
-                    
-                    if has_href or is_editorial:
-                        footnote_num_text = anchor.get_text(strip=True)
-                        if footnote_num_text.isdigit():
-                            footnote_num = int(footnote_num_text)
-                            # Get the footnote content (everything after the anchor)
-                            footnote_content = el.get_text(strip=True)
-                            # Remove the number from the beginning
-                            if footnote_content.startswith(footnote_num_text):
-                                footnote_content = footnote_content[len(footnote_num_text):].strip()
-                            
-                            # Add footnote reference to text
-                            text_parts.append(f"[^{footnote_num}]")
-                            # Store footnote for later
-                            footnote_refs.append((footnote_num, footnote_content))
-            elif el.name == "span" and "wrapper" in el.get("class", []):
-                # This is an editorial note/popup
-                popup_ref = extract_popup_data(el)
-                if popup_ref:
-                    editorial_notes.append(popup_ref)
-                    text_parts.append(popup_ref.text)
-                    # Check if next sibling starts with a space
-                    next_sibling = el.next_sibling
-                    if isinstance(next_sibling, NavigableString) and str(next_sibling).startswith(' '):
-                        # Preserve the space after the popup
-                        text_parts.append(' ')
-            elif el.name == "a" and "wrapper" not in el.parent.get("class", []):
-                # Regular link (not inside a popup wrapper or aside)
-                parent = el.parent
-                if parent.name != "aside":
-                    link_text = el.get_text(strip=True)
-                    link_url = el.get("href", "")
-                    if link_url and not link_url.startswith("http"):
-                        link_url = f"https://www.josephsmithpapers.org{link_url}"
-                    links.append(Link(text=link_text, url=link_url))
-                    text_parts.append(link_text)
-            elif el.name == "span" and "line-break" in el.get("class", []):
-                # Skip line break markers - they should be handled at a higher level
-                pass
-            elif el.name == "span" and any(cls in el.get("class", []) for cls in ["editorial-comment", "italic"]):
-                # Handle editorial comments and italic text
-                classes = el.get("class", [])
-                is_editorial = "editorial-comment" in classes
-                is_italic = "italic" in classes
-                
-                # Extract the text content
-                content = el.get_text(strip=True)
-                
-                # Format based on type
-                if is_editorial and is_italic:
-                    # Both editorial comment and italic (common pattern)
-                    text_parts.append(f"*[{content}]*")
-                elif is_editorial:
-                    # Just editorial comment
-                    text_parts.append(f"[{content}]")
-                elif is_italic:
-                    # Just italic
-                    text_parts.append(f"*{content}*")
-                else:
-                    text_parts.append(content)
-            elif el.name == "a" and "editorial-note-static" in el.get("class", []):
-                # Handle static editorial notes (different from popup notes)
-                note_text = el.get_text(strip=True)
-                # These are typically superscript numbers or letters
-                text_parts.append(f"^{note_text}^")
+    # Walk the nodes depth-first with an explicit stack (no call per node);
+    # nodes are popped in document order
+    stack = list(reversed(elem)) if isinstance(elem, list) else [elem]
+    while stack:
+        el = stack.pop()
+        if isinstance(el, str):
+            text_parts.append(el)
+            continue
+        if not isinstance(el.tag, str):
+            # Comments count as text, as they do for BeautifulSoup's NavigableString
+            text_parts.append(el.text or "")
+            continue
+
+        # Look the class attribute up once per element
+        classes = class_set(el)
+        if el.tag == "aside" and "popup-wrapper" in classes:
+            # This is a footnote reference
+            anchor = _first(_FIRST_LINK, el)
+            if anchor is not None:
+                # Check for href="#..." or an editorial note (which may have no href)
+                has_href = anchor.get("href", "").startswith("#")
+                is_editorial = "editorial-note" in " ".join(class_set(anchor))
+
+                if has_href or is_editorial:
+                    footnote_num_text = short_text(anchor)
+                    if footnote_num_text.isdigit():
+                        footnote_num = int(footnote_num_text)
+                        # Get the footnote content (everything after the anchor)
+                        footnote_content = element_text(el, strip=True)
+                        # Remove the number from the beginning
+                        if footnote_content.startswith(footnote_num_text):
+                            footnote_content = footnote_content[len(footnote_num_text):].strip()
+
+                        # Add footnote reference to text
+                        text_parts.append(f"[^{footnote_num}]")
+                        # Store footnote for later
+                        footnote_refs.append((footnote_num, footnote_content))
+        elif el.tag == "span" and "wrapper" in classes:
+            # This is an editorial note/popup
+            popup_ref = extract_popup_data(el)
+            if popup_ref:
+                editorial_notes.append(popup_ref)
+                text_parts.append(popup_ref.text)
+                # Check if next sibling starts with a space
+                next_string = _next_sibling_string(el)
+                if next_string and next_string.startswith(' '):
+                    # Preserve the space after the popup
+                    text_parts.append(' ')
+        elif el.tag == "a" and "wrapper" not in class_set(el.getparent()):
+            # Regular link (not inside a popup wrapper or aside)
+            parent = el.getparent()
+            if parent.tag != "aside":
+                link_text = element_text(el, strip=True)
+                link_url = _absolute_url(el.get("href", ""))
+                links.append(Link(text=link_text, url=link_url))
+                text_parts.append(link_text)
+        elif el.tag == "span" and "line-break" in classes:
+            # Skip line break markers - they should be handled at a higher level
+            pass
+        elif el.tag == "span" and not classes.isdisjoint(("editorial-comment", "italic")):
+            # Handle editorial comments and italic text
+            is_editorial = "editorial-comment" in classes
+            is_italic = "italic" in classes
+
+            # Extract the text content
+            content = element_text(el, strip=True)
+
+            # Format based on type
+            if is_editorial and is_italic:
+                # Both editorial comment and italic (common pattern)
+                text_parts.append(f"*[{content}]*")
+            elif is_editorial:
+                # Just editorial comment
+                text_parts.append(f"[{content}]")
+            elif is_italic:
+                # Just italic
+                text_parts.append(f"*{content}*")
             else:
-                # Process children
-                for child in el.children:
-                    process_element(child)
-
-    # Process the element(s)
-    if isinstance(elem, list):
-        for e in elem:
-            process_element(e)
-    else:
-        process_element(elem)
+                text_parts.append(content)
+        elif el.tag == "a" and "editorial-note-static" in classes:
+            # Handle static editorial notes (different from popup notes)
+            note_text = element_text(el, strip=True)
+            # These are typically superscript numbers or letters
+            text_parts.append(f"^{note_text}^")
+        else:
+            # Process children
+            stack.extend(reversed(list(iter_content(el))))
 
     text = "".join(text_parts).strip()
     return TranscriptionLine(text=text, editorial_notes=editorial_notes, links=links), footnote_refs
 
 
-def extract_transcription_paragraphs(transcript_div: Tag) -> Tuple[List[TranscriptionParagraph], List[Footnote]]:
+def _find_paragraphs_outside_asides(root: etree._Element) -> List[etree._Element]:
+    """Find <p> elements under root that are not inside an <aside>, in document order.
+
+    One depth-first walk that never descends into asides (footnotes), rather
+    than a search for every <p> followed by a parent walk for each match.
+    """
+    paragraphs = []
+    stack = [child for child in reversed(root) if isinstance(child.tag, str)]
+    while stack:
+        elem = stack.pop()
+        if elem.tag == "aside":
+            continue
+        if elem.tag == "p":
+            paragraphs.append(elem)
+        stack.extend(child for child in reversed(elem) if isinstance(child.tag, str))
+    return paragraphs
+
+
+def _is_line_break(node: _ContentNode) -> bool:
+    """Check whether a child node is a line-break marker span."""
+    return (
+        not isinstance(node, str)
+        and node.tag == "span"
+        and "line-break" in class_set(node)
+    )
+
+
+def extract_transcription_paragraphs(
+    transcript_div: etree._Element,
+) -> Tuple[List[TranscriptionParagraph], List[Footnote]]:
     """Extract paragraphs from the transcription div.
 
     Args:
@@ -179,23 +297,12 @@ def extract_transcription_paragraphs(transcript_div: Tag) -> Tuple[List[Transcri
     collected_footnotes = {}  # Dict to collect footnotes by number
 
     # First try to find regular paragraph elements (excluding those in asides/footnotes)
-    para_elems = []
-    for p in transcript_div.find_all("p"):
-        # Skip if inside an aside (footnote)
-        parent = p.parent
-        is_footnote = False
-        while parent and parent != transcript_div:
-            if parent.name == "aside":
-                is_footnote = True
-                break
-            parent = parent.parent
-        if not is_footnote:
-            para_elems.append(p)
+    para_elems = _find_paragraphs_outside_asides(transcript_div)
 
     # If no paragraphs found, look for wasptag divs (different format)
     if not para_elems:
         # Look for divs that have 'wasptag' in their class list
-        para_elems = transcript_div.find_all("div", class_=lambda x: x and "wasptag" in x)
+        para_elems = _WASPTAG_DIVS(transcript_div)
 
     for para_elem in para_elems:
         lines = []
@@ -203,15 +310,15 @@ def extract_transcription_paragraphs(transcript_div: Tag) -> Tuple[List[Transcri
         footnote = None
 
         # Check for footnote at the end of paragraph
-        footnote_ref = para_elem.find("a", href=lambda x: x and x.startswith("#"))
-        if footnote_ref and footnote_ref.parent.name != "aside":
-            footnote_text = footnote_ref.get_text(strip=True)
+        footnote_ref = _first(_FOOTNOTE_REF, para_elem)
+        if footnote_ref is not None and footnote_ref.getparent().tag != "aside":
+            footnote_text = short_text(footnote_ref)
             if footnote_text.isdigit():
                 footnote = int(footnote_text)
 
         # Process content, splitting by line breaks
-        for child in para_elem.children:
-            if isinstance(child, Tag) and child.name == "span" and "line-break" in child.get("class", []):
+        for child in iter_content(para_elem):
+            if _is_line_break(child):
                 # End of current line
                 if current_line_content:
                     line, footnote_refs = parse_line_content(current_line_content)
@@ -235,7 +342,7 @@ def extract_transcription_paragraphs(transcript_div: Tag) -> Tuple[List[Transcri
                 collected_footnotes[fn_num] = fn_text
 
         # If no line breaks were found, treat the whole content as one line
-        if not lines and para_elem.get_text(strip=True):
+        if not lines and element_text(para_elem, strip=True):
             line, footnote_refs = parse_line_content(para_elem)
             if line.text:
                 lines.append(line)
@@ -256,52 +363,42 @@ def extract_transcription_paragraphs(transcript_div: Tag) -> Tuple[List[Transcri
     return paragraphs, footnotes
 
 
-def extract_footnotes_from_drawer(soup: BeautifulSoup) -> List[Footnote]:
+def extract_footnotes_from_drawer(root: etree._Element) -> List[Footnote]:
     """Extract footnotes from the Footnotes drawer.
 
     Args:
-        soup: BeautifulSoup parsed HTML
+        root: lxml root element of the parsed page
 
     Returns:
         List of Footnote objects
     """
     footnotes = []
 
-    # Find the Footnotes drawer
-    footnotes_drawer = soup.find("details", {"data-testid": "drawer-Footnotes-drawer"})
-    if not footnotes_drawer:
-        return footnotes
-
-    # Find all footnote items
-    note_items = footnotes_drawer.find_all("div", class_="noteItem")
-
-    for note_item in note_items:
+    # Find all footnote items in the Footnotes drawer (none if there is no drawer)
+    for note_item in _DRAWER_NOTE_ITEMS(root):
         # Extract footnote ID
-        id_elem = note_item.find("span", class_="id")
-        if not id_elem:
+        id_elem = _first(_NOTE_ID, note_item)
+        if id_elem is None:
             continue
 
-        footnote_id_text = id_elem.get_text(strip=True).rstrip(".")
+        footnote_id_text = element_text(id_elem, strip=True).rstrip(".")
         if not footnote_id_text.isdigit():
             continue
 
         footnote_id = int(footnote_id_text)
 
         # Extract footnote text
-        text_elem = note_item.find("span", class_="note")
-        if not text_elem:
+        text_elem = _first(_NOTE_TEXT, note_item)
+        if text_elem is None:
             continue
 
-        footnote_text = text_elem.get_text(strip=True)
+        footnote_text = element_text(text_elem, strip=True)
 
         # Extract any links within the footnote
         links = []
-        link_elems = text_elem.find_all("a")
-        for link_elem in link_elems:
-            link_text = link_elem.get_text(strip=True)
-            link_url = link_elem.get("href", "")
-            if link_url and not link_url.startswith("http"):
-                link_url = f"https://www.josephsmithpapers.org{link_url}"
+        for link_elem in _LINKS(text_elem):
+            link_text = element_text(link_elem, strip=True)
+            link_url = _absolute_url(link_elem.get("href", ""))
             if link_text and link_url:
                 links.append(Link(text=link_text, url=link_url))
 
@@ -314,6 +411,34 @@ def extract_footnotes_from_drawer(soup: BeautifulSoup) -> List[Footnote]:
     return footnotes
 
 
+def merge_footnotes(*footnote_lists: List[Footnote]) -> List[Footnote]:
+    """Merge footnote lists into one list sorted by HTML ID.
+
+    Footnotes sharing an ID are deduplicated in a single pass; a footnote
+    from a later list replaces one from an earlier list.
+
+    Args:
+        *footnote_lists: Footnote lists, lowest precedence first
+
+    Returns:
+        Merged list of Footnote objects
+    """
+    merged = {fn.id: fn for fn in chain(*footnote_lists)}
+    return sorted(merged.values(), key=attrgetter("id"))
+
+
+def _replace_editing_mark(match: re.Match) -> str:
+    """Substitute a single match of _EDITING_MARK_RE."""
+    footnote, page, content = match.groups()
+    if footnote:
+        return f'[{footnote}]'
+    if page:
+        return f'[p. [{page}]]'
+    # Keep the mark's content, normalizing any page references inside it
+    return _PAGE_RE.sub(r'[p. [\1]]', content)
+
+
+@functools.lru_cache(maxsize=4096)
 def clean_editing_marks(text: str) -> str:
     """Remove editing marks from transcription text.
     
@@ -323,31 +448,25 @@ def clean_editing_marks(text: str) -> str:
     - Example: "th[r]ough" becomes "through", "wh[e]n" becomes "when"
     - Page references like [p. [12]] and footnote refs like [^16] are preserved
     
+    Results are cached, since transcriptions repeat short lines such as page
+    breaks and blank stubs.
+    
     Args:
         text: Text possibly containing editing marks
         
     Returns:
         Text with editing marks (brackets) removed
     """
-    # Use a simple approach: temporarily replace special patterns we want to keep
-    # Replace footnote references [^num] with a placeholder
-    text = re.sub(r'\[\^(\d+)\]', r'__FOOTNOTE_\1__', text)
-    
-    # Replace page references [p. [num]] with a placeholder
-    text = re.sub(r'\[p\.\s*\[(\d+)\]\]', r'__PAGE_\1__', text)
-    
-    # Now remove all remaining square brackets (editorial marks)
-    # This handles cases like th[r]ough, wh[e]n, etc.
-    text = re.sub(r'\[([^\]]+)\]', r'\1', text)
-    
-    # Restore the placeholders
-    text = re.sub(r'__FOOTNOTE_(\d+)__', r'[^\1]', text)
-    text = re.sub(r'__PAGE_(\d+)__', r'[p. [\1]]', text)
-    
-    # Clean up any double spaces left behind
-    text = re.sub(r'\s+', ' ', text)
-    
-    return text.strip()
+    # One pass removes the editing marks and normalizes the references
+    text = _EDITING_MARK_RE.sub(_replace_editing_mark, text)
+
+    # Clean up any double spaces left behind (split() also trims the ends)
+    return " ".join(text.split())
+
+
+def _find_previous(element: etree._Element, tag: str) -> Optional[etree._Element]:
+    """Find the nearest element with a tag before an element in document order."""
+    return next((elem for elem in iter_previous(element) if elem.tag == tag), None)
 
 
 def create_clean_paragraph(paragraph: TranscriptionParagraph) -> TranscriptionParagraph:
@@ -377,27 +496,29 @@ def create_clean_paragraph(paragraph: TranscriptionParagraph) -> TranscriptionPa
     )
 
 
-def extract_transcription(soup: BeautifulSoup) -> Optional[Transcription]:
+def extract_transcription(root: etree._Element) -> Optional[Transcription]:
     """Extract the Transcription section from the page.
 
     Args:
-        soup: BeautifulSoup parsed HTML
+        root: lxml root element of the parsed page
 
     Returns:
         Transcription object if found, None otherwise
     """
     # Find the transcription div
-    transcript_div = soup.find("div", id="paper-summary-transcript")
-    if not transcript_div:
+    transcript_div = _first(_TRANSCRIPT_DIV, root)
+    if transcript_div is None:
         return None
 
     # Extract title - usually "Transcript" but check for variations
     title = "Transcript"
     
     # Some pages might have a title element
-    title_elem = transcript_div.find_previous("h2") or transcript_div.find_previous("h3")
-    if title_elem and "transcript" in title_elem.get_text(strip=True).lower():
-        title = title_elem.get_text(strip=True)
+    title_elem = _find_previous(transcript_div, "h2")
+    if title_elem is None:
+        title_elem = _find_previous(transcript_div, "h3")
+    if title_elem is not None and "transcript" in element_text(title_elem, strip=True).lower():
+        title = element_text(title_elem, strip=True)
 
     # Extract paragraphs and inline footnotes
     paragraphs, inline_footnotes = extract_transcription_paragraphs(transcript_div)
@@ -405,18 +526,10 @@ def extract_transcription(soup: BeautifulSoup) -> Optional[Transcription]:
         return None
 
     # Extract footnotes from the Footnotes drawer
-    drawer_footnotes = extract_footnotes_from_drawer(soup)
+    drawer_footnotes = extract_footnotes_from_drawer(root)
     
     # Combine footnotes - inline footnotes take precedence
-    all_footnotes = {}
-    for fn in drawer_footnotes:
-        all_footnotes[fn.id] = fn
-    for fn in inline_footnotes:
-        all_footnotes[fn.id] = fn
-    
-    # Convert back to list
-    footnotes = list(all_footnotes.values())
-    footnotes.sort(key=lambda x: x.id)
+    footnotes = merge_footnotes(drawer_footnotes, inline_footnotes)
 
     # Create clean version of paragraphs (without editing marks)
     paragraphs_clean = []
@@ -1,10 +1,24 @@
 """Extract Transcription sections using browser automation for editing marks toggle."""
 
-import time
-from typing import List, Optional, Tuple
+import atexit
+import functools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
 
-from bs4 import BeautifulSoup, Tag
+from lxml import etree
+from lxml import html as lxml_html
 from selenium import webdriver
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
@@ -13,10 +27,46 @@ from selenium.webdriver.chrome.service import Service
 
 try:
     from .models import Footnote, Link, Popup, PopupReference, Transcription, TranscriptionLine, TranscriptionParagraph
-    from .transcription_extractor import extract_footnotes_from_drawer, parse_line_content
+    from .html_utils import has_class, iter_content, parse_html, short_text
+    from .transcription_extractor import (
+        extract_footnotes_from_drawer,
+        merge_footnotes,
+        parse_line_content,
+    )
 except ImportError:
     from models import Footnote, Link, Popup, PopupReference, Transcription, TranscriptionLine, TranscriptionParagraph
-    from transcription_extractor import extract_footnotes_from_drawer, parse_line_content
+    from html_utils import has_class, iter_content, parse_html, short_text
+    from transcription_extractor import (
+        extract_footnotes_from_drawer,
+        merge_footnotes,
+        parse_line_content,
+    )
+
+# Longest wait, in seconds, for the transcript to re-render after toggling
+# editing marks, and how often to check it
+_TOGGLE_TIMEOUT = 0.5
+_TOGGLE_POLL_INTERVAL = 0.05
+
+# Errors meaning the checkbox is present but cannot be clicked right now
+_CLICK_EXCEPTIONS = (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    StaleElementReferenceException,
+)
+
+# Chrome content settings: 2 blocks a content type outright
+_CHROME_PREFS = {'profile.managed_default_content_settings.images': 2}
+
+# Markup of the first Footnotes drawer on the page, or "" when there is none
+_FOOTNOTES_DRAWER_SCRIPT = (
+    "var drawer = document.querySelector('details[data-testid=\"drawer-Footnotes-drawer\"]');"
+    " return drawer ? drawer.outerHTML : '';"
+)
+
+_WASPTAG_DIVS = etree.XPath(".//div[contains(@class, 'wasptag')]")
+_FOOTNOTE_REF = etree.XPath("(.//a[starts-with(@href, '#')])[1]")
+_HAS_LINE_BREAK = etree.XPath(f"boolean(.//span[{has_class('line-break')}])")
+_LINE_BREAK_CHILDREN = etree.XPath(f"./span[{has_class('line-break')}]")
 
 
 def extract_transcription_paragraphs_from_html(html_content: str, preserve_line_breaks: bool = True) -> Tuple[List[TranscriptionParagraph], List[Footnote]]:
@@ -29,12 +79,12 @@ def extract_transcription_paragraphs_from_html(html_content: str, preserve_line_
     Returns:
         Tuple of (List of TranscriptionParagraph objects, List of Footnote objects)
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    container = lxml_html.fragment_fromstring(html_content, create_parent="div")
     paragraphs = []
     collected_footnotes = {}  # Dict to collect footnotes by number
     
     # Find all wasptag divs (transcription format)
-    para_elems = soup.find_all("div", class_=lambda x: x and "wasptag" in x)
+    para_elems = _WASPTAG_DIVS(container)
     
     for para_elem in para_elems:
         lines = []
@@ -42,19 +92,22 @@ def extract_transcription_paragraphs_from_html(html_content: str, preserve_line_
         footnote = None
         
         # Check for footnote at the end of paragraph
-        footnote_ref = para_elem.find("a", href=lambda x: x and x.startswith("#"))
-        if footnote_ref and footnote_ref.parent.name != "aside":
-            footnote_text = footnote_ref.get_text(strip=True)
+        footnote_ref = _FOOTNOTE_REF(para_elem)
+        footnote_ref = footnote_ref[0] if footnote_ref else None
+        if footnote_ref is not None and footnote_ref.getparent().tag != "aside":
+            footnote_text = short_text(footnote_ref)
             if footnote_text.isdigit():
                 footnote = int(footnote_text)
         
         # Check if there are any line breaks in this paragraph
-        has_line_breaks = bool(para_elem.find("span", class_="line-break"))
+        has_line_breaks = _HAS_LINE_BREAK(para_elem)
         
         if has_line_breaks and preserve_line_breaks:
-            # Process content, splitting by line breaks
-            for child in para_elem.children:
-                if isinstance(child, Tag) and child.name == "span" and "line-break" in child.get("class", []):
+            # Process content, splitting by line breaks (found in one query,
+            # so each child is a set lookup rather than a class test)
+            line_breaks = set(_LINE_BREAK_CHILDREN(para_elem))
+            for child in iter_content(para_elem):
+                if child in line_breaks:
                     # End of current line
                     if current_line_content:
                         line, footnote_refs = parse_line_content(current_line_content)
@@ -98,129 +151,349 @@ def extract_transcription_paragraphs_from_html(html_content: str, preserve_line_
     return paragraphs, footnotes
 
 
-def extract_transcription_with_browser(url: str, headless: bool = True) -> Optional[Transcription]:
+@dataclass
+class _TranscriptionHtml:
+    """Markup captured from a page's transcription, ready to be parsed.
+
+    Attributes:
+        with_marks: Transcript innerHTML with editing marks shown
+        without_marks: Transcript innerHTML after hiding editing marks, or None
+            if the editing marks could not be toggled
+        drawer: outerHTML of the Footnotes drawer ("" if there is none)
+    """
+
+    with_marks: str
+    without_marks: Optional[str]
+    drawer: str
+
+
+class BrowserSession:
+    """A Chrome WebDriver kept open across transcription extractions.
+
+    Chrome is started on first use and restarted only after its session dies,
+    so extracting several pages pays for one browser launch. Cookies and web
+    storage are cleared after each page, so a page never sees state (such as
+    the hide-editing-marks preference) left behind by the previous one.
+    """
+
+    def __init__(self, headless: bool = True):
+        """Initialize the session.
+
+        Args:
+            headless: Whether to run browser in headless mode
+        """
+        self.headless = headless
+        self._driver = None
+        # A WebDriver handles one page at a time
+        self._lock = threading.Lock()
+
+    def _start_driver(self) -> webdriver.Chrome:
+        """Launch Chrome."""
+        # Setup Chrome options
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        # Only the DOM is read, so skip downloading images
+        options.add_experimental_option('prefs', _CHROME_PREFS)
+        # Return from get() at DOMContentLoaded; the transcript is waited for explicitly
+        options.page_load_strategy = 'eager'
+
+        # Initialize driver with webdriver-manager
+        service = Service(_chromedriver_path())
+        return webdriver.Chrome(service=service, options=options)
+
+    def extract(self, url: str) -> Optional[Transcription]:
+        """Extract the transcription of a page in this session's browser.
+
+        Args:
+            url: URL of the Joseph Smith Papers page
+
+        Returns:
+            Transcription object with both versions if found, None otherwise
+        """
+        page_html = self._fetch_html(url)
+        if page_html is None:
+            return None
+        return _parse_transcription_html(page_html)
+
+    def _fetch_html(self, url: str) -> Optional[_TranscriptionHtml]:
+        """Load a page in this session's browser and capture its transcription markup.
+
+        Args:
+            url: URL of the Joseph Smith Papers page
+
+        Returns:
+            The captured markup, or None if the page has no transcription
+        """
+        with self._lock:
+            if self._driver is None:
+                self._driver = self._start_driver()
+            try:
+                page_html = _fetch_transcription_html(self._driver, url)
+                _clear_browser_state(self._driver)
+                return page_html
+            except WebDriverException:
+                # The browser or its session is gone; start afresh next time
+                self._quit()
+                raise
+
+    def _quit(self) -> None:
+        """Quit the browser if it is running."""
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except WebDriverException:
+                pass
+            self._driver = None
+
+    def close(self) -> None:
+        """Quit the browser."""
+        with self._lock:
+            self._quit()
+
+    def __enter__(self) -> "BrowserSession":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+@functools.lru_cache(maxsize=1)
+def _chromedriver_path() -> str:
+    """Install (or locate) chromedriver once per process."""
+    return ChromeDriverManager().install()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_browser_session(headless: bool) -> BrowserSession:
+    """Get the process-wide browser session, closed when the process exits."""
+    session = BrowserSession(headless=headless)
+    atexit.register(session.close)
+    return session
+
+
+def _clear_browser_state(driver: webdriver.Chrome) -> None:
+    """Remove the cookies and web storage the current page's site has set."""
+    driver.delete_all_cookies()
+    driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+
+
+def extract_transcription_with_browser(
+    url: str, headless: bool = True, session: Optional[BrowserSession] = None
+) -> Optional[Transcription]:
     """Extract transcription with both editing marks versions using browser automation.
     
     Args:
         url: URL of the Joseph Smith Papers page
         headless: Whether to run browser in headless mode
+        session: Browser session to use; defaults to a process-wide session
+            that keeps one Chrome open for every call
         
     Returns:
         Transcription object with both versions if found, None otherwise
     """
-    # Setup Chrome options
-    options = webdriver.ChromeOptions()
-    if headless:
-        options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    
-    driver = None
-    try:
-        # Initialize driver with webdriver-manager
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.get(url)
-        
-        # Wait for page to load
-        wait = WebDriverWait(driver, 10)
-        
-        # Wait for transcription div to be present
+    if session is None:
+        session = _get_browser_session(headless)
+    return session.extract(url)
+
+
+def extract_transcriptions_with_browser(
+    urls: List[str],
+    concurrency: int = 4,
+    headless: bool = True,
+    parse_processes: Optional[int] = None,
+) -> Dict[str, Optional[Transcription]]:
+    """Extract the transcriptions of several pages in parallel browsers.
+
+    Each of up to `concurrency` threads borrows a browser from a pool of
+    sessions, so pages load in parallel and every browser is reused for the
+    pages it handles. With `parse_processes`, the markup captured from each
+    page is parsed in a process pool instead, so parsing runs on other cores
+    while the browsers load further pages.
+
+    Args:
+        urls: URLs of Joseph Smith Papers pages
+        concurrency: Maximum number of browsers running at once
+        headless: Whether to run browsers in headless mode
+        parse_processes: Number of worker processes parsing captured markup;
+            None parses in the browser threads
+
+    Returns:
+        Mapping of each URL to its Transcription, or None if none was found
+        or extraction failed
+    """
+    results = {}
+    if not urls:
+        return results
+
+    concurrency = min(concurrency, len(urls))
+    sessions = [BrowserSession(headless=headless) for _ in range(concurrency)]
+    idle_sessions = queue.Queue()
+    for session in sessions:
+        idle_sessions.put(session)
+    parse_executor = None
+    if parse_processes:
+        # Spawn rather than fork the workers: forking copies the browser
+        # threads' locks mid-use, which can deadlock the children
+        parse_executor = ProcessPoolExecutor(
+            parse_processes, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def extract(url: str) -> Union[Optional[Transcription], "Future[Transcription]"]:
+        """Capture one page on a borrowed session, then parse or queue its markup."""
+        session = idle_sessions.get()
         try:
-            transcript_div = wait.until(
-                EC.presence_of_element_located((By.ID, "paper-summary-transcript"))
-            )
-        except:
-            # No transcription on this page
+            page_html = session._fetch_html(url)
+        finally:
+            idle_sessions.put(session)
+        if page_html is None:
             return None
-        
-        # Extract title
-        title = "Transcript"
-        
-        # Get the initial HTML (with editing marks)
-        transcript_html_with_marks = transcript_div.get_attribute('innerHTML')
-        
-        # Find and click the "Hide editing marks" checkbox
+        if parse_executor is None:
+            return _parse_transcription_html(page_html)
+        return parse_executor.submit(_parse_transcription_html, page_html)
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {url: executor.submit(extract, url) for url in urls}
+
+        for url, future in futures.items():
+            try:
+                result = future.result()
+                if isinstance(result, Future):
+                    result = result.result()
+                results[url] = result
+            except Exception as e:
+                print(f"Error extracting transcription from {url}: {e}")
+                results[url] = None
+    finally:
+        for session in sessions:
+            session.close()
+        if parse_executor is not None:
+            parse_executor.shutdown()
+
+    return results
+
+
+def _changed_html(element, previous_html: str):
+    """Return an element's innerHTML if it differs from previous_html, else False."""
+    html = element.get_attribute('innerHTML')
+    return html if html != previous_html else False
+
+
+def _fetch_transcription_html(driver: webdriver.Chrome, url: str) -> Optional[_TranscriptionHtml]:
+    """Load a page in a running browser and capture its transcription markup.
+
+    Args:
+        driver: Running browser
+        url: URL of the Joseph Smith Papers page
+
+    Returns:
+        The captured markup, or None if the page has no transcription
+    """
+    driver.get(url)
+    
+    # Wait for page to load
+    wait = WebDriverWait(driver, 10)
+    
+    # Wait for transcription div to be present
+    try:
+        transcript_div = wait.until(
+            EC.presence_of_element_located((By.ID, "paper-summary-transcript"))
+        )
+    except TimeoutException:
+        # No transcription on this page
+        return None
+    
+    # Get the initial HTML (with editing marks)
+    transcript_html_with_marks = transcript_div.get_attribute('innerHTML')
+    
+    # Find the "Hide editing marks" checkbox (an empty list if there is none)
+    checkboxes = driver.find_elements(
+        By.CSS_SELECTOR, 
+        'input[data-testid="docInfo-hideEditing-checkbox"]'
+    )
+    transcript_html_without_marks = None
+    if checkboxes:
         try:
-            checkbox = driver.find_element(
-                By.CSS_SELECTOR, 
-                'input[data-testid="docInfo-hideEditing-checkbox"]'
-            )
-            
             # Click the checkbox to hide editing marks
-            checkbox.click()
-            
-            # Wait a moment for the page to update
-            time.sleep(0.5)
-            
-            # Get the updated HTML (without editing marks)
-            transcript_html_without_marks = transcript_div.get_attribute('innerHTML')
-            
-            # Extract paragraphs from both versions
-            paragraphs_with_marks, inline_footnotes1 = extract_transcription_paragraphs_from_html(
-                transcript_html_with_marks, preserve_line_breaks=True
-            )
-            # Without editing marks, the website removes line breaks
-            paragraphs_without_marks, inline_footnotes2 = extract_transcription_paragraphs_from_html(
-                transcript_html_without_marks, preserve_line_breaks=False
-            )
-            
-            # Get the full page HTML for footnotes extraction
-            page_html = driver.page_source
-            soup = BeautifulSoup(page_html, 'html.parser')
-            
-            # Extract footnotes from the Footnotes drawer
-            drawer_footnotes = extract_footnotes_from_drawer(soup)
-            
-            # Combine footnotes - inline footnotes take precedence
-            all_footnotes = {}
-            for fn in drawer_footnotes:
-                all_footnotes[fn.id] = fn
-            for fn in inline_footnotes1:
-                all_footnotes[fn.id] = fn
-            for fn in inline_footnotes2:
-                all_footnotes[fn.id] = fn
-            
-            # Convert back to list
-            footnotes = list(all_footnotes.values())
-            footnotes.sort(key=lambda x: x.id)
-            
-            # Return transcription with both versions
-            return Transcription(
-                title=title,
-                paragraphs=paragraphs_with_marks,
-                footnotes=footnotes,
-                paragraphs_clean=paragraphs_without_marks
-            )
-            
-        except:
-            # Checkbox not found or error clicking - return just the original
-            paragraphs, inline_footnotes = extract_transcription_paragraphs_from_html(
-                transcript_html_with_marks
-            )
-            
-            # Get the full page HTML for footnotes extraction
-            page_html = driver.page_source
-            soup = BeautifulSoup(page_html, 'html.parser')
-            
-            # Extract footnotes from the Footnotes drawer
-            drawer_footnotes = extract_footnotes_from_drawer(soup)
-            
-            # Combine footnotes
-            all_footnotes = {}
-            for fn in drawer_footnotes:
-                all_footnotes[fn.id] = fn
-            for fn in inline_footnotes:
-                all_footnotes[fn.id] = fn
-            
-            footnotes = list(all_footnotes.values())
-            footnotes.sort(key=lambda x: x.id)
-            
-            return Transcription(title=title, paragraphs=paragraphs, footnotes=footnotes)
-            
-    finally:
-        if driver:
-            driver.quit()
+            checkboxes[0].click()
+        except _CLICK_EXCEPTIONS:
+            # Checkbox not clickable - keep just the original
+            pass
+        else:
+            # Wait for the page to update, then get the updated HTML (without
+            # editing marks) as soon as the transcript changes
+            try:
+                transcript_html_without_marks = WebDriverWait(
+                    driver, _TOGGLE_TIMEOUT, poll_frequency=_TOGGLE_POLL_INTERVAL
+                ).until(lambda d: _changed_html(transcript_div, transcript_html_with_marks))
+            except TimeoutException:
+                # Nothing changed (e.g. a page without editing marks)
+                transcript_html_without_marks = transcript_html_with_marks
+            except StaleElementReferenceException:
+                # The transcript was replaced rather than updated - keep just the original
+                pass
+
+    # Only the Footnotes drawer's markup is transferred, not the whole page source
+    drawer_html = driver.execute_script(_FOOTNOTES_DRAWER_SCRIPT)
+    
+    return _TranscriptionHtml(
+        with_marks=transcript_html_with_marks,
+        without_marks=transcript_html_without_marks,
+        drawer=drawer_html or "",
+    )
+
+
+def _parse_transcription_html(page_html: _TranscriptionHtml) -> Transcription:
+    """Build a Transcription from markup captured in the browser.
+
+    Needs no browser, so it can run in another process.
+
+    Args:
+        page_html: Markup captured by _fetch_transcription_html
+
+    Returns:
+        Transcription object, with both versions if editing marks were toggled
+    """
+    title = "Transcript"
+    
+    # Extract footnotes from the Footnotes drawer
+    drawer_footnotes = (
+        extract_footnotes_from_drawer(parse_html(page_html.drawer)) if page_html.drawer else []
+    )
+    
+    if page_html.without_marks is None:
+        # Editing marks could not be hidden - return just the original
+        paragraphs, inline_footnotes = extract_transcription_paragraphs_from_html(
+            page_html.with_marks
+        )
+        
+        # Combine footnotes
+        footnotes = merge_footnotes(drawer_footnotes, inline_footnotes)
+        
+        return Transcription(title=title, paragraphs=paragraphs, footnotes=footnotes)
+    
+    # Extract paragraphs from both versions
+    paragraphs_with_marks, inline_footnotes1 = extract_transcription_paragraphs_from_html(
+        page_html.with_marks, preserve_line_breaks=True
+    )
+    # Without editing marks, the website removes line breaks
+    paragraphs_without_marks, inline_footnotes2 = extract_transcription_paragraphs_from_html(
+        page_html.without_marks, preserve_line_breaks=False
+    )
+    
+    # Combine footnotes - inline footnotes take precedence
+    footnotes = merge_footnotes(drawer_footnotes, inline_footnotes1, inline_footnotes2)
+    
+    # Return transcription with both versions
+    return Transcription(
+        title=title,
+        paragraphs=paragraphs_with_marks,
+        footnotes=footnotes,
+        paragraphs_clean=paragraphs_without_marks
+    )
 
 
 if __name__ == "__main__":
@@ -1,8 +1,25 @@
 """Common utility functions for the JSP CLI tool."""
 
-import re
+import functools
 from pathlib import Path
-from urllib.parse import urlparse
+from typing import Tuple
+from urllib.parse import ParseResult, urlparse
+
+# Characters not allowed in filenames, each mapped to an underscore
+_INVALID_FILENAME_CHARS = str.maketrans(dict.fromkeys('<>:"/\\|?*', "_"))
+
+
+@functools.lru_cache(maxsize=4096)
+def _split_url(url: str) -> Tuple[ParseResult, Tuple[str, ...]]:
+    """Parse a URL and split its path into non-empty components.
+
+    URLs recur across a crawl, so results are cached; both parts are
+    immutable and safe to share between callers.
+    """
+    parsed = urlparse(url)
+
+    # Extract path components
+    return parsed, tuple(p for p in parsed.path.split("/") if p)
 
 
 def parse_url(url: str) -> dict:
@@ -14,16 +31,14 @@ def parse_url(url: str) -> dict:
     Returns:
         Dictionary with parsed URL components
     """
-    parsed = urlparse(url)
-
-    # Extract path components
-    path_parts = [p for p in parsed.path.split("/") if p]
+    parsed, path_parts = _split_url(url)
 
+    # Fresh containers per call, so callers may modify the result freely
     return {
         "scheme": parsed.scheme,
         "netloc": parsed.netloc,
         "path": parsed.path,
-        "path_parts": path_parts,
+        "path_parts": list(path_parts),
         "query": parsed.query,
         "fragment": parsed.fragment,
     }
@@ -45,14 +60,11 @@ def create_output_directory(url: str, base_dir: str = "output") -> Path:
     # Remove any query parameters and clean the path
     path_parts = parsed["path_parts"]
 
-    # Create safe directory name
-    safe_parts = [sanitize_filename(part) for part in path_parts]
+    # Create safe directory names, dropping any that sanitize to nothing
+    safe_parts = [part for part in map(sanitize_filename, path_parts) if part]
 
-    # Build output path
-    output_path = Path(base_dir)
-    for part in safe_parts:
-        if part:
-            output_path = output_path / part
+    # Build output path in one call
+    output_path = Path(base_dir, *safe_parts)
 
     # Create directory if it doesn't exist
     output_path.mkdir(parents=True, exist_ok=True)
@@ -70,7 +82,7 @@ def sanitize_filename(filename: str) -> str:
         Safe filename string
     """
     # Remove or replace invalid characters
-    safe = re.sub(r'[<>:"/\\|?*]', "_", filename)
+    safe = filename.translate(_INVALID_FILENAME_CHARS)
 
     # Remove leading/trailing dots and spaces
     safe = safe.strip(". ")
@@ -82,6 +94,7 @@ def sanitize_filename(filename: str) -> str:
     return safe or "unnamed"
 
 
+@functools.lru_cache(maxsize=4096)
 def is_valid_jsp_url(url: str) -> bool:
     """Check if the URL is a valid Joseph Smith Papers URL.
 
@@ -92,7 +105,7 @@ def is_valid_jsp_url(url: str) -> bool:
         True if valid JSP URL, False otherwise
     """
     try:
-        parsed = urlparse(url)
+        parsed, _ = _split_url(url)
         return parsed.netloc in ["josephsmithpapers.org", "www.josephsmithpapers.org"]
     except Exception:
         return False
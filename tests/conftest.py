@@ -0,0 +1,42 @@
+"""Shared fixtures for the test suite."""
+
+import pytest
+from PIL import Image
+
+from src.stitcher import TileStitcher
+
+
+@pytest.fixture(scope="session")
+def tile_dir_template(tmp_path_factory):
+    """Create a 3x3 grid of 256x256 test tiles once per session.
+
+    Tests must treat this directory as read-only; tests that add or remove
+    tiles use a per-test copy instead.
+    """
+    tile_dir = tmp_path_factory.mktemp("tile_template") / "tiles"
+    level_dir = tile_dir / "0"
+    level_dir.mkdir(parents=True)
+
+    # Each tile gets its own color so tests can check where tiles land
+    for row in range(3):
+        for col in range(3):
+            img = Image.new("RGB", (256, 256), color=(col * 80, row * 80, 100))
+            img.save(level_dir / f"{col}_{row}.jpg")
+
+    return tile_dir
+
+
+@pytest.fixture(scope="session")
+def reference_jpegs(tile_dir_template, tmp_path_factory):
+    """Stitch the template tiles once per session at JPEG qualities 50 and 100.
+
+    Returns:
+        Mapping of quality to the stitched JPEG's path
+    """
+    output_dir = tmp_path_factory.mktemp("reference_jpegs")
+    stitcher = TileStitcher()
+    outputs = {}
+    for quality in (50, 100):
+        outputs[quality] = output_dir / f"output_q{quality}.jpg"
+        stitcher.stitch_tiles(tile_dir_template, outputs[quality], quality=quality)
+    return outputs
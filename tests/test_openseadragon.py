@@ -1,6 +1,7 @@
 """Tests for the openseadragon module."""
 
 import json
+import re
 from unittest.mock import Mock, patch
 
 from src.openseadragon import (
@@ -86,6 +87,38 @@ class TestOpenSeadragonConfig:
             assert urls[0] == ("https://example.com/tiles/5/0_0.jpg", 0, 0)
             assert urls[-1] == ("https://example.com/tiles/5/9_9.jpg", 9, 9)
 
+    def test_get_tile_urls_probes_match_grid(self):
+        """Test probed URLs follow the grid's template without a trailing slash."""
+        config = OpenSeadragonConfig(["https://example.com/tiles"], "https://example.com")
+
+        def mock_url_exists(url):
+            match = re.fullmatch(r"https://example\.com/tiles/5/(\d+)_(\d+)\.jpg", url)
+            return bool(match) and int(match.group(1)) < 3 and int(match.group(2)) < 2
+
+        with patch.object(config, "_url_exists", side_effect=mock_url_exists):
+            urls = config.get_tile_urls()
+
+        assert len(urls) == 6  # 3x2 grid at the highest level found
+        assert urls[-1] == ("https://example.com/tiles/5/2_1.jpg", 2, 1)
+
+    def test_probe_extent_uses_logarithmic_probes(self):
+        """Test axis extent discovery needs far fewer probes than tiles."""
+        config = OpenSeadragonConfig(["https://example.com/tiles/"], "https://example.com")
+        probed = []
+
+        def mock_url_exists(url):
+            index = int(url)
+            probed.append(index)
+            return index < 37
+
+        with patch.object(config, "_url_exists", side_effect=mock_url_exists):
+            assert config._probe_extent(str) == 36
+            assert len(probed) < 15
+
+        probed.clear()
+        with patch.object(config, "_url_exists", return_value=True):
+            assert config._probe_extent(str, limit=50) == 49
+
     def test_get_tile_urls_dzi_format(self):
         """Test getting tile URLs for DZI format."""
         tile_sources = [{"Image": {"Url": "https://example.com/image.dzi", "Format": "jpg"}}]
@@ -97,6 +130,31 @@ class TestOpenSeadragonConfig:
         assert urls[0] == ("https://example.com/image_files/10/0_0.jpg", 0, 0)
         assert urls[-1] == ("https://example.com/image_files/10/9_9.jpg", 9, 9)
 
+    def test_get_tile_urls_dzi_with_dimensions(self):
+        """Test DZI grid size is computed from image dimensions."""
+        tile_sources = [
+            {
+                "Image": {
+                    "Url": "https://example.com/image.dzi",
+                    "Format": "jpg",
+                    "TileSize": 256,
+                    "Size": {"Width": 1000, "Height": 600},
+                }
+            }
+        ]
+        config = OpenSeadragonConfig(tile_sources, "https://example.com")
+
+        # Level 10 is full resolution: 4x3 tiles
+        urls = config.get_tile_urls(level=10)
+        assert len(urls) == 12
+        assert urls[-1] == ("https://example.com/image_files/10/3_2.jpg", 3, 2)
+
+        # Level 9 is half resolution (500x300): 2x2 tiles
+        assert len(config.get_tile_urls(level=9)) == 4
+
+        # Levels above the pyramid produce no tiles
+        assert config.get_tile_urls(level=11) == []
+
     def test_empty_tile_sources(self):
         """Test with empty tile sources."""
         config = OpenSeadragonConfig([], "https://example.com")
@@ -229,6 +287,40 @@ class TestOpenSeadragonDetector:
         assert any(s["url"] == "https://example.com/image1.dzi" for s in sources)
         assert any(s["url"] == "https://example.com/image2.dzi" for s in sources)
 
+    def test_extract_from_html_object_tile_sources(self):
+        """Test JS object literals with URL values are parsed intact."""
+        detector = OpenSeadragonDetector()
+
+        html = """
+        <html>
+            <script>
+                var viewer = OpenSeadragon({
+                    tileSources: [{type: 'image', url: 'https://example.com/full.jpg'}]
+                });
+            </script>
+        </html>
+        """
+
+        sources = detector._extract_from_html(html, "https://example.com")
+
+        assert sources == [{"type": "image", "url": "https://example.com/full.jpg"}]
+
+    def test_extract_from_html_object_dzi_source(self):
+        """Test a DZI URL inside a JS object literal is resolved and typed."""
+        detector = OpenSeadragonDetector()
+
+        html = """
+        <html>
+            <script>
+                var viewer = OpenSeadragon({tileSources: [{url: '/iiif/a.dzi'}]});
+            </script>
+        </html>
+        """
+
+        sources = detector._extract_from_html(html, "https://example.com/page")
+
+        assert {"url": "https://example.com/iiif/a.dzi", "type": "dzi"} in sources
+
     def test_extract_from_html_data_attributes(self):
         """Test extracting from data attributes."""
         detector = OpenSeadragonDetector()
@@ -245,6 +337,24 @@ class TestOpenSeadragonDetector:
         assert sources[0]["url"] == "https://example.com/image.dzi"
         assert sources[0]["type"] == "dzi"
 
+    def test_extract_from_html_deduplicates_sources(self):
+        """Test the same DZI URL found by several patterns is emitted once."""
+        detector = OpenSeadragonDetector()
+
+        html = """
+        <html>
+            <script>
+                var viewer = OpenSeadragon({tileSources: ["https://example.com/image.dzi"]});
+                var fallback = "https://example.com/image.dzi";
+            </script>
+            <div data-dzi="https://example.com/image.dzi"></div>
+        </html>
+        """
+
+        sources = detector._extract_from_html(html, "https://example.com")
+
+        assert sources == [{"url": "https://example.com/image.dzi", "type": "dzi"}]
+
     def test_extract_from_html_relative_urls(self):
         """Test extracting relative URLs."""
         detector = OpenSeadragonDetector()
@@ -0,0 +1,34 @@
+"""Tests for the progress_utils module."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+from src.progress_utils import AliveProgressCallback
+
+
+class TestAliveProgressCallback:
+    @patch("src.progress_utils.alive_bar")
+    def test_counts_concurrent_completions(self, mock_alive_bar):
+        """Test completions reported from many threads are all counted and shown."""
+        bar = MagicMock()
+        mock_alive_bar.return_value.__enter__.return_value = bar
+        callback = AliveProgressCallback()
+        callback.on_start(800)
+
+        def report(worker):
+            for i in range(100):
+                callback.on_tile_complete(worker * 100 + i, success=i % 4 != 0)
+
+        workers = [threading.Thread(target=report, args=(n,)) for n in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        callback.on_complete()
+
+        assert callback.completed_tiles == 800
+        assert callback.successful_tiles == 600
+        assert callback.failed_tiles == 200
+        # The bar is advanced in bulk, but by exactly the number completed
+        assert sum(call.args[0] for call in bar.call_args_list) == 800
+        mock_alive_bar.return_value.__exit__.assert_called_once()
@@ -1,33 +1,59 @@
 """Tests for the scraper module."""
 
+import json
+from contextlib import ExitStack
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
 import pytest
+from bs4 import BeautifulSoup
 
-from src.scraper import html_to_markdown, scrape_content
+from src.html_utils import parse_html
+from src.metadata_extractor import extract_metadata_section
+from src.scraper import (
+    _CONTENT_STRAINER,
+    element_to_markdown,
+    extract_breadcrumbs,
+    extract_main_content,
+    extract_sections,
+    html_to_markdown,
+    scrape_content,
+    scrape_content_batch,
+)
 
 
 class TestScrapeContent:
-    @patch("src.transcription_extractor_browser.extract_transcription_with_browser")
-    @patch("src.document_info_extractor.extract_document_information")
-    @patch("src.historical_intro_extractor.extract_historical_introduction")
-    @patch("src.source_note_extractor.extract_source_note_advanced")
-    @patch("src.scraper.requests.get")
-    def test_scrape_creates_file(self, mock_get, mock_source_note, mock_historical, 
-                                 mock_doc_info, mock_transcription, tmp_path):
+    @pytest.fixture
+    def scrape_mocks(self):
+        """Patch the fetch and every section extractor; extractors find nothing."""
+        with ExitStack() as stack:
+            mocks = SimpleNamespace(
+                get_session=stack.enter_context(patch("src.scraper._get_session")),
+                source_note=stack.enter_context(patch("src.scraper.extract_source_note_advanced")),
+                historical=stack.enter_context(
+                    patch("src.scraper.extract_historical_introduction")
+                ),
+                doc_info=stack.enter_context(patch("src.scraper.extract_document_information")),
+                transcription=stack.enter_context(
+                    patch("src.transcription_extractor_browser.extract_transcription_with_browser")
+                ),
+            )
+            mocks.source_note.return_value = None
+            mocks.historical.return_value = None
+            mocks.doc_info.return_value = None
+            mocks.transcription.return_value = None
+            yield mocks
+
+    def test_scrape_creates_file(self, scrape_mocks, tmp_path):
         """Test that scrape_content creates an output file."""
         # Mock the response
         mock_response = Mock()
-        mock_response.text = "<html><body><h1>Test Content</h1></body></html>"
+        mock_response.content = b"<html><body><h1>Test Content</h1></body></html>"
+        mock_response.headers = {"Content-Type": "text/html; charset=utf-8"}
+        mock_response.encoding = "utf-8"
         mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-        
-        # Mock the section extractors to return None (no sections found)
-        mock_source_note.return_value = None
-        mock_historical.return_value = None
-        mock_doc_info.return_value = None
-        mock_transcription.return_value = None
+        scrape_mocks.get_session.return_value.get.return_value = mock_response
 
         url = "https://www.josephsmithpapers.org/paper-summary/test/1"
         output_dir = tmp_path / "output"
@@ -40,6 +66,170 @@ class TestScrapeContent:
         assert result.name == "content.md"
 
 
+class TestPageCache:
+    @patch("src.scraper.extract_sections")
+    @patch("src.scraper._get_session")
+    def test_not_modified_reuses_cached_content(self, mock_get_session, mock_sections, tmp_path):
+        """Test that a 304 for a cached ETag re-emits the content without re-extracting."""
+        fresh = Mock()
+        fresh.status_code = 200
+        fresh.content = b"<html><body><main><h1>Cached Page</h1></main></body></html>"
+        fresh.headers = {"Content-Type": "text/html; charset=utf-8", "ETag": '"v1"'}
+        fresh.encoding = "utf-8"
+        not_modified = Mock()
+        not_modified.status_code = 304
+        not_modified.headers = {"ETag": '"v1"'}
+        session = mock_get_session.return_value
+        session.get.side_effect = [fresh, not_modified]
+        mock_sections.return_value = []
+
+        url = "https://www.josephsmithpapers.org/paper-summary/test/1"
+        first = scrape_content(url, tmp_path, use_browser_for_transcription=False)
+        second = scrape_content(url, tmp_path, use_browser_for_transcription=False)
+
+        assert second == first
+        assert "Cached Page" in second.read_text(encoding="utf-8")
+        assert mock_sections.call_count == 1
+        assert session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        # Only the validators are cached, as JSON next to content.json
+        assert json.loads((tmp_path / "validators.json").read_text())["etag"] == '"v1"'
+
+    @patch("src.scraper.extract_sections")
+    @patch("src.scraper._get_session")
+    def test_missing_content_fetches_unconditionally(
+        self, mock_get_session, mock_sections, tmp_path
+    ):
+        """Test that validators are ignored once the saved content is gone."""
+        fresh = Mock()
+        fresh.status_code = 200
+        fresh.content = b"<html><body><main><h1>Cached Page</h1></main></body></html>"
+        fresh.headers = {"Content-Type": "text/html; charset=utf-8", "ETag": '"v1"'}
+        fresh.encoding = "utf-8"
+        session = mock_get_session.return_value
+        session.get.return_value = fresh
+        mock_sections.return_value = []
+
+        url = "https://www.josephsmithpapers.org/paper-summary/test/1"
+        first = scrape_content(url, tmp_path, use_browser_for_transcription=False)
+        first.unlink()
+        second = scrape_content(url, tmp_path, use_browser_for_transcription=False)
+
+        assert "Cached Page" in second.read_text(encoding="utf-8")
+        assert mock_sections.call_count == 2
+        assert session.get.call_args.kwargs["headers"] == {}
+
+
+class TestExtractBreadcrumbs:
+    def test_resolves_links_against_site(self):
+        """Test that breadcrumb hrefs of every form become absolute URLs."""
+        html = (
+            "<html><body><nav aria-label='breadcrumb'><ol>"
+            "<li><a href='/the-papers'>The Papers</a></li>"
+            "<li><a href='//www.josephsmithpapers.org/docs'>Documents</a></li>"
+            "<li><a href='https://example.org/x'>External</a></li>"
+            "<li><a>No Link</a></li>"
+            "<li>Current Page &gt;</li>"
+            "</ol></nav></body></html>"
+        )
+        breadcrumbs = extract_breadcrumbs(parse_html(html))
+
+        assert [(b.label, b.url) for b in breadcrumbs] == [
+            ("The Papers", "https://www.josephsmithpapers.org/the-papers"),
+            ("Documents", "https://www.josephsmithpapers.org/docs"),
+            ("External", "https://example.org/x"),
+            ("No Link", None),
+            ("Current Page", None),
+        ]
+
+
+class TestExtractSections:
+    @patch("src.scraper.extract_table_sections")
+    @patch("src.scraper.extract_footnotes_section")
+    @patch("src.scraper.extract_document_information")
+    @patch("src.scraper.extract_historical_introduction")
+    @patch("src.scraper.extract_source_note_advanced")
+    def test_skips_extractors_for_missing_drawers(self, mock_source_note, mock_historical,
+                                                  mock_doc_info, mock_footnotes, mock_tables):
+        """Test that only extractors whose drawer is on the page are run."""
+        html = (
+            "<html><body><main><h1>Title</h1>"
+            '<details data-testid="drawer-SourceNote-drawer"><h3>Source Note</h3></details>'
+            "</main></body></html>"
+        )
+        mock_source_note.return_value = None
+
+        extract_sections(BeautifulSoup(html, "lxml"), use_browser_for_transcription=False)
+
+        mock_source_note.assert_called_once()
+        mock_historical.assert_not_called()
+        mock_doc_info.assert_not_called()
+        mock_footnotes.assert_not_called()
+        mock_tables.assert_not_called()
+
+    @patch("src.transcription_extractor_browser.extract_transcription_with_browser")
+    def test_transcription_from_html_skips_browser(self, mock_browser):
+        """Test that a transcript present in the HTML is extracted without a browser."""
+        html = (
+            '<html><body><main><div id="paper-summary-transcript">'
+            "<p>wh[e]n we came</p></div></main></body></html>"
+        )
+
+        sections = extract_sections(
+            BeautifulSoup(html, "lxml"), "https://www.josephsmithpapers.org/paper-summary/x/1"
+        )
+
+        mock_browser.assert_not_called()
+        transcription = next(s for s in sections if s.title == "Transcript")
+        assert transcription.paragraphs[0].lines[0].text == "wh[e]n we came"
+        assert transcription.paragraphs_clean[0].lines[0].text == "when we came"
+
+    @patch("src.transcription_extractor_browser.extract_transcription_with_browser")
+    def test_transcription_falls_back_to_browser(self, mock_browser):
+        """Test that the browser is used when the HTML has no transcript."""
+        mock_browser.return_value = None
+        url = "https://www.josephsmithpapers.org/paper-summary/x/1"
+
+        extract_sections(BeautifulSoup("<html><body><main></main></body></html>", "lxml"), url)
+
+        mock_browser.assert_called_once_with(url, headless=True)
+
+
+class TestScrapeContentBatch:
+    @patch("src.scraper.extract_sections")
+    @patch("src.scraper._get_session")
+    def test_batch_writes_each_page(self, mock_get_session, mock_sections, tmp_path):
+        """Test that each URL is saved to its own directory and failures map to None."""
+        ok_response = Mock()
+        ok_response.content = b"<html><body><main><h1>Page</h1></main></body></html>"
+        ok_response.headers = {"Content-Type": "text/html; charset=utf-8"}
+        ok_response.encoding = "utf-8"
+        ok_response.raise_for_status.return_value = None
+
+        failed_response = Mock()
+        failed_response.raise_for_status.side_effect = Exception("404 Not Found")
+
+        good_urls = [
+            "https://www.josephsmithpapers.org/paper-summary/doc-a/1",
+            "https://www.josephsmithpapers.org/paper-summary/doc-b/1",
+        ]
+        bad_url = "https://www.josephsmithpapers.org/paper-summary/missing/1"
+        responses = {good_urls[0]: ok_response, good_urls[1]: ok_response, bad_url: failed_response}
+        mock_get_session.return_value.get.side_effect = lambda url, **kwargs: responses[url]
+        mock_sections.return_value = []
+
+        results = scrape_content_batch(good_urls + [bad_url], tmp_path)
+
+        assert list(results) == good_urls + [bad_url]
+        assert results[bad_url] is None
+        for url in good_urls:
+            assert results[url].exists()
+            assert results[url].parent.parent.name in url
+
+    def test_empty_batch(self, tmp_path):
+        """Test that an empty URL list does nothing."""
+        assert scrape_content_batch([], tmp_path) == {}
+
+
 class TestHtmlToMarkdown:
     def test_basic_conversion(self):
         """Test basic HTML to Markdown conversion."""
@@ -56,3 +246,64 @@ class TestHtmlToMarkdown:
 
         assert "Content" in result
         assert "alert" not in result
+
+    def test_normalizes_whitespace(self):
+        """Test that lines and double-space separated phrases become single lines."""
+        html = "<div>\n   First  line \n\n\n  Second\tpart   Third \r\n</div>"
+        result = html_to_markdown(html)
+
+        assert result == "First\nline\nSecond\tpart\nThird"
+
+
+class TestContentStrainer:
+    def test_strained_soup_keeps_content_elements(self):
+        """Test that the content strainer drops page chrome but keeps <main>."""
+        html = (
+            "<html><body><header>Site nav</header>"
+            "<main><h1>Title</h1><p>Body text</p></main>"
+            "<footer>Footer</footer></body></html>"
+        )
+        soup = BeautifulSoup(html, "lxml", parse_only=_CONTENT_STRAINER)
+
+        assert soup.find("main") is not None
+        assert "Site nav" not in str(soup)
+        assert "Footer" not in str(soup)
+
+    def test_keeps_cite_button_outside_main(self):
+        """Test the Metadata section survives a cite button in the page header."""
+        html = (
+            "<html><body><header><nav>Site nav</nav>"
+            '<a data-testid="docInfo-citePage-button" href="#">Cite this page</a></header>'
+            "<main><h1>Title</h1></main>"
+            '<script id="__NEXT_DATA__" type="application/json">'
+            '{"props": {"pageProps": {"summary": {"documentSeriesTitle": "Journal, 1835-1836"}}}}'
+            "</script></body></html>"
+        )
+        soup = BeautifulSoup(html, "lxml", parse_only=_CONTENT_STRAINER)
+        metadata = extract_metadata_section(
+            soup, "https://www.josephsmithpapers.org/paper-summary/journal-1835-1836/1"
+        )
+
+        assert "Site nav" not in str(soup)
+        assert metadata is not None
+        assert metadata.citation_info.chicago.startswith("Journal, 1835-1836, p. 1,")
+
+
+class TestExtractMainContent:
+    def test_prefers_main(self):
+        """Test that <main> is used and surrounding page chrome is ignored."""
+        html = (
+            "<html><body><header>Site nav</header>"
+            "<main>\n<h1>Title</h1>\n<p>Body text</p>\n</main>"
+            "<footer>Footer</footer></body></html>"
+        )
+        result = element_to_markdown(extract_main_content(parse_html(html)))
+
+        assert result == "Title\nBody text"
+
+    def test_falls_back_to_body(self):
+        """Test fallback to <body> when there is no <main> or <article>."""
+        html = "<html><body><h1>Only Title</h1><script>var x;</script></body></html>"
+        result = element_to_markdown(extract_main_content(parse_html(html)))
+
+        assert result == "Only Title"
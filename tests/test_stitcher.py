@@ -1,40 +1,55 @@
 """Tests for the tile stitcher module."""
 
-import tempfile
+import io
+import shutil
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
 from PIL import Image
 
-from src.stitcher import StitchError, StitchProgressCallback, TileGroup, TileStitcher
+from src.stitcher import (
+    StitchError,
+    StitchProgressCallback,
+    TileGroup,
+    TileStitcher,
+    _jpeg_size,
+    _PngBandWriter,
+)
 from src.tile_manager import TileInfo
 
 
+def _encode_tile() -> bytes:
+    """Encode one plain 256x256 JPEG tile."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (256, 256), color=(128, 128, 128)).save(buffer, "JPEG", quality=75)
+    return buffer.getvalue()
+
+
+# Written for every tile whose pixels a test does not inspect
+_TILE_BYTES = _encode_tile()
+
+
+@pytest.mark.xdist_group("stitcher")
 class TestTileStitcher:
     """Test cases for TileStitcher class."""
 
     @pytest.fixture
-    def temp_tile_dir(self):
-        """Create a temporary directory with test tiles."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            tile_dir = Path(temp_dir) / "tiles"
-            level_dir = tile_dir / "0"
-            level_dir.mkdir(parents=True)
+    def temp_tile_dir(self, tile_dir_template, tmp_path):
+        """Copy the session's test tiles into a directory this test may modify."""
+        return Path(shutil.copytree(tile_dir_template, tmp_path / "tiles"))
 
-            # Create test tiles (3x3 grid)
-            for row in range(3):
-                for col in range(3):
-                    # Create a simple colored tile
-                    img = Image.new("RGB", (256, 256), color=(col * 80, row * 80, 100))
-                    img.save(level_dir / f"{col}_{row}.jpg")
-
-            yield tile_dir
+    @pytest.fixture(scope="class")
+    def shared_stitcher(self):
+        """Create one TileStitcher for the whole class."""
+        return TileStitcher()
 
     @pytest.fixture
-    def stitcher(self):
-        """Create a TileStitcher instance."""
-        return TileStitcher()
+    def stitcher(self, shared_stitcher):
+        """Lend the shared TileStitcher to a test, resetting its state afterwards."""
+        yield shared_stitcher
+        shared_stitcher.progress_callback = None
+        shared_stitcher._tile_cache.clear()
 
     def test_init(self):
         """Test TileStitcher initialization."""
@@ -47,24 +62,25 @@ class TestTileStitcher:
         stitcher = TileStitcher(progress_callback=callback)
         assert stitcher.progress_callback == callback
 
-    def test_stitch_tiles_basic(self, stitcher, temp_tile_dir):
+    def test_stitch_tiles_basic(self, stitcher, tile_dir_template, tmp_path):
         """Test basic tile stitching functionality."""
-        output_path = temp_tile_dir.parent / "output.jpg"
+        output_path = tmp_path / "output.jpg"
 
-        results = stitcher.stitch_tiles(temp_tile_dir, output_path)
+        # Capture the stitched image instead of encoding it
+        with patch.object(Image.Image, "save", autospec=True) as mock_save:
+            results = stitcher.stitch_tiles(tile_dir_template, output_path)
 
         assert len(results) == 1
         assert results[0] == output_path
-        assert output_path.exists()
+        mock_save.assert_called_once()
+        image, path = mock_save.call_args.args[:2]
+        assert path == output_path
+        assert image.size == (768, 768)  # 3x3 tiles of 256x256
 
-        # Verify output image dimensions
-        with Image.open(output_path) as img:
-            assert img.size == (768, 768)  # 3x3 tiles of 256x256
-
-    def test_stitch_tiles_with_progress(self, stitcher, temp_tile_dir):
+    def test_stitch_tiles_with_progress(self, temp_tile_dir):
         """Test tile stitching with progress callback."""
         callback = StitchProgressCallback()
-        stitcher.progress_callback = callback
+        stitcher = TileStitcher(progress_callback=callback)
 
         output_path = temp_tile_dir.parent / "output.jpg"
         results = stitcher.stitch_tiles(temp_tile_dir, output_path)
@@ -73,32 +89,32 @@ class TestTileStitcher:
         assert callback.completed_tiles == 9
         assert len(results) == 1
 
-    def test_stitch_tiles_png_output(self, stitcher, temp_tile_dir):
-        """Test stitching to PNG format."""
-        output_path = temp_tile_dir.parent / "output.png"
+    def test_stitch_tiles_png_output(self, stitcher, tile_dir_template, tmp_path):
+        """Test that a .png output path selects the PNG writer."""
+        output_path = tmp_path / "output.png"
 
-        results = stitcher.stitch_tiles(temp_tile_dir, output_path, quality=95)
+        # PNG encoding itself is covered by test_stitch_png_matches_tiles
+        with patch.object(stitcher, "_stitch_png_bands") as mock_png, patch.object(
+            Image.Image, "save"
+        ) as mock_save:
+            results = stitcher.stitch_tiles(tile_dir_template, output_path)
 
-        assert len(results) == 1
-        assert output_path.exists()
-        assert output_path.suffix == ".png"
+        assert results == [output_path]
+        mock_png.assert_called_once()
+        assert mock_png.call_args.args[2] == output_path
+        mock_save.assert_not_called()
 
-    def test_stitch_tiles_custom_quality(self, stitcher, temp_tile_dir):
+    @pytest.mark.parametrize("quality", [50, 100])
+    def test_stitch_tiles_custom_quality(self, reference_jpegs, quality):
         """Test stitching with custom JPEG quality."""
-        output_path = temp_tile_dir.parent / "output.jpg"
+        output_path = reference_jpegs[quality]
 
-        # Test with low quality
-        stitcher.stitch_tiles(temp_tile_dir, output_path, quality=50)
         assert output_path.exists()
-        low_quality_size = output_path.stat().st_size
+        assert _jpeg_size(output_path.read_bytes()) == (768, 768)
 
-        # Test with high quality
-        stitcher.stitch_tiles(temp_tile_dir, output_path, quality=100)
-        assert output_path.exists()
-        high_quality_size = output_path.stat().st_size
-
-        # High quality should be larger
-        assert high_quality_size > low_quality_size
+    def test_higher_quality_is_larger(self, reference_jpegs):
+        """Test that a higher JPEG quality produces a larger file."""
+        assert reference_jpegs[100].stat().st_size > reference_jpegs[50].stat().st_size
 
     def test_stitch_tiles_missing_directory(self, stitcher):
         """Test error handling for missing tile directory."""
@@ -108,24 +124,38 @@ class TestTileStitcher:
         with pytest.raises(StitchError, match="Tile directory does not exist"):
             stitcher.stitch_tiles(missing_dir, output_path)
 
-    def test_stitch_tiles_empty_directory(self, stitcher):
+    def test_stitch_tiles_empty_directory(self, stitcher, tmp_path):
         """Test error handling for empty tile directory."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            tile_dir = Path(temp_dir)
-            output_path = tile_dir / "output.jpg"
+        tile_dir = tmp_path
+        output_path = tile_dir / "output.jpg"
 
-            with pytest.raises(StitchError, match="No tiles found"):
-                stitcher.stitch_tiles(tile_dir, output_path)
+        with pytest.raises(StitchError, match="No tiles found"):
+            stitcher.stitch_tiles(tile_dir, output_path)
 
-    def test_collect_tiles(self, stitcher, temp_tile_dir):
+    def test_collect_tiles(self, stitcher, tile_dir_template):
         """Test tile collection from directory."""
-        tiles = stitcher._collect_tiles(temp_tile_dir)
+        tiles = stitcher._collect_tiles(tile_dir_template)
 
         assert len(tiles) == 9  # 3x3 grid
         assert all(isinstance(tile, TileInfo) for tile in tiles)
         assert all(tile.success for tile in tiles)
         assert all(tile.path.exists() for tile in tiles)
 
+    def test_collect_tiles_skips_non_tile_entries(self, stitcher, temp_tile_dir):
+        """Test that stray files and directories are not collected as tiles."""
+        (temp_tile_dir / "0" / "notes.txt").write_text("not a tile")
+        (temp_tile_dir / "0" / "a_b.jpg").write_bytes(b"")
+        (temp_tile_dir / "previews").mkdir()
+        (temp_tile_dir / "1_1.jpg").write_bytes(b"")
+
+        tiles = stitcher._collect_tiles(temp_tile_dir)
+
+        assert len(tiles) == 9
+        assert {(tile.col, tile.row) for tile in tiles} == {
+            (col, row) for col in range(3) for row in range(3)
+        }
+        assert all(tile.level == 0 for tile in tiles)
+
     def test_analyze_tile_layout(self, stitcher):
         """Test tile layout analysis."""
         # Create mock tiles
@@ -173,6 +203,18 @@ class TestTileStitcher:
         assert group.total_width == 512  # 2 cols * 256
         assert group.total_height == 512  # 2 rows * 256
 
+    def test_create_tile_group_caches_tile_size(self, stitcher, tile_dir_template):
+        """Test that the tile size is read once per level."""
+        tiles = stitcher._collect_tiles(tile_dir_template)
+
+        with patch.object(stitcher, "_read_tile_size", wraps=stitcher._read_tile_size) as read:
+            first = stitcher._create_tile_group(tiles[:4], level=0)
+            second = stitcher._create_tile_group(tiles[4:], level=0)
+
+        assert read.call_count == 1
+        assert (first.tile_width, first.tile_height) == (256, 256)
+        assert (second.tile_width, second.tile_height) == (256, 256)
+
     def test_create_tile_group_empty_list(self, stitcher):
         """Test error handling for empty tile list."""
         with pytest.raises(ValueError, match="Cannot create group from empty tile list"):
@@ -190,68 +232,111 @@ class TestTileStitcher:
         assert output_path.exists()
         # Should still create image despite missing tile
 
-    def test_stitch_multiple_levels(self, stitcher):
+    def test_stitch_places_tiles_with_worker_pool(self, temp_tile_dir):
+        """Test that tiles decoded on worker threads land at their grid positions."""
+        stitcher = TileStitcher(max_workers=2)
+        output_path = temp_tile_dir.parent / "output.png"
+        stitcher.stitch_tiles(temp_tile_dir, output_path)
+
+        with Image.open(output_path) as result:
+            assert result.size == (768, 768)
+            for row in range(3):
+                for col in range(3):
+                    r, g, _ = result.getpixel((col * 256 + 128, row * 256 + 128))
+                    assert abs(r - col * 80) <= 3
+                    assert abs(g - row * 80) <= 3
+
+    def test_stitch_png_matches_tiles(self, stitcher, temp_tile_dir):
+        """Test that the band-streamed PNG reproduces every tile exactly."""
+        output_path = temp_tile_dir.parent / "output.png"
+        stitcher.stitch_tiles(temp_tile_dir, output_path)
+
+        with Image.open(output_path) as result:
+            result.load()
+            for row in range(3):
+                for col in range(3):
+                    with Image.open(temp_tile_dir / "0" / f"{col}_{row}.jpg") as tile:
+                        box = (col * 256, row * 256, (col + 1) * 256, (row + 1) * 256)
+                        assert result.crop(box).tobytes() == tile.convert("RGB").tobytes()
+
+    def test_stitch_png_creates_preview(self, stitcher, tmp_path):
+        """Test that large band-streamed PNGs still get a preview."""
+        tile_dir = tmp_path / "tiles"
+        level_dir = tile_dir / "0"
+        level_dir.mkdir(parents=True)
+        for col in range(9):
+            (level_dir / f"{col}_0.jpg").write_bytes(_TILE_BYTES)
+
+        output_path = tmp_path / "wide.png"
+        stitcher.stitch_tiles(tile_dir, output_path)
+
+        with Image.open(tmp_path / "wide_preview.png") as preview:
+            assert preview.size == (1200, 133)
+
+    def test_stitch_reports_missing_grid_positions(self, stitcher, temp_tile_dir, caplog):
+        """Test that gaps in the tile grid are reported once before stitching."""
+        (temp_tile_dir / "0" / "1_1.jpg").unlink()
+        (temp_tile_dir / "0" / "2_0.jpg").unlink()
+
+        with caplog.at_level("WARNING", logger="src.stitcher"):
+            stitcher.stitch_tiles(temp_tile_dir, temp_tile_dir.parent / "output.jpg")
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert "2 missing tile(s) at (2, 0), (1, 1)" in messages
+
+    def test_decode_tile_scales_oversized_jpeg(self, stitcher, temp_tile_dir):
+        """Test that tiles larger than the group's tile size come back at that size."""
+        tile_path = temp_tile_dir / "0" / "big.jpg"
+        Image.new("RGB", (1024, 1024), color=(200, 0, 0)).save(tile_path)
+        tile = TileInfo(url="", col=0, row=0, level=0, path=tile_path)
+
+        tile_img = stitcher._decode_tile(tile, (256, 256))
+
+        assert tile_img.size == (256, 256)
+        assert tile_img.getpixel((128, 128))[0] > 190
+
+    def test_stitch_multiple_levels(self, stitcher, tmp_path):
         """Test stitching tiles from multiple zoom levels."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            tile_dir = Path(temp_dir)
+        tile_dir = tmp_path
 
-            # Create tiles at different levels
-            for level in [0, 1]:
-                level_dir = tile_dir / str(level)
-                level_dir.mkdir(parents=True)
-                for row in range(2):
-                    for col in range(2):
-                        img = Image.new("RGB", (256, 256), color=(level * 100, col * 50, row * 50))
-                        img.save(level_dir / f"{col}_{row}.jpg")
+        # Create tiles at different levels
+        for level in [0, 1]:
+            level_dir = tile_dir / str(level)
+            level_dir.mkdir(parents=True)
+            for row in range(2):
+                for col in range(2):
+                    (level_dir / f"{col}_{row}.jpg").write_bytes(_TILE_BYTES)
 
-            output_path = tile_dir / "output.jpg"
-            results = stitcher.stitch_tiles(tile_dir, output_path, detect_multiple=False)
+        output_path = tile_dir / "output.jpg"
+        results = stitcher.stitch_tiles(tile_dir, output_path, detect_multiple=False)
 
-            # Should create separate images for each level
-            assert len(results) == 2
+        # Should create separate images for each level
+        assert len(results) == 2
 
-    def test_create_preview(self, stitcher):
+    def test_create_preview(self, stitcher, tmp_path):
         """Test preview creation for large images."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            
-            # Create a large test image
-            large_img = Image.new("RGB", (3000, 3000), color=(100, 100, 100))
-            output_path = temp_path / "large.jpg"
-            
-            # Make sure the directory exists
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # First call to _create_preview should return the path and create the preview
-            preview_path = stitcher._create_preview(large_img, output_path)
-
-            # If preview_path is None, let's check what went wrong
-            if preview_path is None:
-                # Check if it's because the image is small (it shouldn't be)
-                ratio = min(1200 / large_img.width, 1200 / large_img.height)
-                assert ratio < 1, f"Image should need preview: ratio={ratio}"
-                
-                # Try manually creating the preview to see if there's an error
-                preview_path_expected = output_path.parent / f"{output_path.stem}_preview{output_path.suffix}"
-                try:
-                    preview = large_img.resize((1200, 1200), Image.Resampling.LANCZOS)
-                    preview.save(preview_path_expected, "JPEG", quality=85, optimize=True)
-                except Exception as e:
-                    pytest.fail(f"Manual preview creation failed: {e}")
-
-            assert preview_path is not None, "Preview path should not be None for large image"
-            assert preview_path.name == "large_preview.jpg"
-            assert preview_path.exists(), f"Preview file should exist at {preview_path}"
-
-            # Verify preview dimensions
-            with Image.open(preview_path) as preview:
-                assert max(preview.size) == 1200
-
-            # Test that small images don't get previews
-            small_img = Image.new("RGB", (500, 500), color=(100, 100, 100))
-            small_output_path = temp_path / "small.jpg"
-            small_preview_path = stitcher._create_preview(small_img, small_output_path)
-            assert small_preview_path is None
+        # Create an image just over the 1200px preview threshold
+        large_img = Image.new("RGB", (1300, 1300), color=(100, 100, 100))
+        output_path = tmp_path / "large.jpg"
+
+        # Make sure the directory exists
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # First call to _create_preview should return the path and create the preview
+        preview_path = stitcher._create_preview(large_img, output_path)
+
+        assert preview_path is not None, "Preview path should not be None for large image"
+        assert preview_path.name == "large_preview.jpg"
+        assert preview_path.exists(), f"Preview file should exist at {preview_path}"
+
+        # Verify preview dimensions from the JPEG header alone
+        assert max(_jpeg_size(preview_path.read_bytes())) == 1200
+
+        # Test that small images don't get previews
+        small_img = Image.new("RGB", (500, 500), color=(100, 100, 100))
+        small_output_path = tmp_path / "small.jpg"
+        small_preview_path = stitcher._create_preview(small_img, small_output_path)
+        assert small_preview_path is None
 
 
 class TestStitchProgressCallback:
@@ -299,3 +384,68 @@ class TestTileGroup:
         assert group.max_col == 2
         assert group.total_width == 768
         assert group.total_height == 768
+
+    def test_missing_positions(self):
+        """Test that grid positions without a tile are listed in row-major order."""
+        tiles = [
+            TileInfo(url="", col=col, row=row, level=0, path=Path(f"{col}_{row}.jpg"))
+            for col, row in [(0, 0), (1, 0), (1, 1)]
+        ]
+        tiles.append(TileInfo(url="", col=0, row=2, level=0))
+        group = TileGroup(
+            tiles=tiles,
+            min_col=0,
+            max_col=1,
+            min_row=0,
+            max_row=2,
+            level=0,
+            tile_width=256,
+            tile_height=256,
+            total_width=512,
+            total_height=768,
+        )
+
+        assert group.missing_positions() == [(0, 1), (0, 2), (1, 2)]
+
+
+class TestPngBandWriter:
+    """Test cases for the streaming PNG writer."""
+
+    def test_round_trip_across_bands(self):
+        """Test that rows written in several bands decode to the original image."""
+        image = Image.effect_noise((37, 12), 64).convert("RGB")
+        buffer = io.BytesIO()
+
+        writer = _PngBandWriter(buffer, 37, 12)
+        for top in range(0, 12, 4):
+            writer.write_band(image.crop((0, top, 37, top + 4)))
+        writer.close()
+
+        buffer.seek(0)
+        with Image.open(buffer) as result:
+            assert result.mode == "RGB"
+            assert result.tobytes() == image.tobytes()
+
+
+class TestJpegSize:
+    """Test cases for reading JPEG dimensions from header bytes."""
+
+    @pytest.mark.parametrize("progressive", [False, True])
+    def test_reads_frame_header(self, progressive):
+        """Test that baseline and progressive frame headers are found."""
+        buffer = io.BytesIO()
+        exif = Image.Exif()
+        exif[0x010E] = "tile"  # ImageDescription, so an APP1 segment precedes the frame
+        Image.new("RGB", (300, 120)).save(
+            buffer, "JPEG", progressive=progressive, exif=exif.tobytes()
+        )
+
+        assert _jpeg_size(buffer.getvalue()) == (300, 120)
+
+    def test_rejects_non_jpeg_data(self):
+        """Test that non-JPEG or truncated data yields None."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (10, 10)).save(buffer, "PNG")
+
+        assert _jpeg_size(buffer.getvalue()) is None
+        assert _jpeg_size(b"\xff\xd8\xff\xe0") is None
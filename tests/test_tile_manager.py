@@ -1,11 +1,14 @@
 """Tests for the tile_manager module."""
 
-import shutil
+import http.server
+import io
+import threading
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, create_autospec, patch
 
 import pytest
 import requests
+import urllib3
 
 from src.openseadragon import OpenSeadragonConfig
 from src.tile_manager import (
@@ -16,6 +19,44 @@ from src.tile_manager import (
     TileManager,
 )
 
+# Tile URLs (url, col, row) of a 2x2 grid at level 10, shared by every test
+TILE_URLS_L10 = (
+    ("https://example.com/10/0_0.jpg", 0, 0),
+    ("https://example.com/10/0_1.jpg", 0, 1),
+    ("https://example.com/10/1_0.jpg", 1, 0),
+    ("https://example.com/10/1_1.jpg", 1, 1),
+)
+
+
+@pytest.fixture(scope="module")
+def shared_mock_config():
+    """Create one mock config for the module.
+
+    Only get_tile_urls is used, so a plain Mock stands in for
+    OpenSeadragonConfig; test_tile_manager_matches_config_interface checks
+    the calls against the real class.
+    """
+    config = Mock()
+    config.get_tile_urls = Mock(return_value=TILE_URLS_L10)
+    return config
+
+
+@pytest.fixture(scope="module")
+def shared_tile_response():
+    """Create one mock successful tile response for the module."""
+    response = Mock()
+    response.status_code = 200
+    return response
+
+
+@pytest.fixture
+def mock_tile_response(shared_tile_response):
+    """Reset the shared tile response, with a fresh body to stream."""
+    shared_tile_response.reset_mock()
+    shared_tile_response.raise_for_status.return_value = None
+    shared_tile_response.raw = io.BytesIO(b"fake_image_data")
+    return shared_tile_response
+
 
 class TestTileInfo:
     """Test TileInfo dataclass."""
@@ -48,21 +89,24 @@ class TestTileManager:
     """Test TileManager class."""
 
     @pytest.fixture
-    def mock_config(self):
-        """Create a mock OpenSeadragonConfig."""
-        config = Mock(spec=OpenSeadragonConfig)
-        config.get_tile_urls.return_value = [
-            ("https://example.com/10/0_0.jpg", 0, 0),
-            ("https://example.com/10/0_1.jpg", 0, 1),
-            ("https://example.com/10/1_0.jpg", 1, 0),
-            ("https://example.com/10/1_1.jpg", 1, 1),
-        ]
-        return config
+    def mock_config(self, shared_mock_config):
+        """Reset the shared mock OpenSeadragonConfig to its default tiles."""
+        shared_mock_config.get_tile_urls.reset_mock(return_value=True, side_effect=True)
+        shared_mock_config.get_tile_urls.return_value = TILE_URLS_L10
+        return shared_mock_config
+
+    @pytest.fixture(scope="class")
+    def shared_session(self):
+        """Build one retrying, pooled session for every manager in the class."""
+        session = TileManager(max_workers=2, max_retries=2, timeout=10)._session
+        yield session
+        session.close()
 
     @pytest.fixture
-    def manager(self):
-        """Create a TileManager instance."""
-        return TileManager(max_workers=2, max_retries=2, timeout=10)
+    def manager(self, shared_session):
+        """Create a TileManager instance that reuses the shared session."""
+        with patch.object(TileManager, "_create_session", return_value=shared_session):
+            return TileManager(max_workers=2, max_retries=2, timeout=10)
 
     def test_init(self):
         """Test TileManager initialization."""
@@ -87,6 +131,10 @@ class TestTileManager:
         # Check that adapters are configured
         assert "https://" in session.adapters
         assert "http://" in session.adapters
+        # Connections are capped at one per worker rather than churned
+        adapter = session.adapters["https://"]
+        assert adapter._pool_maxsize == manager.max_workers
+        assert adapter._pool_block is True
 
     def test_download_tiles_invalid_params(self, manager, mock_config):
         """Test download_tiles with invalid parameters."""
@@ -101,8 +149,8 @@ class TestTileManager:
     def test_download_tiles_no_tiles(self, mock_mkdtemp, manager):
         """Test download_tiles when no tiles are found."""
         mock_mkdtemp.return_value = "/tmp/test_tiles"
-        mock_config = Mock(spec=OpenSeadragonConfig)
-        mock_config.get_tile_urls.return_value = []
+        mock_config = Mock()
+        mock_config.get_tile_urls = Mock(return_value=[])
 
         with pytest.raises(TileDownloadError) as excinfo:
             manager.download_tiles(mock_config)
@@ -132,27 +180,42 @@ class TestTileManager:
         assert result == Path(temp_dir)
         mock_download.assert_called_once()
 
-    def test_find_highest_level(self, manager, mock_config):
+    def test_find_highest_level(self, manager, mock_config, monkeypatch):
         """Test finding highest zoom level."""
-        # Mock HEAD requests
-        with patch.object(manager._session, "head") as mock_head:
-            # Level 15 exists
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_head.return_value = mock_response
-
-            mock_config.get_tile_urls.side_effect = [
-                [],  # Level 20 - no tiles
-                [],  # Level 19 - no tiles
-                [],  # Level 18 - no tiles
-                [],  # Level 17 - no tiles
-                [],  # Level 16 - no tiles
-                [("https://example.com/15/0_0.jpg", 0, 0)],  # Level 15 - has tiles
-            ]
+        # Mock HEAD requests; every probed tile exists
+        mock_response = Mock()
+        mock_response.status_code = 200
+        monkeypatch.setattr(manager._session, "head", lambda *args, **kwargs: mock_response)
+
+        # Levels 20-16 have no tiles; 15 and below do (probed concurrently)
+        mock_config.get_tile_urls.side_effect = lambda level: (
+            [(f"https://example.com/{level}/0_0.jpg", 0, 0)] if level <= 15 else []
+        )
+
+        level = manager._find_highest_level(mock_config)
+
+        assert level == 15
 
-            level = manager._find_highest_level(mock_config)
+    def test_find_highest_level_skips_missing_first_tile(self, manager, mock_config, monkeypatch):
+        """Test that a level whose first tile is not found is skipped."""
+        mock_config.get_tile_urls.side_effect = lambda level: (
+            [(f"https://example.com/{level}/0_0.jpg", 0, 0)] if level <= 12 else []
+        )
+
+        def head(url, timeout):
+            response = Mock()
+            response.status_code = 404 if "/12/" in url else 200
+            return response
+
+        monkeypatch.setattr(manager._session, "head", head)
 
-            assert level == 15
+        assert manager._find_highest_level(mock_config) == 11
+
+    def test_find_highest_level_none_available(self, manager, mock_config):
+        """Test that None is returned when no level has tiles."""
+        mock_config.get_tile_urls.side_effect = lambda level: []
+
+        assert manager._find_highest_level(mock_config) is None
 
     def test_get_tiles_for_level(self, manager, mock_config):
         """Test getting tiles for a specific level."""
@@ -165,13 +228,34 @@ class TestTileManager:
         assert tiles[0].row == 0
         assert tiles[0].level == 10
 
-    def test_get_tiles_to_download_highest(self, manager, mock_config):
+    def test_tile_manager_matches_config_interface(self, manager):
+        """Test that TileManager calls get_tile_urls as OpenSeadragonConfig defines it."""
+        config = create_autospec(OpenSeadragonConfig, instance=True)
+        config.get_tile_urls.return_value = TILE_URLS_L10
+
+        tiles = manager._get_tiles_to_download(config, QualityMode.SPECIFIC, specific_level=10)
+
+        assert len(tiles) == 4
+        config.get_tile_urls.assert_called_once_with(level=10)
+
+    def test_get_tiles_to_download_highest(self, manager, mock_config, monkeypatch):
         """Test getting tiles for HIGHEST quality mode."""
-        with patch.object(manager, "_find_highest_level", return_value=10):
-            tiles = manager._get_tiles_to_download(mock_config, QualityMode.HIGHEST)
+        monkeypatch.setattr(manager, "_find_highest_level", lambda config: 10)
+
+        tiles = manager._get_tiles_to_download(mock_config, QualityMode.HIGHEST)
 
-            assert len(tiles) == 4
-            assert all(tile.level == 10 for tile in tiles)
+        assert len(tiles) == 4
+        assert all(tile.level == 10 for tile in tiles)
+
+    def test_get_tiles_to_download_all(self, manager, mock_config):
+        """Test getting tiles for ALL quality mode stops at the first empty level."""
+        mock_config.get_tile_urls.side_effect = lambda level: (
+            [(f"https://example.com/{level}/0_0.jpg", 0, 0)] if level <= 3 or level == 5 else []
+        )
+
+        tiles = manager._get_tiles_to_download(mock_config, QualityMode.ALL)
+
+        assert [tile.level for tile in tiles] == [0, 1, 2, 3]
 
     def test_get_tiles_to_download_specific(self, manager, mock_config):
         """Test getting tiles for SPECIFIC quality mode."""
@@ -180,57 +264,143 @@ class TestTileManager:
         assert len(tiles) == 4
         assert all(tile.level == 5 for tile in tiles)
 
-    def test_download_single_tile_success(self, manager, tmp_path):
+    def test_download_single_tile_success(
+        self, manager, mock_tile_response, tmp_path, monkeypatch
+    ):
         """Test successful single tile download."""
         tile = TileInfo(url="https://example.com/tile.jpg", col=0, row=0, level=10)
+        monkeypatch.setattr(manager._session, "get", lambda *args, **kwargs: mock_tile_response)
 
-        # Mock successful response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.iter_content.return_value = [b"fake_image_data"]
-        mock_response.raise_for_status.return_value = None
-
-        with patch.object(manager._session, "get", return_value=mock_response):
-            success = manager._download_single_tile(tile, tmp_path)
+        success = manager._download_single_tile(tile, tmp_path)
 
-            assert success is True
-            assert tile.success is True
-            assert tile.path == tmp_path / "0_0.jpg"
-            assert tile.path.exists()
+        assert success is True
+        assert tile.success is True
+        assert tile.path == tmp_path / "0_0.jpg"
+        assert tile.path.exists()
 
-    def test_download_single_tile_retry(self, manager, tmp_path):
+    def test_download_single_tile_retry(self, manager, mock_tile_response, tmp_path, monkeypatch):
         """Test tile download with retry."""
         tile = TileInfo(url="https://example.com/tile.jpg", col=0, row=0, level=10)
 
         # Mock failed then successful response
         mock_response_fail = Mock()
         mock_response_fail.raise_for_status.side_effect = requests.HTTPError("404")
+        responses = iter([mock_response_fail, mock_tile_response])
+        monkeypatch.setattr(manager._session, "get", lambda *args, **kwargs: next(responses))
 
-        mock_response_success = Mock()
-        mock_response_success.status_code = 200
-        mock_response_success.iter_content.return_value = [b"fake_image_data"]
+        success = manager._download_single_tile(tile, tmp_path)
 
-        with patch.object(
-            manager._session, "get", side_effect=[mock_response_fail, mock_response_success]
-        ):
-            success = manager._download_single_tile(tile, tmp_path)
+        assert success is True
 
-            assert success is True
+    def test_download_single_tile_retries_interrupted_body(
+        self, manager, mock_tile_response, tmp_path, monkeypatch
+    ):
+        """Test that a connection dropped while streaming the body is retried."""
+        tile = TileInfo(url="https://example.com/tile.jpg", col=0, row=0, level=10)
+
+        mock_response_broken = Mock()
+        mock_response_broken.raw.read.side_effect = urllib3.exceptions.ProtocolError("reset")
+        responses = iter([mock_response_broken, mock_tile_response])
+        monkeypatch.setattr(manager._session, "get", lambda *args, **kwargs: next(responses))
+        monkeypatch.setattr("src.tile_manager.time.sleep", lambda seconds: None)
 
-    def test_download_single_tile_failure(self, manager, tmp_path):
+        success = manager._download_single_tile(tile, tmp_path)
+
+        assert success is True
+        assert tile.path.read_bytes() == b"fake_image_data"
+
+    def test_download_single_tile_failure(self, manager, tmp_path, monkeypatch):
         """Test tile download failure after retries."""
         tile = TileInfo(url="https://example.com/tile.jpg", col=0, row=0, level=10)
 
         # Mock all failed responses
-        with patch.object(
-            manager._session, "get", side_effect=requests.ConnectionError("Network error")
-        ):
-            success = manager._download_single_tile(tile, tmp_path)
+        def fail(*args, **kwargs):
+            raise requests.ConnectionError("Network error")
+
+        monkeypatch.setattr(manager._session, "get", fail)
+
+        success = manager._download_single_tile(tile, tmp_path)
+
+        assert success is False
+        assert tile.error is not None
+
+    def test_error_responses_release_pooled_connections(self, tmp_path):
+        """Test that failed tile responses return their connections to the blocking pool."""
+
+        class NotFoundHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(404)
+                self.send_header("Content-Length", "9")
+                self.end_headers()
+                self.wfile.write(b"not found")
+
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), NotFoundHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            manager = TileManager(max_workers=2, max_retries=1, timeout=5)
+            base_url = f"http://127.0.0.1:{server.server_address[1]}"
+            tiles = [
+                TileInfo(url=f"{base_url}/{i}.jpg", col=i, row=0, level=10) for i in range(10)
+            ]
+
+            download = threading.Thread(
+                target=manager._download_tiles_concurrent, args=(tiles, tmp_path), daemon=True
+            )
+            download.start()
+            download.join(timeout=30)
+
+            assert not download.is_alive(), "downloads blocked waiting for a pooled connection"
+            assert len(manager.get_failed_tiles()) == 10
+            manager.cleanup()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_download_single_tile_populates_cache(self, mock_tile_response, tmp_path, monkeypatch):
+        """Test that a downloaded tile is added to the persistent cache."""
+        manager = TileManager(max_workers=1, cache_dir=tmp_path / "cache")
+        tile = TileInfo(url="https://example.com/tile.jpg", col=0, row=0, level=10)
+        monkeypatch.setattr(manager._session, "get", lambda *args, **kwargs: mock_tile_response)
 
-            assert success is False
-            assert tile.error is not None
+        assert manager._download_single_tile(tile, tmp_path) is True
 
-    def test_download_tiles_concurrent(self, manager, tmp_path):
+        assert manager._cache_path(tile).read_bytes() == b"fake_image_data"
+
+    def test_cached_tile_copied_on_windows(self, mock_tile_response, tmp_path, monkeypatch):
+        """Test the cache gets its own copy where tiles are flagged temporary."""
+        manager = TileManager(max_workers=1, cache_dir=tmp_path / "cache")
+        tile = TileInfo(url="https://example.com/tile.jpg", col=0, row=0, level=10)
+        monkeypatch.setattr(manager._session, "get", lambda *args, **kwargs: mock_tile_response)
+        monkeypatch.setattr("src.tile_manager.sys.platform", "win32")
+        monkeypatch.setattr("src.tile_manager._mark_temporary", lambda path: None)
+
+        assert manager._download_single_tile(tile, tmp_path) is True
+
+        cached = manager._cache_path(tile)
+        assert cached.read_bytes() == b"fake_image_data"
+        assert not cached.samefile(tile.path)
+
+    def test_download_single_tile_from_cache(self, tmp_path, monkeypatch):
+        """Test that a cached tile is reused without downloading it."""
+        manager = TileManager(max_workers=1, cache_dir=tmp_path / "cache")
+        tile = TileInfo(url="https://example.com/tile.jpg", col=0, row=0, level=10)
+        cached = manager._cache_path(tile)
+        cached.parent.mkdir(parents=True)
+        cached.write_bytes(b"cached_image_data")
+        mock_get = Mock()
+        monkeypatch.setattr(manager._session, "get", mock_get)
+
+        assert manager._download_single_tile(tile, tmp_path) is True
+        mock_get.assert_not_called()
+
+        assert tile.path == tmp_path / "0_0.jpg"
+        assert tile.path.read_bytes() == b"cached_image_data"
+        assert tile.size == len(b"cached_image_data")
+
+    def test_download_tiles_concurrent(self, manager, tmp_path, monkeypatch):
         """Test concurrent tile downloading."""
         tiles = [
             TileInfo(url=f"https://example.com/{i}.jpg", col=i, row=0, level=10) for i in range(4)
@@ -247,11 +417,33 @@ class TestTileManager:
             tile.path.touch()  # Create empty file
             return True
 
-        with patch.object(manager, "_download_single_tile", side_effect=mock_download):
-            manager._download_tiles_concurrent(tiles, tmp_path)
+        monkeypatch.setattr(manager, "_download_single_tile", mock_download)
+
+        manager._download_tiles_concurrent(tiles, tmp_path)
+
+        assert all(tile.success for tile in tiles)
+        assert manager._tile_counter == 4
+
+    def test_download_tiles_concurrent_records_every_tile(self, manager, tmp_path, monkeypatch):
+        """Test that every tile is recorded when there are more tiles than downloads in flight."""
+        tiles = [
+            TileInfo(url=f"https://example.com/{i}.jpg", col=i, row=0, level=10)
+            for i in range(manager.max_workers * 5)
+        ]
+
+        def mock_download(tile, output_dir):
+            if tile.col == 3:
+                raise RuntimeError("boom")
+            return tile.col % 2 == 0
+
+        monkeypatch.setattr(manager, "_download_single_tile", mock_download)
+
+        manager._download_tiles_concurrent(tiles, tmp_path)
 
-            assert all(tile.success for tile in tiles)
-            assert manager._tile_counter == 4
+        assert manager._tile_counter == len(tiles)
+        failed_cols = sorted(tile.col for tile in manager.get_failed_tiles())
+        assert failed_cols == [col for col in range(len(tiles)) if col % 2 == 1]
+        assert tiles[3].error == "boom"
 
     def test_get_failed_tiles(self, manager):
         """Test getting failed tiles."""
@@ -267,11 +459,14 @@ class TestTileManager:
         assert result == failed_tiles
         assert result is not manager._failed_tiles  # Should be a copy
 
-    def test_cleanup(self, manager):
+    def test_cleanup(self, manager, monkeypatch):
         """Test cleanup method."""
-        with patch.object(manager._session, "close") as mock_close:
-            manager.cleanup()
-            mock_close.assert_called_once()
+        mock_close = Mock()
+        monkeypatch.setattr(manager._session, "close", mock_close)
+
+        manager.cleanup()
+
+        mock_close.assert_called_once()
 
 
 class TestSimpleProgressCallback:
@@ -299,54 +494,75 @@ class TestSimpleProgressCallback:
         # Test on_complete
         callback.on_complete()  # Should not raise
 
+    def test_simple_progress_callback_throttles_output(self, capsys, monkeypatch):
+        """Test that progress lines are printed at most once per interval."""
+        callback = SimpleProgressCallback()
+        callback.on_start(100)
+        capsys.readouterr()
+
+        monkeypatch.setattr("src.tile_manager.time.monotonic", lambda: 1000.0)
+        for tile_num in range(1, 101):
+            callback.on_tile_complete(tile_num, True)
+
+        lines = capsys.readouterr().out.splitlines()
+        # The first 10-tile mark and the final tile; the rest fall in the same interval
+        assert lines == [
+            "Progress: 10/100 tiles (10 successful)",
+            "Progress: 100/100 tiles (100 successful)",
+        ]
+
 
 class TestIntegration:
     """Integration tests with real temporary directories."""
 
-    def test_full_download_workflow(self):
+    def test_full_download_workflow(self, tmp_path, monkeypatch):
         """Test complete download workflow with temporary directory."""
         # Create mock config
-        mock_config = Mock(spec=OpenSeadragonConfig)
-        mock_config.get_tile_urls.return_value = [
-            ("https://example.com/10/0_0.jpg", 0, 0),
-            ("https://example.com/10/0_1.jpg", 0, 1),
-        ]
+        mock_config = Mock()
+        mock_config.get_tile_urls = Mock(return_value=TILE_URLS_L10[:2])
 
         # Create manager with callback
         callback = SimpleProgressCallback()
         manager = TileManager(max_workers=1, progress_callback=callback)
 
-        # Mock successful downloads
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.iter_content.return_value = [b"fake_image_data"]
-        mock_response.raise_for_status.return_value = None
-
-        with patch.object(manager._session, "get", return_value=mock_response):
-            with patch.object(manager._session, "head", return_value=mock_response):
-                with patch.object(manager, "_find_highest_level", return_value=10):
-                    # Download tiles
-                    temp_dir = manager.download_tiles(mock_config, QualityMode.HIGHEST)
-
-                try:
-                    # Verify temporary directory exists
-                    assert temp_dir.exists()
-                    assert temp_dir.is_dir()
-
-                    # Verify tiles were downloaded
-                    level_dir = temp_dir / "10"
-                    assert level_dir.exists()
-                    assert (level_dir / "0_0.jpg").exists()
-                    assert (level_dir / "0_1.jpg").exists()
-
-                    # Verify callback was called
-                    assert callback.total_tiles == 2
-                    assert callback.completed_tiles == 2
-                    assert callback.successful_tiles == 2
-
-                finally:
-                    # Clean up
-                    shutil.rmtree(temp_dir, ignore_errors=True)
+        # Mock successful downloads, each with its own response body
+        def mock_get(*args, **kwargs):
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.raw = io.BytesIO(b"fake_image_data")
+            mock_response.raise_for_status.return_value = None
+            return mock_response
+
+        monkeypatch.setattr(manager._session, "get", mock_get)
+        monkeypatch.setattr(manager._session, "head", mock_get)
+        monkeypatch.setattr(manager, "_find_highest_level", lambda config: 10)
+
+        # Create the "temporary" directory under tmp_path, which pytest cleans up
+        tiles_dir = tmp_path / "tiles"
+
+        def mkdtemp(*args, **kwargs):
+            tiles_dir.mkdir()
+            return str(tiles_dir)
+
+        monkeypatch.setattr("src.tile_manager.tempfile.mkdtemp", mkdtemp)
+
+        # Download tiles
+        temp_dir = manager.download_tiles(mock_config, QualityMode.HIGHEST)
+
+        # Verify temporary directory exists
+        assert temp_dir == tiles_dir
+        assert temp_dir.is_dir()
+
+        # Verify tiles were downloaded
+        level_dir = temp_dir / "10"
+        assert level_dir.exists()
+        assert (level_dir / "0_0.jpg").exists()
+        assert (level_dir / "0_1.jpg").exists()
+
+        # Verify callback was called
+        assert callback.total_tiles == 2
+        assert callback.completed_tiles == 2
+        assert callback.successful_tiles == 2
 
         # Clean up manager
         manager.cleanup()
@@ -0,0 +1,53 @@
+"""Tests for the browser-based transcription extractor."""
+
+from unittest.mock import patch
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from src.transcription_extractor_browser import (
+    BrowserSession,
+    _TranscriptionHtml,
+    extract_transcriptions_with_browser,
+)
+
+PAGE_URL = "https://example.com/page"
+EMPTY_URL = "https://example.com/empty"
+BROKEN_URL = "https://example.com/broken"
+
+
+def fake_fetch_html(self, url):
+    """Stand in for a browser: one page has markup, one none, one crashes."""
+    if url == EMPTY_URL:
+        return None
+    if url == BROKEN_URL:
+        raise WebDriverException("session deleted")
+    return _TranscriptionHtml(
+        with_marks='<div class="wasptag">Hello world</div>',
+        without_marks=None,
+        drawer="",
+    )
+
+
+class TestExtractTranscriptionsWithBrowser:
+    @pytest.mark.parametrize("parse_processes", [None, 2])
+    def test_extracts_each_url(self, parse_processes):
+        """Test pages are parsed in threads or worker processes, errors becoming None."""
+        with patch.object(BrowserSession, "_fetch_html", fake_fetch_html):
+            results = extract_transcriptions_with_browser(
+                [PAGE_URL, EMPTY_URL, BROKEN_URL],
+                concurrency=2,
+                parse_processes=parse_processes,
+            )
+
+        assert set(results) == {PAGE_URL, EMPTY_URL, BROKEN_URL}
+        assert results[PAGE_URL].paragraphs[0].lines[0].text == "Hello world"
+        assert results[EMPTY_URL] is None
+        assert results[BROKEN_URL] is None
+
+    def test_empty_url_list(self):
+        """Test no browsers are started for an empty batch."""
+        with patch.object(BrowserSession, "_start_driver") as mock_start:
+            assert extract_transcriptions_with_browser([]) == {}
+
+        mock_start.assert_not_called()
@@ -17,6 +17,13 @@ class TestParseUrl:
         assert result["path"] == "/paper-summary/book-of-mormon-1830/1"
         assert result["path_parts"] == ["paper-summary", "book-of-mormon-1830", "1"]
 
+    def test_repeated_parse_returns_fresh_result(self):
+        url = "https://www.josephsmithpapers.org/paper-summary/book-of-mormon-1830/1"
+        first = parse_url(url)
+        first["path_parts"].append("extra")
+
+        assert parse_url(url)["path_parts"] == ["paper-summary", "book-of-mormon-1830", "1"]
+
 
 class TestSanitizeFilename:
     def test_sanitize_normal_filename(self):